@@ -0,0 +1,24 @@
+"""Esquema base (esquema.sql)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Punto de partida de las migraciones. Corresponde al esquema creado con
+`esquema.sql` antes de introducir Alembic; en esas bases marcar con
+`alembic stamp 0001` antes de aplicar las revisiones siguientes. Las bases
+nuevas creadas con el `esquema.sql` actual se marcan con `alembic stamp head`.
+"""
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    pass
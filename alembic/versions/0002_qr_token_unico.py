@@ -0,0 +1,34 @@
+"""Índice único parcial sobre qr.token
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Permite resolver la validación de QR en garita con un index scan,
+independiente del volumen histórico de QRs. Se crea CONCURRENTLY para no
+bloquear escrituras sobre `qr` durante el despliegue.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_qr_token_activo",
+            "qr",
+            ["token"],
+            unique=True,
+            postgresql_where=sa.text("eliminado = false"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("uq_qr_token_activo", table_name="qr", postgresql_concurrently=True)
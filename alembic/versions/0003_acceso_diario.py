@@ -0,0 +1,42 @@
+"""Tablas de resumen diario de accesos
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+acceso_diario guarda conteos por día, vivienda, tipo y resultado, y
+acceso_diario_visitante los visitantes distintos de cada día. Las
+estadísticas de admin leen de aquí los días cerrados y solo recorren
+`acceso` para los días aún no consolidados. Tras aplicar la migración,
+poblar el histórico con `python scripts/consolidar_accesos.py`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "acceso_diario",
+        sa.Column("dia", sa.Date(), nullable=False),
+        sa.Column("vivienda_fk", sa.Integer(), sa.ForeignKey("vivienda.vivienda_pk"), nullable=False),
+        sa.Column("tipo", sa.String(30), nullable=False),
+        sa.Column("resultado", sa.String(30), nullable=False),
+        sa.Column("cantidad", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("dia", "vivienda_fk", "tipo", "resultado"),
+    )
+    op.create_table(
+        "acceso_diario_visitante",
+        sa.Column("dia", sa.Date(), nullable=False),
+        sa.Column("visita_fk", sa.Integer(), sa.ForeignKey("visita.visita_pk"), nullable=False),
+        sa.PrimaryKeyConstraint("dia", "visita_fk"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("acceso_diario_visitante")
+    op.drop_table("acceso_diario")
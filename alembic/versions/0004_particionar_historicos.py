@@ -0,0 +1,162 @@
+"""Particionamiento mensual de acceso, bitacora y notificacion_destino
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+Convierte cada tabla en una tabla particionada por rango de fecha_creado
+(una partición por mes) y copia los datos existentes:
+
+1. La tabla actual se renombra a <tabla>_legado
+2. Se crea la tabla particionada con las mismas columnas, defaults y CHECKs;
+   la PK pasa a ser (pk, fecha_creado) y fecha_creado queda NOT NULL
+3. Se crean las particiones desde el mes del registro más antiguo hasta
+   3 meses adelante, se copian las filas y se elimina <tabla>_legado
+
+La copia reescribe las tablas completas: ejecutar en ventana de mantenimiento.
+autorizacion_telefonica.acceso_ingreso_fk pierde su FK (PostgreSQL no admite
+referenciar solo acceso_pk en una tabla particionada) y pasa a tener índice.
+"""
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.config import get_settings
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Meses futuros que se crean junto con la tabla particionada. El DDL y la
+# aritmética de meses van escritos aquí (no se importan de app/) para que la
+# revisión no cambie si cambian los helpers de particiones.
+MESES_ADELANTE = 3
+
+
+def inicio_mes(dia: date) -> date:
+    return dia.replace(day=1)
+
+
+def sumar_meses(mes: date, cantidad: int) -> date:
+    indice = mes.year * 12 + mes.month - 1 + cantidad
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def crear_particiones(tabla: str, desde: date, hasta: date) -> None:
+    """Particiones mensuales <tabla>_AAAA_MM entre los meses de `desde` y `hasta`"""
+    mes = inicio_mes(desde)
+    while mes <= inicio_mes(hasta):
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS {tabla}_{mes.year:04d}_{mes.month:02d} "
+            f"PARTITION OF {tabla} "
+            f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{sumar_meses(mes, 1).isoformat()}')"
+        )
+        mes = sumar_meses(mes, 1)
+
+
+def fecha_hoy() -> date:
+    """Fecha local en la zona de `alembic -x zona=...` o, si no se pasa, TIMEZONE"""
+    zona = context.get_x_argument(as_dictionary=True).get("zona") or get_settings().TIMEZONE
+    return datetime.now(ZoneInfo(zona)).date()
+
+# tabla -> (columna pk, FKs salientes a recrear, expresión para fecha_creado nula)
+TABLAS = {
+    "acceso": (
+        "acceso_pk",
+        [
+            ("vivienda_visita_fk", "vivienda", "vivienda_pk"),
+            ("persona_guardia_fk", "persona", "persona_pk"),
+            ("persona_residente_autoriza_fk", "persona", "persona_pk"),
+            ("visita_ingreso_fk", "visita", "visita_pk"),
+            ("vehiculo_ingreso_fk", "vehiculo", "vehiculo_pk"),
+        ],
+        "COALESCE(fecha_actualizado, CURRENT_TIMESTAMP)",
+    ),
+    "bitacora": (
+        "bitacora_pk",
+        [("persona_actor_fk", "persona", "persona_pk")],
+        "CURRENT_TIMESTAMP",
+    ),
+    "notificacion_destino": (
+        "notificacion_destino_pk",
+        [
+            ("notificacion_envio_fk", "notificacion", "notificacion_pk"),
+            ("persona_receptor_fk", "persona", "persona_pk"),
+        ],
+        "COALESCE(fecha_actualizado, CURRENT_TIMESTAMP)",
+    ),
+}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    op.execute(
+        "ALTER TABLE autorizacion_telefonica "
+        "DROP CONSTRAINT IF EXISTS autorizacion_telefonica_acceso_ingreso_fk_fkey"
+    )
+    op.create_index(
+        "ix_autorizacion_telefonica_acceso_ingreso_fk",
+        "autorizacion_telefonica",
+        ["acceso_ingreso_fk"],
+    )
+    # esquema.sql no incluía fecha_creado en bitacora
+    op.execute(
+        "ALTER TABLE bitacora ADD COLUMN IF NOT EXISTS fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
+    )
+
+    hoy = fecha_hoy()
+    for tabla, (pk, fks, fecha_nula) in TABLAS.items():
+        legado = f"{tabla}_legado"
+        op.execute(f"UPDATE {tabla} SET fecha_creado = {fecha_nula} WHERE fecha_creado IS NULL")
+        op.execute(f"ALTER TABLE {tabla} RENAME TO {legado}")
+        op.execute(f"ALTER TABLE {legado} RENAME CONSTRAINT {tabla}_pkey TO {legado}_pkey")
+
+        op.execute(
+            f"CREATE TABLE {tabla} (LIKE {legado} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (fecha_creado)"
+        )
+        op.execute(f"ALTER TABLE {tabla} ALTER COLUMN fecha_creado SET NOT NULL")
+        op.execute(f"ALTER TABLE {tabla} ALTER COLUMN fecha_creado SET DEFAULT CURRENT_TIMESTAMP")
+        op.execute(f"ALTER TABLE {tabla} ADD PRIMARY KEY ({pk}, fecha_creado)")
+        # La secuencia del SERIAL pasa a la nueva tabla antes de borrar la anterior
+        op.execute(f"ALTER SEQUENCE {tabla}_{pk}_seq OWNED BY {tabla}.{pk}")
+        for columna, destino, columna_destino in fks:
+            op.create_foreign_key(
+                f"{tabla}_{columna}_fkey", tabla, destino, [columna], [columna_destino]
+            )
+
+        primera = conn.execute(sa.text(f"SELECT min(fecha_creado) FROM {legado}")).scalar()
+        desde = inicio_mes(primera.date()) if primera else inicio_mes(hoy)
+        crear_particiones(tabla, desde, sumar_meses(inicio_mes(hoy), MESES_ADELANTE))
+
+        op.execute(f"INSERT INTO {tabla} SELECT * FROM {legado}")
+        op.execute(f"DROP TABLE {legado}")
+
+
+def downgrade() -> None:
+    for tabla, (pk, fks, _) in TABLAS.items():
+        particionada = f"{tabla}_particionada"
+        op.execute(f"ALTER TABLE {tabla} RENAME TO {particionada}")
+        op.execute(f"ALTER TABLE {particionada} RENAME CONSTRAINT {tabla}_pkey TO {particionada}_pkey")
+        for columna, _, _ in fks:
+            op.execute(f"ALTER TABLE {particionada} DROP CONSTRAINT {tabla}_{columna}_fkey")
+
+        op.execute(f"CREATE TABLE {tabla} (LIKE {particionada} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        op.execute(f"ALTER TABLE {tabla} ADD PRIMARY KEY ({pk})")
+        op.execute(f"ALTER SEQUENCE {tabla}_{pk}_seq OWNED BY {tabla}.{pk}")
+        for columna, destino, columna_destino in fks:
+            op.create_foreign_key(
+                f"{tabla}_{columna}_fkey", tabla, destino, [columna], [columna_destino]
+            )
+        op.execute(f"INSERT INTO {tabla} SELECT * FROM {particionada}")
+        op.execute(f"DROP TABLE {particionada}")
+
+    op.drop_index("ix_autorizacion_telefonica_acceso_ingreso_fk", table_name="autorizacion_telefonica")
+    op.create_foreign_key(
+        "autorizacion_telefonica_acceso_ingreso_fk_fkey",
+        "autorizacion_telefonica", "acceso", ["acceso_ingreso_fk"], ["acceso_pk"]
+    )
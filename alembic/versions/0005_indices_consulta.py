@@ -0,0 +1,65 @@
+"""Índices compuestos y parciales para las consultas frecuentes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+Cada índice sigue el predicado (y el orden, en los listados paginados por
+cursor) de un endpoint frecuente; los parciales excluyen los registros con
+eliminado = true. Se crean CONCURRENTLY para no bloquear escrituras, salvo en
+acceso: PostgreSQL no admite CONCURRENTLY sobre una tabla particionada, así
+que allí el índice se crea en la tabla padre y se propaga a cada partición.
+`test_indices_explain.py` verifica con EXPLAIN que se usen.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+NO_ELIMINADO = sa.text("eliminado = false")
+
+# (nombre, tabla, columnas, predicado parcial)
+INDICES = [
+    ("ix_persona_correo_activa", "persona", ["correo"], sa.text("estado = 'activo'")),
+    ("ix_persona_foto_titular", "persona_foto", ["persona_titular_fk", "foto_pk"], NO_ELIMINADO),
+    ("ix_propietario_vivienda", "propietario_vivienda",
+     ["vivienda_propiedad_fk", "propietario_vivienda_pk"], NO_ELIMINADO),
+    ("ix_residente_persona_estado", "residente_vivienda", ["persona_residente_fk", "estado"], NO_ELIMINADO),
+    ("ix_residente_vivienda", "residente_vivienda",
+     ["vivienda_reside_fk", "residente_vivienda_pk"], NO_ELIMINADO),
+    ("ix_miembro_persona_estado", "miembro_vivienda", ["persona_miembro_fk", "estado"], NO_ELIMINADO),
+    ("ix_miembro_vivienda", "miembro_vivienda",
+     ["vivienda_familia_fk", "miembro_vivienda_pk"], NO_ELIMINADO),
+    ("ix_cuenta_persona_titular", "cuenta", ["persona_titular_fk"], None),
+    ("ix_visita_vivienda_fecha", "visita", ["vivienda_visita_fk", "fecha_creado", "visita_pk"], NO_ELIMINADO),
+    ("ix_qr_cuenta_fecha", "qr", ["cuenta_autoriza_fk", "fecha_creado", "qr_pk"], None),
+    ("ix_qr_vigentes", "qr", ["hora_fin_vigencia"], sa.text("estado = 'vigente' AND eliminado = false")),
+]
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_acceso_vivienda_fecha",
+        "acceso",
+        ["vivienda_visita_fk", "fecha_creado", "acceso_pk"],
+        postgresql_where=NO_ELIMINADO,
+    )
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas, parcial in INDICES:
+            op.create_index(
+                nombre,
+                tabla,
+                columnas,
+                postgresql_where=parcial,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nombre, tabla, _, _ in reversed(INDICES):
+            op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True)
+    op.drop_index("ix_acceso_vivienda_fecha", table_name="acceso")
@@ -0,0 +1,56 @@
+"""fecha_creado asignada por PostgreSQL en la zona horaria configurada
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+El default de fecha_creado pasa de CURRENT_TIMESTAMP (que al guardarse en
+TIMESTAMP sin zona depende del TimeZone de cada sesión) a
+timezone(TIMEZONE, now()): la misma hora local que calcula la aplicación.
+Con DB_FECHA_CREADO_SERVIDOR=True (por defecto) los modelos ya no envían
+fecha_creado y los INSERT masivos no evalúan un callable por fila.
+
+Solo cambia el default (metadatos): no reescribe tablas. En las tablas
+particionadas el cambio se propaga a las particiones. `admin` no está en
+esquema.sql, de ahí el IF EXISTS.
+"""
+from zoneinfo import ZoneInfo
+
+from alembic import context, op
+
+from app.config import get_settings
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def fecha_creado_servidor() -> str:
+    """
+    Default de fecha_creado: `timezone('<zona>', now())`. La zona sale de
+    `alembic -x zona=...` o, si no se pasa, de TIMEZONE en la configuración;
+    la expresión va escrita aquí para que la revisión no dependa de los modelos.
+    """
+    zona = context.get_x_argument(as_dictionary=True).get("zona") or get_settings().TIMEZONE
+    ZoneInfo(zona)  # Zona inválida: falla antes de tocar el esquema
+    return f"timezone('{zona}', now())"
+
+
+TABLAS = (
+    "vivienda", "persona", "persona_foto", "propietario_vivienda", "residente_vivienda",
+    "miembro_vivienda", "cuenta", "admin", "guardia", "evento_cuenta", "vehiculo",
+    "visita", "acceso", "autorizacion_telefonica", "autorizacion_codigo", "qr",
+    "notificacion", "notificacion_destino", "bitacora",
+)
+
+
+def upgrade() -> None:
+    expresion = fecha_creado_servidor()
+    for tabla in TABLAS:
+        op.execute(f"ALTER TABLE IF EXISTS {tabla} ALTER COLUMN fecha_creado SET DEFAULT {expresion}")
+
+
+def downgrade() -> None:
+    for tabla in TABLAS:
+        op.execute(f"ALTER TABLE IF EXISTS {tabla} ALTER COLUMN fecha_creado SET DEFAULT CURRENT_TIMESTAMP")
@@ -0,0 +1,60 @@
+"""Registro de tokens FCM por persona
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+dispositivo_fcm guarda los tokens de notificaciones push de cada persona.
+Los envíos masivos leen de aquí los tokens de las personas activas; los
+tokens que FCM reporta como inválidos se dan de baja (eliminado = TRUE).
+"""
+from zoneinfo import ZoneInfo
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.config import get_settings
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def fecha_creado_servidor() -> str:
+    """
+    Default de fecha_creado: `timezone('<zona>', now())`. La zona sale de
+    `alembic -x zona=...` o, si no se pasa, de TIMEZONE en la configuración;
+    la expresión va escrita aquí para que la revisión no dependa de los modelos.
+    """
+    zona = context.get_x_argument(as_dictionary=True).get("zona") or get_settings().TIMEZONE
+    ZoneInfo(zona)  # Zona inválida: falla antes de tocar el esquema
+    return f"timezone('{zona}', now())"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dispositivo_fcm",
+        sa.Column("dispositivo_fcm_pk", sa.Integer(), primary_key=True),
+        sa.Column("persona_fk", sa.Integer(), sa.ForeignKey("persona.persona_pk"), nullable=False),
+        sa.Column("token", sa.String(512), nullable=False, unique=True),
+        sa.Column("plataforma", sa.String(10), nullable=False),
+        sa.Column("eliminado", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("motivo_eliminado", sa.Text()),
+        sa.Column("fecha_creado", sa.DateTime(), server_default=sa.text(fecha_creado_servidor())),
+        sa.Column("usuario_creado", sa.String(20), nullable=False),
+        sa.Column("fecha_actualizado", sa.DateTime()),
+        sa.Column("usuario_actualizado", sa.String(20)),
+        sa.CheckConstraint(
+            "plataforma IN ('android','ios','web')", name="chk_dispositivo_fcm_plataforma"
+        ),
+    )
+    op.create_index(
+        "ix_dispositivo_fcm_persona", "dispositivo_fcm", ["persona_fk"],
+        postgresql_where=sa.text("eliminado = FALSE"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dispositivo_fcm_persona", table_name="dispositivo_fcm")
+    op.drop_table("dispositivo_fcm")
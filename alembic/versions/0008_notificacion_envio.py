@@ -0,0 +1,70 @@
+"""Bandeja de salida (outbox) de notificaciones push
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+notificacion_envio desacopla las solicitudes HTTP del envío por FCM: los
+servicios insertan aquí una fila en la misma transacción que la
+notificación y sus destinos, y el despachador (tarea de la API o
+`python scripts/despachar_notificaciones.py`) las procesa por lotes con
+reintentos. El índice parcial cubre la búsqueda de filas pendientes.
+"""
+from zoneinfo import ZoneInfo
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.config import get_settings
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def fecha_creado_servidor() -> str:
+    """
+    Default de fecha_creado: `timezone('<zona>', now())`. La zona sale de
+    `alembic -x zona=...` o, si no se pasa, de TIMEZONE en la configuración;
+    la expresión va escrita aquí para que la revisión no dependa de los modelos.
+    """
+    zona = context.get_x_argument(as_dictionary=True).get("zona") or get_settings().TIMEZONE
+    ZoneInfo(zona)  # Zona inválida: falla antes de tocar el esquema
+    return f"timezone('{zona}', now())"
+
+
+def upgrade() -> None:
+    ahora = sa.text(fecha_creado_servidor())
+    op.create_table(
+        "notificacion_envio",
+        sa.Column("notificacion_envio_pk", sa.Integer(), primary_key=True),
+        sa.Column(
+            "notificacion_fk", sa.Integer(),
+            sa.ForeignKey("notificacion.notificacion_pk"), nullable=False
+        ),
+        sa.Column("titulo", sa.String(100), nullable=False),
+        sa.Column("datos", postgresql.JSONB()),
+        sa.Column("estado", sa.String(12), nullable=False, server_default="pendiente"),
+        sa.Column("intentos", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("proximo_intento", sa.DateTime(), nullable=False, server_default=ahora),
+        sa.Column("ultimo_error", sa.Text()),
+        sa.Column("fecha_creado", sa.DateTime(), server_default=ahora),
+        sa.Column("usuario_creado", sa.String(20), nullable=False),
+        sa.Column("fecha_actualizado", sa.DateTime()),
+        sa.Column("usuario_actualizado", sa.String(20)),
+        sa.CheckConstraint(
+            "estado IN ('pendiente','procesando','enviado','fallido')",
+            name="chk_notificacion_envio_estado"
+        ),
+    )
+    op.create_index(
+        "ix_notificacion_envio_pendiente", "notificacion_envio", ["proximo_intento"],
+        postgresql_where=sa.text("estado IN ('pendiente', 'procesando')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notificacion_envio_pendiente", table_name="notificacion_envio")
+    op.drop_table("notificacion_envio")
@@ -0,0 +1,32 @@
+"""Índice de destinos pendientes por notificación
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+El despachador de push busca y actualiza los destinos de una notificación
+aún no entregados (notificacion_envio_fk, persona_receptor_fk). Sin índice,
+cada despacho recorría todas las particiones de notificacion_destino. Como
+la tabla está particionada no admite CONCURRENTLY: el índice se crea en la
+tabla padre y se propaga a cada partición.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_notificacion_destino_pendiente",
+        "notificacion_destino",
+        ["notificacion_envio_fk", "persona_receptor_fk"],
+        postgresql_where=sa.text("entregada = false AND eliminado = false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notificacion_destino_pendiente", table_name="notificacion_destino")
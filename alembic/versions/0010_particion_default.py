@@ -0,0 +1,33 @@
+"""Partición DEFAULT de las tablas particionadas por mes
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+La API ya no crea las particiones futuras (PARTICIONES_MESES_ADELANTE=0 por
+defecto): lo hace el job programado `scripts/particiones.py crear`. Si ese job
+no corre a tiempo, un INSERT en un mes sin partición fallaría; con una
+partición DEFAULT la fila se guarda y `crear` la mueve a su mes después.
+
+En downgrade la partición DEFAULT se desacopla y queda como tabla suelta
+(<tabla>_default) para revisar o archivar sus filas, igual que
+`scripts/particiones.py desacoplar`.
+"""
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+TABLAS = ("acceso", "bitacora", "notificacion_destino")
+
+
+def upgrade() -> None:
+    for tabla in TABLAS:
+        op.execute(f"CREATE TABLE IF NOT EXISTS {tabla}_default PARTITION OF {tabla} DEFAULT")
+
+
+def downgrade() -> None:
+    for tabla in TABLAS:
+        op.execute(f"ALTER TABLE {tabla} DETACH PARTITION {tabla}_default")
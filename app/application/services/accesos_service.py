@@ -6,16 +6,35 @@ Mantiene la arquitectura hexagonal separando la lógica
 del acceso a datos y endpoints.
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.infrastructure.db.models import Acceso, Vivienda, Visita, Persona
-from datetime import datetime, date
-from typing import List, Dict, Optional, Tuple
+from sqlalchemy.orm import Session, Query, aliased
+from sqlalchemy import Integer, and_, cast, func, insert, select, text, union_all
+from sqlalchemy.engine import Row
+from app.infrastructure.db.models import (
+    Acceso, AccesoDiario, AccesoDiarioVisitante, Vivienda, Visita, Persona
+)
+from app.infrastructure.utils.time_utils import ahora_sin_tz
+from datetime import datetime, date, timedelta
+from typing import Dict, Optional, Tuple
+
+# Persona aparece dos veces en el historial: como guardia y como residente que autoriza
+PersonaGuardia = aliased(Persona, name="guardia")
+PersonaResidente = aliased(Persona, name="residente_autoriza")
 
 
 class AccesosService:
     """Servicio para gestionar accesos y estadísticas"""
     
+    # Agrupación de resultados para las estadísticas generales
+    RESULTADOS_EXITOSOS = ("autorizado",)
+    RESULTADOS_RECHAZADOS = (
+        "rechazado", "no_autorizado", "fallo_biometrico", "fallo_placa",
+        "codigo_expirado", "codigo_invalido", "cuenta_bloqueada"
+    )
+    RESULTADOS_PENDIENTES = ("error_sistema", "cancelado")
+    
+    # Clave del advisory lock de PostgreSQL que serializa la consolidación
+    CLAVE_BLOQUEO_CONSOLIDACION = 730103
+    
     @staticmethod
     def obtener_accesos_vivienda(
         db: Session,
@@ -24,7 +43,7 @@ class AccesosService:
         fecha_fin: Optional[date] = None,
         tipo: Optional[str] = None,
         resultado: Optional[str] = None
-    ) -> Tuple[Optional[Vivienda], List[Acceso]]:
+    ) -> Tuple[Optional[Vivienda], Optional[Query]]:
         """
         Obtiene accesos de una vivienda con filtros opcionales.
         
@@ -37,7 +56,10 @@ class AccesosService:
             resultado: Filtro por resultado (opcional)
             
         Returns:
-            Tupla (Vivienda, Lista de Accesos)
+            Tupla (Vivienda, Query sin ordenar ni limitar), para que el endpoint
+            la pagine por cursor o la transmita. Cada fila trae las columnas del
+            acceso y los nombres de guardia, residente y visita resueltos con
+            LEFT JOIN en la misma consulta (ver `obtener_detalles_acceso`)
         """
         vivienda = db.query(Vivienda).filter(
             Vivienda.vivienda_pk == vivienda_id,
@@ -45,9 +67,33 @@ class AccesosService:
         ).first()
         
         if not vivienda:
-            return None, []
+            return None, None
         
-        query = db.query(Acceso).filter(
+        query = db.query(
+            Acceso.acceso_pk,
+            Acceso.tipo,
+            Acceso.vivienda_visita_fk,
+            Acceso.resultado,
+            Acceso.motivo,
+            Acceso.placa_detectada,
+            Acceso.biometria_ok,
+            Acceso.placa_ok,
+            Acceso.intentos,
+            Acceso.observacion,
+            Acceso.fecha_creado,
+            PersonaGuardia.nombres.label("guardia_nombres"),
+            PersonaGuardia.apellidos.label("guardia_apellidos"),
+            PersonaResidente.nombres.label("residente_nombres"),
+            PersonaResidente.apellidos.label("residente_apellidos"),
+            Visita.nombres.label("visita_nombres"),
+            Visita.apellidos.label("visita_apellidos"),
+        ).outerjoin(
+            PersonaGuardia, PersonaGuardia.persona_pk == Acceso.persona_guardia_fk
+        ).outerjoin(
+            PersonaResidente, PersonaResidente.persona_pk == Acceso.persona_residente_autoriza_fk
+        ).outerjoin(
+            Visita, Visita.visita_pk == Acceso.visita_ingreso_fk
+        ).filter(
             Acceso.vivienda_visita_fk == vivienda_id,
             Acceso.eliminado == False
         )
@@ -68,69 +114,145 @@ class AccesosService:
         if resultado:
             query = query.filter(Acceso.resultado == resultado)
         
-        accesos = query.order_by(Acceso.fecha_creado.desc()).all()
-        
-        return vivienda, accesos
+        return vivienda, query
     
     @staticmethod
-    def obtener_detalles_acceso(
-        db: Session,
-        acceso: Acceso
-    ) -> Dict:
+    def obtener_detalles_acceso(fila: Row) -> Dict:
         """
-        Enriquece los datos de un acceso con información relacionada.
+        Convierte una fila de `obtener_accesos_vivienda` en el detalle del acceso.
+        
+        Los nombres relacionados ya vienen en la fila, por lo que no se hace
+        ninguna consulta adicional por acceso.
         
         Args:
-            db: Sesión de base de datos
-            acceso: Objeto Acceso
+            fila: Fila con columnas del acceso y nombres de guardia/residente/visita
             
         Returns:
             Diccionario con datos enriquecidos
         """
-        # Obtener guardia si existe
-        guardia_nombre = None
-        if acceso.persona_guardia_fk:
-            guardia = db.query(Persona).filter(
-                Persona.persona_pk == acceso.persona_guardia_fk
-            ).first()
-            if guardia:
-                guardia_nombre = f"{guardia.nombres} {guardia.apellidos}"
-        
-        # Obtener residente que autoriza si existe
-        residente_nombre = None
-        if acceso.persona_residente_autoriza_fk:
-            residente = db.query(Persona).filter(
-                Persona.persona_pk == acceso.persona_residente_autoriza_fk
-            ).first()
-            if residente:
-                residente_nombre = f"{residente.nombres} {residente.apellidos}"
-        
-        # Obtener datos de visita si existe
-        visita_nombres = None
-        if acceso.visita_ingreso_fk:
-            visita = db.query(Visita).filter(
-                Visita.visita_pk == acceso.visita_ingreso_fk
-            ).first()
-            if visita:
-                visita_nombres = f"{visita.nombres} {visita.apellidos}"
+        def nombre_completo(nombres: Optional[str], apellidos: Optional[str]) -> Optional[str]:
+            return f"{nombres} {apellidos}" if nombres is not None else None
         
         return {
-            "acceso_pk": acceso.acceso_pk,
-            "tipo": acceso.tipo,
-            "vivienda_visita_fk": acceso.vivienda_visita_fk,
-            "resultado": acceso.resultado,
-            "motivo": acceso.motivo,
-            "placa_detectada": acceso.placa_detectada,
-            "biometria_ok": acceso.biometria_ok,
-            "placa_ok": acceso.placa_ok,
-            "intentos": acceso.intentos,
-            "observacion": acceso.observacion,
-            "fecha_creado": acceso.fecha_creado,
-            "guardia_nombre": guardia_nombre,
-            "residente_autoriza_nombre": residente_nombre,
-            "visita_nombres": visita_nombres
+            "acceso_pk": fila.acceso_pk,
+            "tipo": fila.tipo,
+            "vivienda_visita_fk": fila.vivienda_visita_fk,
+            "resultado": fila.resultado,
+            "motivo": fila.motivo,
+            "placa_detectada": fila.placa_detectada,
+            "biometria_ok": fila.biometria_ok,
+            "placa_ok": fila.placa_ok,
+            "intentos": fila.intentos,
+            "observacion": fila.observacion,
+            "fecha_creado": fila.fecha_creado,
+            "guardia_nombre": nombre_completo(fila.guardia_nombres, fila.guardia_apellidos),
+            "residente_autoriza_nombre": nombre_completo(fila.residente_nombres, fila.residente_apellidos),
+            "visita_nombres": nombre_completo(fila.visita_nombres, fila.visita_apellidos)
         }
     
+    @staticmethod
+    def ultimo_dia_consolidado(db: Session) -> Optional[date]:
+        """
+        Último día presente en acceso_diario.
+        
+        La consolidación siempre procesa días completos en orden, por lo que
+        todos los días hasta este están en el resumen y los posteriores se
+        leen de `acceso`.
+        """
+        return db.query(func.max(AccesoDiario.dia)).scalar()
+    
+    @staticmethod
+    def consolidar_dias(db: Session, desde: date, hasta: date) -> int:
+        """
+        Recalcula acceso_diario y acceso_diario_visitante para [desde, hasta].
+        
+        Reemplaza los días del rango en una sola transacción, así que se puede
+        repetir sin duplicar (p. ej. tras eliminar accesos de días pasados).
+        
+        Args:
+            db: Sesión de base de datos
+            desde: Primer día a consolidar (inclusive)
+            hasta: Último día a consolidar (inclusive)
+            
+        Returns:
+            Cantidad de filas escritas en acceso_diario
+        """
+        inicio = datetime.combine(desde, datetime.min.time())
+        fin = datetime.combine(hasta + timedelta(days=1), datetime.min.time())
+        dia = func.date(Acceso.fecha_creado)
+        filtros = [
+            Acceso.eliminado == False,
+            Acceso.fecha_creado >= inicio,
+            Acceso.fecha_creado < fin,
+        ]
+        
+        try:
+            db.query(AccesoDiario).filter(
+                AccesoDiario.dia >= desde, AccesoDiario.dia <= hasta
+            ).delete(synchronize_session=False)
+            db.query(AccesoDiarioVisitante).filter(
+                AccesoDiarioVisitante.dia >= desde, AccesoDiarioVisitante.dia <= hasta
+            ).delete(synchronize_session=False)
+            
+            escritas = db.execute(
+                insert(AccesoDiario).from_select(
+                    ["dia", "vivienda_fk", "tipo", "resultado", "cantidad"],
+                    select(
+                        dia, Acceso.vivienda_visita_fk, Acceso.tipo, Acceso.resultado, func.count()
+                    ).where(*filtros).group_by(
+                        dia, Acceso.vivienda_visita_fk, Acceso.tipo, Acceso.resultado
+                    )
+                )
+            ).rowcount
+            
+            db.execute(
+                insert(AccesoDiarioVisitante).from_select(
+                    ["dia", "visita_fk"],
+                    select(dia, Acceso.visita_ingreso_fk).join(
+                        Visita, Visita.visita_pk == Acceso.visita_ingreso_fk
+                    ).where(*filtros, Visita.eliminado == False).distinct()
+                )
+            )
+            db.commit()
+            return escritas
+        except Exception:
+            db.rollback()
+            raise
+    
+    @staticmethod
+    def consolidar_pendientes(db: Session) -> int:
+        """
+        Consolida los días cerrados (hasta ayer) posteriores al último consolidado.
+        
+        Pensado para ejecutarse periódicamente; si no hay días nuevos no escribe nada.
+        En PostgreSQL toma `pg_try_advisory_xact_lock`: si otra instancia o el
+        script ya está consolidando, sale sin hacer nada. El bloqueo se libera
+        al confirmar o revertir la transacción.
+        
+        Returns:
+            Cantidad de filas escritas en acceso_diario
+        """
+        if db.get_bind().dialect.name == "postgresql" and not db.execute(
+            select(func.pg_try_advisory_xact_lock(AccesosService.CLAVE_BLOQUEO_CONSOLIDACION))
+        ).scalar():
+            return 0
+        
+        hasta = ahora_sin_tz().date() - timedelta(days=1)
+        ultimo = AccesosService.ultimo_dia_consolidado(db)
+        if ultimo is not None:
+            desde = ultimo + timedelta(days=1)
+        else:
+            primer_acceso = db.query(func.min(Acceso.fecha_creado)).filter(
+                Acceso.eliminado == False
+            ).scalar()
+            if primer_acceso is None:
+                return 0
+            desde = primer_acceso.date()
+        
+        if desde > hasta:
+            return 0
+        return AccesosService.consolidar_dias(db, desde, hasta)
+    
     @staticmethod
     def obtener_estadisticas_admin(
         db: Session,
@@ -147,116 +269,136 @@ class AccesosService:
             
         Returns:
             Diccionario con estadísticas
+            
+        Los días ya consolidados se leen de acceso_diario y solo los posteriores
+        (normalmente el día en curso) se agregan desde `acceso`. Se resuelve con
+        dos consultas agregadas; ninguna fila de acceso se carga en memoria.
         """
-        query = db.query(Acceso).filter(Acceso.eliminado == False)
-        
+        corte = AccesosService.ultimo_dia_consolidado(db)
+        
+        # Días consolidados del rango: conteos y visitantes desde el resumen
+        filtros_resumen = []
+        filtros_visitantes_resumen = []
+        if corte is not None:
+            filtros_resumen.append(AccesoDiario.dia <= corte)
+            filtros_visitantes_resumen.append(AccesoDiarioVisitante.dia <= corte)
         if fecha_inicio:
-            query = query.filter(
-                Acceso.fecha_creado >= datetime.combine(fecha_inicio, datetime.min.time())
-            )
-        
+            filtros_resumen.append(AccesoDiario.dia >= fecha_inicio)
+            filtros_visitantes_resumen.append(AccesoDiarioVisitante.dia >= fecha_inicio)
         if fecha_fin:
-            query = query.filter(
-                Acceso.fecha_creado <= datetime.combine(fecha_fin, datetime.max.time())
+            filtros_resumen.append(AccesoDiario.dia <= fecha_fin)
+            filtros_visitantes_resumen.append(AccesoDiarioVisitante.dia <= fecha_fin)
+        
+        # Días sin consolidar: agregados directamente desde acceso
+        filtros_crudos = [Acceso.eliminado == False]
+        if corte is not None:
+            filtros_crudos.append(
+                Acceso.fecha_creado >= datetime.combine(corte + timedelta(days=1), datetime.min.time())
             )
-        
-        accesos_all = query.all()
-        
-        # Estadísticas generales
-        total = len(accesos_all)
-        exitosos = len([a for a in accesos_all if a.resultado == "autorizado"])
-        rechazados = len([a for a in accesos_all if a.resultado in [
-            "rechazado", "no_autorizado", "fallo_biometrico", "fallo_placa",
-            "codigo_expirado", "codigo_invalido", "cuenta_bloqueada"
-        ]])
-        pendientes = len([a for a in accesos_all if a.resultado in [
-            "error_sistema", "cancelado"
-        ]])
-        
-        # Visitantes únicos en el período
-        visitantes_query = db.query(func.count(func.distinct(Visita.visita_pk))).join(
-            Acceso, Visita.visita_pk == Acceso.visita_ingreso_fk
-        ).filter(
-            Visita.eliminado == False,
-            Acceso.eliminado == False
-        )
-        
         if fecha_inicio:
-            visitantes_query = visitantes_query.filter(
+            filtros_crudos.append(
                 Acceso.fecha_creado >= datetime.combine(fecha_inicio, datetime.min.time())
             )
         if fecha_fin:
-            visitantes_query = visitantes_query.filter(
+            filtros_crudos.append(
                 Acceso.fecha_creado <= datetime.combine(fecha_fin, datetime.max.time())
             )
         
-        visitantes_unicos = visitantes_query.scalar() or 0
-        
-        # Accesos por tipo
-        accesos_por_tipo = []
-        tipos_query = db.query(
-            Acceso.tipo,
-            func.count(Acceso.acceso_pk).label('cantidad')
-        ).filter(Acceso.eliminado == False)
-        
-        if fecha_inicio:
-            tipos_query = tipos_query.filter(
-                Acceso.fecha_creado >= datetime.combine(fecha_inicio, datetime.min.time())
+        consultas = [
+            select(
+                Acceso.vivienda_visita_fk.label("vivienda_fk"),
+                Acceso.tipo,
+                Acceso.resultado,
+                # Mismo tipo que acceso_diario.cantidad para que SUM devuelva entero
+                cast(func.count(), Integer).label("cantidad")
+            ).where(*filtros_crudos).group_by(
+                Acceso.vivienda_visita_fk, Acceso.tipo, Acceso.resultado
             )
-        if fecha_fin:
-            tipos_query = tipos_query.filter(
-                Acceso.fecha_creado <= datetime.combine(fecha_fin, datetime.max.time())
-            )
-        
-        for tipo, cantidad in tipos_query.group_by(Acceso.tipo).all():
-            accesos_por_tipo.append({"tipo": tipo, "cantidad": cantidad})
-        
-        # Accesos por resultado
-        accesos_por_resultado = []
-        resultado_query = db.query(
-            Acceso.resultado,
-            func.count(Acceso.acceso_pk).label('cantidad')
-        ).filter(Acceso.eliminado == False)
-        
-        if fecha_inicio:
-            resultado_query = resultado_query.filter(
-                Acceso.fecha_creado >= datetime.combine(fecha_inicio, datetime.min.time())
+        ]
+        visitantes = [
+            select(Acceso.visita_ingreso_fk.label("visita_fk")).join(
+                Visita, and_(
+                    Visita.visita_pk == Acceso.visita_ingreso_fk,
+                    Visita.eliminado == False
+                )
+            ).where(*filtros_crudos)
+        ]
+        if corte is not None:
+            consultas.append(
+                select(
+                    AccesoDiario.vivienda_fk,
+                    AccesoDiario.tipo,
+                    AccesoDiario.resultado,
+                    AccesoDiario.cantidad
+                ).where(*filtros_resumen)
             )
-        if fecha_fin:
-            resultado_query = resultado_query.filter(
-                Acceso.fecha_creado <= datetime.combine(fecha_fin, datetime.max.time())
+            visitantes.append(
+                select(AccesoDiarioVisitante.visita_fk).where(*filtros_visitantes_resumen)
             )
         
-        for resultado, cantidad in resultado_query.group_by(Acceso.resultado).all():
-            accesos_por_resultado.append({"resultado": resultado, "cantidad": cantidad})
-        
-        # Top viviendas
-        from app.infrastructure.db.models import Vivienda
+        fuente = union_all(*consultas).subquery("fuente")
+        visitantes_fuente = union_all(*visitantes).subquery("visitantes")
+        visitantes_unicos_q = select(
+            func.count(func.distinct(visitantes_fuente.c.visita_fk))
+        ).scalar_subquery()
+        
+        def suma(condicion=None):
+            cantidad = func.sum(fuente.c.cantidad)
+            if condicion is not None:
+                cantidad = cantidad.filter(condicion)
+            return func.coalesce(cantidad, 0)
+        
+        # Consulta 1: totales, visitantes únicos, por tipo y por resultado en una
+        # sola pasada (GROUPING SETS + agregados con FILTER)
+        filas = db.query(
+            func.grouping(fuente.c.tipo).label("sin_tipo"),
+            func.grouping(fuente.c.resultado).label("sin_resultado"),
+            fuente.c.tipo,
+            fuente.c.resultado,
+            suma().label("total"),
+            suma(fuente.c.resultado.in_(AccesosService.RESULTADOS_EXITOSOS)).label("exitosos"),
+            suma(fuente.c.resultado.in_(AccesosService.RESULTADOS_RECHAZADOS)).label("rechazados"),
+            suma(fuente.c.resultado.in_(AccesosService.RESULTADOS_PENDIENTES)).label("pendientes"),
+            visitantes_unicos_q.label("visitantes_unicos"),
+        ).select_from(
+            fuente
+        ).group_by(
+            func.grouping_sets(text("()"), fuente.c.tipo, fuente.c.resultado)
+        ).all()
+        
+        generales = {"total": 0, "exitosos": 0, "rechazados": 0, "pendientes": 0}
+        visitantes_unicos = 0
+        accesos_por_tipo = []
+        accesos_por_resultado = []
+        for fila in filas:
+            if fila.sin_tipo and fila.sin_resultado:
+                # Conjunto vacío (): totales del período
+                generales = {
+                    "total": fila.total,
+                    "exitosos": fila.exitosos,
+                    "rechazados": fila.rechazados,
+                    "pendientes": fila.pendientes
+                }
+                visitantes_unicos = fila.visitantes_unicos
+            elif not fila.sin_tipo:
+                accesos_por_tipo.append({"tipo": fila.tipo, "cantidad": fila.total})
+            else:
+                accesos_por_resultado.append({"resultado": fila.resultado, "cantidad": fila.total})
+        
+        # Consulta 2: top viviendas (necesita ordenar y limitar por vivienda)
         viviendas_top = []
-        top_query = db.query(
+        for vivienda_pk, manzana, villa, cantidad in db.query(
             Vivienda.vivienda_pk,
             Vivienda.manzana,
             Vivienda.villa,
-            func.count(Acceso.acceso_pk).label('cantidad_accesos')
+            func.sum(fuente.c.cantidad).label('cantidad_accesos')
         ).join(
-            Acceso, Vivienda.vivienda_pk == Acceso.vivienda_visita_fk
+            fuente, Vivienda.vivienda_pk == fuente.c.vivienda_fk
         ).filter(
-            Acceso.eliminado == False,
             Vivienda.estado == "activo"
-        )
-        
-        if fecha_inicio:
-            top_query = top_query.filter(
-                Acceso.fecha_creado >= datetime.combine(fecha_inicio, datetime.min.time())
-            )
-        if fecha_fin:
-            top_query = top_query.filter(
-                Acceso.fecha_creado <= datetime.combine(fecha_fin, datetime.max.time())
-            )
-        
-        for vivienda_pk, manzana, villa, cantidad in top_query.group_by(
+        ).group_by(
             Vivienda.vivienda_pk, Vivienda.manzana, Vivienda.villa
-        ).order_by(func.count(Acceso.acceso_pk).desc()).limit(10).all():
+        ).order_by(func.sum(fuente.c.cantidad).desc()).limit(10).all():
             viviendas_top.append({
                 "vivienda_id": vivienda_pk,
                 "manzana": manzana,
@@ -271,12 +413,7 @@ class AccesosService:
         
         return {
             "periodo": periodo,
-            "estadisticas_generales": {
-                "total": total,
-                "exitosos": exitosos,
-                "rechazados": rechazados,
-                "pendientes": pendientes
-            },
+            "estadisticas_generales": generales,
             "cantidad_visitantes_unicos": visitantes_unicos,
             "accesos_por_tipo": accesos_por_tipo,
             "accesos_por_resultado": accesos_por_resultado,
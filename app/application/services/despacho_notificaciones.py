@@ -0,0 +1,220 @@
+"""
+Despachador de la bandeja de salida de notificaciones (notificacion_envio)
+
+Los servicios registran la notificación, sus destinos y una fila en
+notificacion_envio en una sola transacción y responden sin esperar a FCM.
+El despachador (tarea periódica de la API o scripts/despachar_notificaciones.py)
+toma las filas pendientes por lotes, envía el push y registra el resultado.
+
+- Reserva con `FOR UPDATE SKIP LOCKED`: varias instancias pueden despachar a
+  la vez sin tomar la misma fila. La reserva vence en RESERVA_SEGUNDOS; si el
+  proceso muere a mitad de un envío, la fila se retoma al vencer.
+- Los errores transitorios (red, FCM no disponible) se reintentan con espera
+  exponencial; cada reintento solo envía a los destinos aún no entregados.
+  Tras NOTIFICACIONES_MAX_INTENTOS la fila queda como 'fallido'.
+"""
+
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.infrastructure.db.dispositivo_repository import DispositivoFCMRepository
+from app.infrastructure.db.models import Notificacion, NotificacionDestino, NotificacionEnvio
+from app.infrastructure.notifications.fcm_client import FCMClient, get_fcm_client
+from app.infrastructure.utils.time_utils import ahora_sin_tz
+
+settings = get_settings()
+
+# Tiempo máximo que una fila queda reservada ('procesando') por un despachador
+RESERVA_SEGUNDOS = 300
+USUARIO_DESPACHADOR = "despachador"
+
+
+def espera_reintento(intentos: int) -> timedelta:
+    """
+    Espera antes del siguiente intento: exponencial desde
+    NOTIFICACIONES_REINTENTO_SEGUNDOS, acotada por NOTIFICACIONES_REINTENTO_MAX_SEGUNDOS
+
+    Example:
+        >>> espera_reintento(3).total_seconds()   # con 30 s de base
+        120.0
+    """
+    segundos = settings.NOTIFICACIONES_REINTENTO_SEGUNDOS * 2 ** max(intentos - 1, 0)
+    return timedelta(seconds=min(segundos, settings.NOTIFICACIONES_REINTENTO_MAX_SEGUNDOS))
+
+
+class DespachadorNotificaciones:
+    """Procesa por lotes la bandeja de salida de notificaciones push"""
+
+    def __init__(self, db: Session, fcm: Optional[FCMClient] = None):
+        self.db = db
+        self._fcm = fcm
+        self.dispositivos = DispositivoFCMRepository(db)
+
+    @property
+    def fcm(self) -> FCMClient:
+        """
+        Cliente FCM compartido del proceso. Se obtiene recién al enviar, así
+        que un ciclo con la bandeja vacía no inicializa Firebase
+        """
+        if self._fcm is None:
+            self._fcm = get_fcm_client()
+        return self._fcm
+
+    def procesar_pendientes(self, limite: Optional[int] = None) -> int:
+        """
+        Reserva y despacha hasta `limite` envíos vencidos.
+
+        Returns:
+            Cantidad de envíos procesados (exitosos, reprogramados o fallidos)
+        """
+        envios = self._reservar(limite or settings.NOTIFICACIONES_DESPACHO_LOTE)
+        for envio in envios:
+            try:
+                error = self._despachar(envio)
+            except Exception as e:
+                self.db.rollback()
+                print(f"Error despachando notificación {envio.notificacion_fk}: {e}")
+                error = str(e)
+            self._finalizar(envio.notificacion_envio_pk, envio.intentos, error)
+        return len(envios)
+
+    def _reservar(self, limite: int) -> List:
+        """
+        Marca como 'procesando' los envíos pendientes vencidos (o con la
+        reserva vencida) en un solo UPDATE ... RETURNING y confirma
+        """
+        ahora = ahora_sin_tz()
+        vencidos = select(NotificacionEnvio.notificacion_envio_pk).where(
+            NotificacionEnvio.estado.in_(("pendiente", "procesando")),
+            NotificacionEnvio.proximo_intento <= ahora
+        ).order_by(
+            NotificacionEnvio.proximo_intento
+        ).limit(limite).with_for_update(skip_locked=True)
+
+        envios = self.db.execute(
+            update(NotificacionEnvio).where(
+                NotificacionEnvio.notificacion_envio_pk.in_(vencidos.scalar_subquery())
+            ).values(
+                estado="procesando",
+                intentos=NotificacionEnvio.intentos + 1,
+                proximo_intento=ahora + timedelta(seconds=RESERVA_SEGUNDOS),
+                fecha_actualizado=ahora,
+                usuario_actualizado=USUARIO_DESPACHADOR
+            ).returning(
+                NotificacionEnvio.notificacion_envio_pk,
+                NotificacionEnvio.notificacion_fk,
+                NotificacionEnvio.titulo,
+                NotificacionEnvio.datos,
+                NotificacionEnvio.intentos
+            ).execution_options(synchronize_session=False)
+        ).all()
+        self.db.commit()
+        return envios
+
+    def _despachar(self, envio) -> Optional[str]:
+        """
+        Envía el push a los tokens de los destinos no entregados y registra el
+        resultado en bloque: entregada para las personas con algún envío exitoso,
+        error para las demás, y baja de los tokens que FCM reporta como inválidos.
+        Confirma la transacción.
+
+        Returns:
+            None si no quedan errores que reintentar, o la descripción del error
+        """
+        mensaje = self.db.execute(
+            select(Notificacion.mensaje).where(
+                Notificacion.notificacion_pk == envio.notificacion_fk
+            )
+        ).scalar_one()
+        destinos = self.dispositivos.tokens_pendientes_de_notificacion(envio.notificacion_fk)
+        if not destinos:
+            return None
+
+        persona_por_token = {token: persona_id for persona_id, token in destinos}
+        resultado = self.fcm.enviar_masivo(
+            list(persona_por_token), envio.titulo, mensaje, envio.datos or {}
+        )
+
+        entregadas = {persona_por_token[token] for token in resultado.exitosos}
+        # Personas sin ningún envío exitoso, agrupadas por mensaje de error
+        error_por_persona: Dict[int, str] = {}
+        for token, error in resultado.fallidos.items():
+            persona_id = persona_por_token[token]
+            if persona_id not in entregadas:
+                error_por_persona.setdefault(persona_id, error)
+        personas_por_error: Dict[str, List[int]] = {}
+        for persona_id, error in error_por_persona.items():
+            personas_por_error.setdefault(error, []).append(persona_id)
+
+        ahora = ahora_sin_tz()
+        destinos_notificacion = update(NotificacionDestino).where(
+            NotificacionDestino.notificacion_envio_fk == envio.notificacion_fk
+        ).execution_options(synchronize_session=False)
+        if entregadas:
+            self.db.execute(
+                destinos_notificacion.where(
+                    NotificacionDestino.persona_receptor_fk.in_(entregadas)
+                ).values(
+                    entregada=True,
+                    hora_entregado=ahora,
+                    error=None,
+                    fecha_actualizado=ahora,
+                    usuario_actualizado=USUARIO_DESPACHADOR
+                )
+            )
+        for error, personas in personas_por_error.items():
+            self.db.execute(
+                destinos_notificacion.where(
+                    NotificacionDestino.persona_receptor_fk.in_(personas)
+                ).values(
+                    error=error,
+                    fecha_actualizado=ahora,
+                    usuario_actualizado=USUARIO_DESPACHADOR
+                )
+            )
+
+        self.dispositivos.dar_de_baja(
+            resultado.invalidos,
+            motivo="Token inválido según FCM",
+            usuario=USUARIO_DESPACHADOR
+        )
+        self.db.commit()
+
+        # Se reintenta solo si alguna persona sin entregar tiene tokens con error
+        # transitorio (los inválidos ya se dieron de baja)
+        invalidos = set(resultado.invalidos)
+        transitorios = [
+            error for token, error in resultado.fallidos.items()
+            if token not in invalidos and persona_por_token[token] not in entregadas
+        ]
+        if transitorios:
+            return f"{len(transitorios)} token(s) con error: {transitorios[0]}"
+        return None
+
+    def _finalizar(self, envio_id: int, intentos: int, error: Optional[str]) -> None:
+        """Marca el envío como enviado, lo reprograma con espera exponencial o lo da por fallido"""
+        ahora = ahora_sin_tz()
+        if error is None:
+            valores = {"estado": "enviado", "ultimo_error": None}
+        elif intentos >= settings.NOTIFICACIONES_MAX_INTENTOS:
+            valores = {"estado": "fallido", "ultimo_error": error}
+        else:
+            valores = {
+                "estado": "pendiente",
+                "ultimo_error": error,
+                "proximo_intento": ahora + espera_reintento(intentos)
+            }
+        self.db.execute(
+            update(NotificacionEnvio).where(
+                NotificacionEnvio.notificacion_envio_pk == envio_id
+            ).values(
+                **valores,
+                fecha_actualizado=ahora,
+                usuario_actualizado=USUARIO_DESPACHADOR
+            ).execution_options(synchronize_session=False)
+        )
+        self.db.commit()
@@ -1,14 +1,17 @@
 # Servicios de aplicación para orquestar casos de uso
+from sqlalchemy import and_, insert, literal, or_, select, update
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 from app.infrastructure.db.models import (
-    QR as QRModel, Cuenta, Persona, Notificacion, NotificacionDestino,
-    ResidenteVivienda, Vivienda
+    QR as QRModel, Cuenta, Persona, Notificacion, NotificacionDestino, NotificacionEnvio,
+    ResidenteVivienda, Vivienda, MiembroVivienda, EventoCuenta
 )
+from app.infrastructure.cache.invalidacion import registrar_personas
 from app.infrastructure.firestore.client import get_firestore_client
 from app.infrastructure.notifications.fcm_client import get_fcm_client
-from app.infrastructure.utils.time_utils import ahora_sin_tz
+from app.infrastructure.utils.time_utils import ahora_sin_tz, ahora_solicitud
+from app.infrastructure.utils.token_utils import generar_token
 
 
 class QRService:
@@ -28,12 +31,8 @@ class QRService:
         usuario: str
     ) -> Dict:
         """Genera QR para residente"""
-        import secrets
-        import string
-        
         # Generar token
-        caracteres = string.ascii_letters + string.digits
-        token = ''.join(secrets.choice(caracteres) for _ in range(32))
+        token = generar_token(32)
         
         hora_fin = hora_inicio + timedelta(hours=duracion_horas)
         
@@ -82,7 +81,6 @@ class NotificacionService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.fcm = get_fcm_client()
         self.firestore = get_firestore_client()
     
     def enviar_notificacion_masiva_residentes(
@@ -96,6 +94,9 @@ class NotificacionService:
         """
         Envía notificación masiva a todos los residentes activos
         RF-N01
+        
+        El push se encola en notificacion_envio en la misma transacción; lo
+        envía el despachador (ver despacho_notificaciones), no esta solicitud.
         """
         # Crear notificación en BD
         notificacion = Notificacion(
@@ -106,42 +107,46 @@ class NotificacionService:
         
         self.db.add(notificacion)
         self.db.flush()
+        notificacion_id = notificacion.notificacion_pk
         
-        # Obtener residentes activos
-        residentes = self.db.query(Persona).filter(
-            Persona.estado == "activo",
-            Persona.eliminado == False
-        ).all()
-        
-        # TODO: Obtener tokens FCM de residentes desde tabla separada
-        tokens = []  # Placeholder
-        
-        # Enviar notificación push si hay tokens
-        if tokens:
-            self.fcm.enviar_notificacion_multicast(
-                tokens=tokens,
-                titulo=titulo,
-                cuerpo=cuerpo,
-                datos=datos or {}
-            )
-        
-        # Registrar destinos
-        for residente in residentes:
-            destino = NotificacionDestino(
-                notificacion_envio_fk=notificacion.notificacion_pk,
-                persona_receptor_fk=residente.persona_pk,
-                usuario_creado=usuario
-            )
-            self.db.add(destino)
+        # Registrar destinos: un solo INSERT ... SELECT sobre las personas activas,
+        # sin cargar objetos Persona ni un flush por destino
+        cantidad = self.registrar_destinos_masivos(notificacion_id, usuario)
+        self._encolar_push(notificacion_id, titulo, usuario, datos)
         
         self.db.commit()
         
         return {
-            "id": notificacion.notificacion_pk,
+            "id": notificacion_id,
             "mensaje": "Notificación enviada a residentes",
-            "cantidad_residentes": len(residentes)
+            "cantidad_residentes": cantidad,
+            "push": "pendiente"
         }
     
+    def registrar_destinos_masivos(self, notificacion_id: int, usuario: str) -> int:
+        """
+        Crea un NotificacionDestino por cada persona activa con una sola sentencia
+        
+        Returns:
+            Cantidad de destinos insertados
+        """
+        personas_activas = select(
+            literal(notificacion_id),
+            Persona.persona_pk,
+            literal(usuario)
+        ).where(
+            Persona.estado == "activo",
+            Persona.eliminado == False
+        )
+        # from_select agrega los defaults de columna (entregada, eliminado, fecha_creado)
+        resultado = self.db.execute(
+            insert(NotificacionDestino).from_select(
+                ["notificacion_envio_fk", "persona_receptor_fk", "usuario_creado"],
+                personas_activas
+            )
+        )
+        return resultado.rowcount
+    
     def enviar_notificacion_individual(
         self,
         persona_id: int,
@@ -152,7 +157,7 @@ class NotificacionService:
         datos: Optional[Dict] = None
     ) -> Dict:
         """
-        Envía notificación individual a una persona
+        Envía notificación individual a una persona (push encolado)
         RF-N03, RF-N04
         """
         # Validar que persona existe y está activa
@@ -174,30 +179,40 @@ class NotificacionService:
         
         self.db.add(notificacion)
         self.db.flush()
+        notificacion_id = notificacion.notificacion_pk
         
         # Registrar destino
         destino = NotificacionDestino(
-            notificacion_envio_fk=notificacion.notificacion_pk,
+            notificacion_envio_fk=notificacion_id,
             persona_receptor_fk=persona_id,
             usuario_creado=usuario
         )
         
         self.db.add(destino)
-        
-        # TODO: Obtener token FCM del usuario
-        # self.fcm.enviar_notificacion_push(
-        #     token=fcm_token,
-        #     titulo=titulo,
-        #     cuerpo=cuerpo,
-        #     datos=datos or {}
-        # )
+        self._encolar_push(notificacion_id, titulo, usuario, datos)
         
         self.db.commit()
         
         return {
-            "id": notificacion.notificacion_pk,
-            "mensaje": "Notificación enviada"
+            "id": notificacion_id,
+            "mensaje": "Notificación enviada",
+            "push": "pendiente"
         }
+    
+    def _encolar_push(
+        self,
+        notificacion_id: int,
+        titulo: str,
+        usuario: str,
+        datos: Optional[Dict] = None
+    ) -> None:
+        """Agrega el push a la bandeja de salida (se confirma con la notificación)"""
+        self.db.add(NotificacionEnvio(
+            notificacion_fk=notificacion_id,
+            titulo=titulo,
+            datos=datos or {},
+            usuario_creado=usuario
+        ))
 
 
 class CuentaService:
@@ -206,6 +221,82 @@ class CuentaService:
     def __init__(self, db: Session):
         self.db = db
     
+    def cambiar_estado_en_cascada(
+        self,
+        cuenta_principal: Cuenta,
+        estado_nuevo: str,
+        tipo_evento: str,
+        motivo: str,
+        usuario: str,
+        cascada: bool = True
+    ) -> Dict:
+        """
+        Cambia el estado de una cuenta y, si su titular es residente activo y
+        `cascada` es True, el de las cuentas de los miembros activos de su
+        vivienda (RF-C05, RF-C06). Confirma la transacción.
+        
+        Las cuentas se actualizan con un único
+        `UPDATE cuenta ... WHERE persona_titular_fk IN (miembros) RETURNING`
+        y sus eventos con un único INSERT de varias filas. De los miembros
+        solo se toman las cuentas que están en el estado contrario.
+        
+        Returns:
+            Dict con cuentas_ids, es_residente, cascada_aplicada y vivienda_id
+        """
+        estado_anterior = "activo" if estado_nuevo == "inactivo" else "inactivo"
+        
+        residente = None
+        if cascada:
+            residente = self.db.query(ResidenteVivienda.vivienda_reside_fk).filter(
+                ResidenteVivienda.persona_residente_fk == cuenta_principal.persona_titular_fk,
+                ResidenteVivienda.estado == "activo"
+            ).first()
+        vivienda_id = residente.vivienda_reside_fk if residente else None
+        
+        afectadas = Cuenta.cuenta_pk == cuenta_principal.cuenta_pk
+        if vivienda_id is not None:
+            miembros = select(MiembroVivienda.persona_miembro_fk).where(
+                MiembroVivienda.vivienda_familia_fk == vivienda_id,
+                MiembroVivienda.estado == "activo"
+            )
+            afectadas = or_(
+                afectadas,
+                and_(
+                    Cuenta.persona_titular_fk.in_(miembros),
+                    Cuenta.estado == estado_anterior
+                )
+            )
+        
+        filas = self.db.execute(
+            update(Cuenta).where(afectadas).values(
+                estado=estado_nuevo,
+                fecha_actualizado=ahora_solicitud(),
+                usuario_actualizado=usuario
+            ).returning(Cuenta.cuenta_pk, Cuenta.persona_titular_fk),
+            execution_options={"synchronize_session": "fetch"}
+        ).all()
+        
+        self.db.execute(insert(EventoCuenta), [
+            {
+                "cuenta_afectada_fk": fila.cuenta_pk,
+                "tipo_evento": tipo_evento,
+                "motivo": motivo,
+                "usuario_creado": usuario
+            }
+            for fila in filas
+        ])
+        
+        # El UPDATE masivo no pasa por la unidad de trabajo: invalidar cachés a mano
+        registrar_personas(self.db, (fila.persona_titular_fk for fila in filas))
+        self.db.commit()
+        
+        return {
+            "cuentas_ids": [fila.cuenta_pk for fila in filas],
+            "es_residente": residente is not None,
+            "cascada_aplicada": vivienda_id is not None,
+            "vivienda_id": vivienda_id
+        }
+    
     def bloquear_cuenta_y_familia(
         self,
         cuenta_id: int,
@@ -213,8 +304,16 @@ class CuentaService:
         usuario: str
     ) -> Dict:
         """Bloquea cuenta de residente y todos sus miembros"""
-        # TODO: Implementar bloqueo en cascada
-        return {"mensaje": "Cuentas bloqueadas"}
+        cuenta = self.db.query(Cuenta).filter(Cuenta.cuenta_pk == cuenta_id).first()
+        if not cuenta:
+            return {"error": "Cuenta no encontrada"}
+        if cuenta.estado == "inactivo":
+            return {"error": "La cuenta ya se encuentra inactiva"}
+        
+        resultado = self.cambiar_estado_en_cascada(
+            cuenta, "inactivo", "cuenta_bloqueada", motivo, usuario
+        )
+        return {"mensaje": "Cuentas bloqueadas", **resultado}
     
     def desbloquear_cuenta_y_familia(
         self,
@@ -223,5 +322,13 @@ class CuentaService:
         usuario: str
     ) -> Dict:
         """Desbloquea cuenta de residente y todos sus miembros"""
-        # TODO: Implementar desbloqueo en cascada
-        return {"mensaje": "Cuentas desbloqueadas"}
+        cuenta = self.db.query(Cuenta).filter(Cuenta.cuenta_pk == cuenta_id).first()
+        if not cuenta:
+            return {"error": "Cuenta no encontrada"}
+        if cuenta.estado == "activo":
+            return {"error": "La cuenta ya se encuentra activa"}
+        
+        resultado = self.cambiar_estado_en_cascada(
+            cuenta, "activo", "cuenta_desbloqueada", motivo, usuario
+        )
+        return {"mensaje": "Cuentas desbloqueadas", **resultado}
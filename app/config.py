@@ -19,17 +19,53 @@ class Settings(BaseSettings):
         """Construye la URL de base de datos desde variables de entorno"""
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """URL de base de datos para el driver asíncrono (asyncpg)"""
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+    
     SQLALCHEMY_ECHO: bool = os.getenv("SQLALCHEMY_ECHO", "False").lower() == "true"
     
+    # Pool de conexiones (por instancia; ajustar contra el límite de conexiones de Cloud SQL)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # segundos esperando conexión
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # segundos; -1 desactiva
+    # Pre-ping: 'siempre' hace un round-trip en cada checkout; 'nunca' confía en DB_POOL_RECYCLE
+    DB_POOL_PRE_PING: str = os.getenv("DB_POOL_PRE_PING", "siempre")
+    
+    # Crear tablas con Base.metadata.create_all al iniciar (solo desarrollo local).
+    # En producción el esquema se administra con Alembic y el arranque no toca la BD.
+    DB_CREATE_ALL: bool = os.getenv("DB_CREATE_ALL", "False").lower() == "true"
+    # fecha_creado la asigna PostgreSQL (DEFAULT timezone(TIMEZONE, now())) en lugar
+    # de Python: los INSERT masivos no evalúan un callable por fila. False para
+    # motores sin esa función (p. ej. SQLite en pruebas locales)
+    DB_FECHA_CREADO_SERVIDOR: bool = os.getenv("DB_FECHA_CREADO_SERVIDOR", "True").lower() == "true"
+    
     # ========== FIRESTORE ==========
     FIREBASE_PROJECT_ID: str = os.getenv("FIREBASE_PROJECT_ID", "tu-proyecto-firebase")
     FIREBASE_CREDENTIALS_PATH: str = os.getenv("FIREBASE_CREDENTIALS_PATH", "./firebase-credentials.json")
     
     # ========== FIREBASE AUTH ==========
     FIREBASE_API_KEY: str = os.getenv("FIREBASE_API_KEY", "tu-api-key")
+    # ID tokens ya verificados que se memorizan hasta su exp
+    FIREBASE_TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("FIREBASE_TOKEN_CACHE_MAX_ENTRIES", "50000"))
     
     # ========== FCM (FIREBASE CLOUD MESSAGING) ==========
     FCM_SENDER_ID: str = os.getenv("FCM_SENDER_ID", "tu-sender-id")
+    # Envíos masivos: lotes de hasta 500 tokens (límite de FCM por multicast)
+    # enviados en paralelo por un máximo de FCM_MAX_WORKERS hilos
+    FCM_TAMANO_LOTE: int = int(os.getenv("FCM_TAMANO_LOTE", "500"))
+    FCM_MAX_WORKERS: int = int(os.getenv("FCM_MAX_WORKERS", "4"))
+    # Despachador de la bandeja de salida de notificaciones (notificacion_envio):
+    # cada cuántos segundos busca pendientes (0 = solo con scripts/despachar_notificaciones.py),
+    # cuántas toma por ciclo y cuántos intentos hace, con espera exponencial desde
+    # NOTIFICACIONES_REINTENTO_SEGUNDOS hasta NOTIFICACIONES_REINTENTO_MAX_SEGUNDOS
+    NOTIFICACIONES_DESPACHO_INTERVALO_SEGUNDOS: int = int(os.getenv("NOTIFICACIONES_DESPACHO_INTERVALO_SEGUNDOS", "5"))
+    NOTIFICACIONES_DESPACHO_LOTE: int = int(os.getenv("NOTIFICACIONES_DESPACHO_LOTE", "20"))
+    NOTIFICACIONES_MAX_INTENTOS: int = int(os.getenv("NOTIFICACIONES_MAX_INTENTOS", "5"))
+    NOTIFICACIONES_REINTENTO_SEGUNDOS: int = int(os.getenv("NOTIFICACIONES_REINTENTO_SEGUNDOS", "30"))
+    NOTIFICACIONES_REINTENTO_MAX_SEGUNDOS: int = int(os.getenv("NOTIFICACIONES_REINTENTO_MAX_SEGUNDOS", "3600"))
     
     # ========== JWT (PARA PLAN DE MIGRACIÓN) ==========
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "tu-secret-key-muy-segura-cambia-en-produccion")
@@ -70,6 +106,30 @@ class Settings(BaseSettings):
     # ========== CÓDIGOS QR ==========
     QR_TOKEN_LENGTH: int = int(os.getenv("QR_TOKEN_LENGTH", "32"))
     QR_CODE_VALIDITY_MINUTES: int = int(os.getenv("QR_CODE_VALIDITY_MINUTES", "3"))
+    QR_LOTE_MAX_VISITANTES: int = int(os.getenv("QR_LOTE_MAX_VISITANTES", "200"))
+    # Caché en memoria de QRs vigentes para validación en garita
+    QR_CACHE_ENABLED: bool = os.getenv("QR_CACHE_ENABLED", "True").lower() == "true"
+    QR_CACHE_TTL_SECONDS: int = int(os.getenv("QR_CACHE_TTL_SECONDS", "30"))
+    QR_CACHE_MAX_ENTRIES: int = int(os.getenv("QR_CACHE_MAX_ENTRIES", "50000"))
+    
+    # Caché en memoria del perfil de usuario (GET /cuentas/perfil/{firebase_uid})
+    PERFIL_CACHE_ENABLED: bool = os.getenv("PERFIL_CACHE_ENABLED", "True").lower() == "true"
+    PERFIL_CACHE_TTL_SECONDS: int = int(os.getenv("PERFIL_CACHE_TTL_SECONDS", "300"))
+    PERFIL_CACHE_MAX_ENTRIES: int = int(os.getenv("PERFIL_CACHE_MAX_ENTRIES", "20000"))
+    # Caché del usuario autenticado (cuenta y persona por firebase_uid), por
+    # instancia: el TTL es lo que tarda un bloqueo en aplicarse en las demás
+    PRINCIPAL_CACHE_ENABLED: bool = os.getenv("PRINCIPAL_CACHE_ENABLED", "True").lower() == "true"
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "50000"))
+    
+    # Estadísticas de accesos: cada cuántos minutos consolida cada instancia de
+    # la API los días cerrados en acceso_diario. Por defecto 0: se programa
+    # scripts/consolidar_accesos.py como un único job (cron)
+    ACCESO_DIARIO_INTERVALO_MINUTOS: int = int(os.getenv("ACCESO_DIARIO_INTERVALO_MINUTOS", "0"))
+    # Particiones mensuales (acceso, bitacora, notificacion_destino) que cada
+    # instancia de la API crea por adelantado. Por defecto 0: se programa
+    # `scripts/particiones.py crear` fuera de la API (cron)
+    PARTICIONES_MESES_ADELANTE: int = int(os.getenv("PARTICIONES_MESES_ADELANTE", "0"))
     
     # ========== LONGITUDES DE CAMPOS ==========
     FIELD_LENGTHS: dict = {
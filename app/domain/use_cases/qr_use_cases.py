@@ -2,8 +2,8 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Optional
-import secrets
-import string
+from app.infrastructure.utils.time_utils import ahora_sin_tz
+from app.infrastructure.utils.token_utils import generar_token
 
 
 class GenerarQRUseCase(ABC):
@@ -40,7 +40,7 @@ class ValidarQRUseCase(ABC):
     """Caso de uso para validar código QR"""
 
     @abstractmethod
-    def ejecutar(self, token: str) -> dict:
+    async def ejecutar(self, token: str) -> dict:
         """
         Valida un código QR
         
@@ -53,6 +53,30 @@ class ValidarQRUseCase(ABC):
         pass
 
 
+class ConsumirQRUseCase(ABC):
+    """Caso de uso para consumir (usar) un código QR en garita"""
+
+    @abstractmethod
+    async def ejecutar(
+        self,
+        token: str,
+        usuario: str,
+        persona_guardia_id: Optional[int] = None
+    ) -> dict:
+        """
+        Marca el QR como usado y registra el acceso en una sola transacción
+        
+        Args:
+            token: Token del QR
+            usuario: Usuario que registra el acceso
+            persona_guardia_id: ID de la persona guardia (opcional)
+            
+        Returns:
+            dict con resultado del consumo
+        """
+        pass
+
+
 class _GenerarQRImpl(GenerarQRUseCase):
     """Implementación del caso de uso Generar QR"""
 
@@ -101,8 +125,7 @@ class _GenerarQRImpl(GenerarQRUseCase):
     @staticmethod
     def _generar_token() -> str:
         """Genera un token aleatorio seguro"""
-        caracteres = string.ascii_letters + string.digits
-        return ''.join(secrets.choice(caracteres) for _ in range(32))
+        return generar_token(32)
 
 
 class _ValidarQRImpl(ValidarQRUseCase):
@@ -111,8 +134,8 @@ class _ValidarQRImpl(ValidarQRUseCase):
     def __init__(self, qr_repository):
         self.qr_repository = qr_repository
 
-    def ejecutar(self, token: str) -> dict:
-        qr = self.qr_repository.obtener_por_token(token)
+    async def ejecutar(self, token: str) -> dict:
+        qr = await self.qr_repository.obtener_por_token(token)
         
         if not qr:
             return {
@@ -126,16 +149,28 @@ class _ValidarQRImpl(ValidarQRUseCase):
                 "razon": "QR eliminado"
             }
         
-        if not qr.es_vigente():
+        if qr.estado.value == "usado":
             return {
                 "valido": False,
-                "razon": "QR expirado"
+                "razon": "QR ya utilizado"
             }
         
-        if qr.estado.value == "usado":
+        if qr.estado.value == "anulado":
             return {
                 "valido": False,
-                "razon": "QR ya utilizado"
+                "razon": "QR anulado"
+            }
+        
+        if ahora_sin_tz() < qr.hora_inicio_vigencia:
+            return {
+                "valido": False,
+                "razon": "QR aún no vigente"
+            }
+        
+        if not qr.es_vigente():
+            return {
+                "valido": False,
+                "razon": "QR expirado"
             }
         
         return {
@@ -145,3 +180,30 @@ class _ValidarQRImpl(ValidarQRUseCase):
             "vivienda_id": qr.vivienda_id,
             "visita_id": qr.visita_id
         }
+
+
+class _ConsumirQRImpl(ConsumirQRUseCase):
+    """Implementación del caso de uso Consumir QR"""
+
+    def __init__(self, qr_repository):
+        self.qr_repository = qr_repository
+
+    async def ejecutar(
+        self,
+        token: str,
+        usuario: str,
+        persona_guardia_id: Optional[int] = None
+    ) -> dict:
+        consumo = await self.qr_repository.consumir(token, usuario, persona_guardia_id)
+        
+        if consumo:
+            return {"valido": True, **consumo}
+        
+        # Rechazado: obtener el motivo con una lectura fresca (el consumo ya invalidó la caché)
+        validacion = await _ValidarQRImpl(self.qr_repository).ejecutar(token)
+        if validacion["valido"]:
+            return {
+                "valido": False,
+                "razon": "QR no pudo ser consumido"
+            }
+        return validacion
@@ -0,0 +1,99 @@
+"""
+Invalidación de las cachés por usuario al confirmar cambios en la base.
+
+Los eventos de sesión de SQLAlchemy recogen, en cada flush, las personas
+afectadas por altas, cambios o bajas de persona, cuenta y roles (residente,
+propietario, miembro, admin). Al hacer commit se notifica a las cachés
+suscritas; si la transacción se revierte, los cambios se descartan.
+Las cachés suscritas son del proceso que confirmó: las demás instancias solo
+ven el cambio cuando expira el TTL de sus entradas.
+
+Los UPDATE/INSERT masivos (`update(...)`, `insert().from_select(...)`) no
+pasan por la unidad de trabajo del ORM: quien los ejecute debe declarar las
+personas afectadas con `registrar_personas`.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import (
+    Admin, Cuenta, MiembroVivienda, Persona, PropietarioVivienda, ResidenteVivienda, Vivienda
+)
+
+# Modelo -> columna con el id de la persona a la que pertenece el registro
+COLUMNA_PERSONA = {
+    Persona: "persona_pk",
+    Cuenta: "persona_titular_fk",
+    ResidenteVivienda: "persona_residente_fk",
+    PropietarioVivienda: "persona_propietario_fk",
+    MiembroVivienda: "persona_miembro_fk",
+    Admin: "persona_admin_fk",
+}
+
+_CLAVE_SESION = "cambios_identidad"
+
+
+@dataclass
+class CambiosIdentidad:
+    """Personas afectadas por una transacción confirmada"""
+    personas: Set[int] = field(default_factory=set)
+    # Cambió alguna vivienda (manzana/villa): afecta a todos sus habitantes
+    viviendas: bool = False
+
+
+_suscriptores: List[Callable[[CambiosIdentidad], None]] = []
+
+
+def suscribir(funcion: Callable[[CambiosIdentidad], None]) -> None:
+    """Registra una función que se llama tras cada commit con cambios de identidad"""
+    _suscriptores.append(funcion)
+
+
+def _cambios(session: Session) -> CambiosIdentidad:
+    return session.info.setdefault(_CLAVE_SESION, CambiosIdentidad())
+
+
+def registrar_personas(session: Session, personas: Iterable[int]) -> None:
+    """
+    Declara personas afectadas por sentencias masivas de la transacción en curso.
+    Con AsyncSession, pasar `db.sync_session`.
+    """
+    _cambios(session).personas.update(p for p in personas if p is not None)
+
+
+@event.listens_for(Session, "after_flush")
+def _recoger_cambios(session: Session, flush_context) -> None:
+    cambios = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Vivienda):
+            cambios = cambios or _cambios(session)
+            cambios.viviendas = True
+            continue
+        columna = COLUMNA_PERSONA.get(type(obj))
+        if columna is None:
+            continue
+        persona_id = getattr(obj, columna, None)
+        if persona_id is not None:
+            cambios = cambios or _cambios(session)
+            cambios.personas.add(persona_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _notificar_cambios(session: Session) -> None:
+    cambios = session.info.pop(_CLAVE_SESION, None)
+    if cambios is None or not (cambios.personas or cambios.viviendas):
+        return
+    for funcion in _suscriptores:
+        try:
+            funcion(cambios)
+        except Exception as e:
+            print(f"Error invalidando caché: {e}")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_cambios(session: Session, previous_transaction) -> None:
+    # Revertir un SAVEPOINT no descarta lo acumulado por la transacción externa
+    if not session.in_transaction():
+        session.info.pop(_CLAVE_SESION, None)
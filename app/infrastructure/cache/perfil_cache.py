@@ -0,0 +1,51 @@
+"""
+Caché en memoria (por proceso) del perfil de usuario por Firebase UID.
+
+`GET /api/v1/cuentas/perfil/{firebase_uid}` se llama en cada arranque de la
+app móvil. El perfil (persona, rol y vivienda) cambia muy poco, así que se
+guarda por UID con etiqueta de persona y se invalida al confirmar cambios en
+la persona, su cuenta o sus roles (ver `invalidacion`), o en cualquier
+vivienda. Solo se guardan perfiles resueltos; los 403/404 siempre consultan.
+"""
+from typing import Dict, Optional
+
+from app.config import get_settings
+from app.infrastructure.cache.invalidacion import CambiosIdentidad, suscribir
+from app.infrastructure.cache.ttl_cache import CacheTTL
+
+settings = get_settings()
+
+
+class CachePerfiles(CacheTTL):
+    """Caché firebase_uid -> perfil, invalidable por persona"""
+
+    def obtener_perfil(self, firebase_uid: str) -> Optional[Dict]:
+        perfil = self.obtener(firebase_uid)
+        # Copia: el llamador puede modificar la respuesta sin alterar la caché
+        return dict(perfil) if perfil is not None else None
+
+    def guardar_perfil(self, firebase_uid: str, perfil: Dict) -> None:
+        self.guardar(firebase_uid, dict(perfil), etiquetas=[("persona", perfil["persona_id"])])
+
+    def invalidar_persona(self, persona_id: int) -> None:
+        self.invalidar_etiqueta(("persona", persona_id))
+
+    def aplicar_cambios(self, cambios: CambiosIdentidad) -> None:
+        """Suscriptor de `invalidacion`: descarta los perfiles afectados"""
+        if cambios.viviendas:
+            self.limpiar()
+            return
+        for persona_id in cambios.personas:
+            self.invalidar_persona(persona_id)
+
+
+_cache_perfiles = CachePerfiles(
+    ttl_segundos=settings.PERFIL_CACHE_TTL_SECONDS,
+    max_entradas=settings.PERFIL_CACHE_MAX_ENTRIES
+)
+suscribir(_cache_perfiles.aplicar_cambios)
+
+
+def get_perfil_cache() -> CachePerfiles:
+    """Obtiene la instancia de caché de perfiles del proceso"""
+    return _cache_perfiles
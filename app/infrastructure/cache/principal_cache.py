@@ -0,0 +1,48 @@
+"""
+Caché en memoria (por proceso) del usuario autenticado por Firebase UID.
+
+`obtener_usuario_autenticado` corre en cada request autenticado. Tras
+verificar el token, la cuenta activa y la persona del UID se toman de esta
+caché en lugar de consultar PostgreSQL. Las entradas se invalidan al
+confirmar cambios en la cuenta o la persona (bloquear, desbloquear, eliminar
+cuenta, editar datos), vía `invalidacion`; el TTL es corto porque un bloqueo
+hecho en otra instancia solo se refleja al expirar.
+"""
+from typing import Dict, Optional
+
+from app.config import get_settings
+from app.infrastructure.cache.invalidacion import CambiosIdentidad, suscribir
+from app.infrastructure.cache.ttl_cache import CacheTTL
+
+settings = get_settings()
+
+
+class CachePrincipales(CacheTTL):
+    """Caché firebase_uid -> {cuenta_id, persona_id, nombres, estado}"""
+
+    def obtener_principal(self, firebase_uid: str) -> Optional[Dict]:
+        principal = self.obtener(firebase_uid)
+        return dict(principal) if principal is not None else None
+
+    def guardar_principal(self, firebase_uid: str, principal: Dict) -> None:
+        self.guardar(firebase_uid, dict(principal), etiquetas=[("persona", principal["persona_id"])])
+
+    def invalidar_persona(self, persona_id: int) -> None:
+        self.invalidar_etiqueta(("persona", persona_id))
+
+    def aplicar_cambios(self, cambios: CambiosIdentidad) -> None:
+        """Suscriptor de `invalidacion`: descarta los principales afectados"""
+        for persona_id in cambios.personas:
+            self.invalidar_persona(persona_id)
+
+
+_cache_principales = CachePrincipales(
+    ttl_segundos=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entradas=settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
+suscribir(_cache_principales.aplicar_cambios)
+
+
+def get_principal_cache() -> CachePrincipales:
+    """Obtiene la instancia de caché de usuarios autenticados del proceso"""
+    return _cache_principales
@@ -0,0 +1,127 @@
+"""
+Caché en memoria (por proceso) de códigos QR vigentes.
+
+Los escáneres de garita validan una y otra vez el mismo conjunto pequeño de
+QRs vigentes. Esta caché guarda la entidad de dominio por token para que
+`_ValidarQRImpl` resuelva la mayoría de escaneos sin consultar PostgreSQL.
+
+- Cada entrada expira en `hora_fin_vigencia` o tras QR_CACHE_TTL_SECONDS,
+  lo que ocurra primero. El TTL acota la desactualización entre instancias
+  de Cloud Run, ya que la invalidación es local al proceso.
+- Se invalida explícitamente al crear, anular o usar un QR en este proceso.
+"""
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.domain.entities.models import QR, EstadoQREnum
+from app.infrastructure.utils.time_utils import ahora_sin_tz
+
+settings = get_settings()
+
+
+class CacheQRVigentes:
+    """Caché token -> QR con expiración por fin de vigencia"""
+    
+    def __init__(self, ttl_segundos: int, max_entradas: int):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        # token -> (qr, expira_en local, expira_en monotónico)
+        self._entradas: Dict[str, Tuple[QR, datetime, float]] = {}
+        # Heap de (expira_en, token) para desalojar por fin de vigencia
+        self._expiraciones: List[Tuple[datetime, str]] = []
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def __len__(self) -> int:
+        return len(self._entradas)
+    
+    @staticmethod
+    def es_cacheable(qr: QR, ahora: datetime) -> bool:
+        """Solo se guardan QRs vigentes, no eliminados y no expirados"""
+        return (
+            qr.estado == EstadoQREnum.VIGENTE
+            and not qr.eliminado
+            and ahora < qr.hora_fin_vigencia
+        )
+    
+    def obtener(self, token: str, ahora: Optional[datetime] = None) -> Optional[QR]:
+        """Devuelve el QR si está en caché y no ha expirado"""
+        ahora = ahora or ahora_sin_tz()
+        with self._lock:
+            self._purgar_expirados(ahora)
+            entrada = self._entradas.get(token)
+            if entrada is None or entrada[2] <= time.monotonic():
+                if entrada is not None:
+                    del self._entradas[token]
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            return entrada[0]
+    
+    def guardar(self, qr: QR, ahora: Optional[datetime] = None) -> bool:
+        """Guarda el QR si es cacheable; retorna True si quedó en caché"""
+        ahora = ahora or ahora_sin_tz()
+        if not self.es_cacheable(qr, ahora):
+            self.invalidar(qr.token)
+            return False
+        
+        expira_en = min(qr.hora_fin_vigencia, ahora + timedelta(seconds=self.ttl_segundos))
+        with self._lock:
+            if qr.token not in self._entradas and len(self._entradas) >= self.max_entradas:
+                self._purgar_expirados(ahora)
+                if len(self._entradas) >= self.max_entradas:
+                    return False
+            self._entradas[qr.token] = (qr, expira_en, time.monotonic() + self.ttl_segundos)
+            heapq.heappush(self._expiraciones, (expira_en, qr.token))
+        return True
+    
+    def precargar(self, qrs: Iterable[QR], ahora: Optional[datetime] = None) -> int:
+        """Carga un lote de QRs vigentes; retorna cuántos quedaron en caché"""
+        ahora = ahora or ahora_sin_tz()
+        return sum(1 for qr in qrs if self.guardar(qr, ahora))
+    
+    def invalidar(self, token: str) -> None:
+        """Elimina un token de la caché (su entrada en el heap se descarta al purgar)"""
+        with self._lock:
+            self._entradas.pop(token, None)
+    
+    def limpiar(self) -> None:
+        """Vacía la caché"""
+        with self._lock:
+            self._entradas.clear()
+            self._expiraciones.clear()
+    
+    def _purgar_expirados(self, ahora: datetime) -> None:
+        """Desaloja entradas cuyo fin de vigencia ya pasó (requiere el lock)"""
+        while self._expiraciones and self._expiraciones[0][0] <= ahora:
+            expira_en, token = heapq.heappop(self._expiraciones)
+            entrada = self._entradas.get(token)
+            # Ignorar entradas del heap obsoletas (token re-guardado o invalidado)
+            if entrada is not None and entrada[1] <= ahora:
+                del self._entradas[token]
+    
+    def estadisticas(self) -> Dict:
+        """Tamaño y tasa de aciertos de la caché"""
+        total = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / total, 4) if total else 0.0
+        }
+
+
+_cache_qr = CacheQRVigentes(
+    ttl_segundos=settings.QR_CACHE_TTL_SECONDS,
+    max_entradas=settings.QR_CACHE_MAX_ENTRIES
+)
+
+
+def get_qr_cache() -> CacheQRVigentes:
+    """Obtiene la instancia de caché de QRs vigentes del proceso"""
+    return _cache_qr
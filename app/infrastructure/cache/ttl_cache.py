@@ -0,0 +1,107 @@
+"""
+Caché en memoria (por proceso) con expiración por TTL y desalojo LRU.
+
+Base de las cachés por usuario (perfil, principal autenticado). Cada entrada
+puede llevar etiquetas (p. ej. el id de persona) para invalidar de una vez
+todas las entradas que dependen de un mismo registro. El TTL acota la
+desactualización entre instancias de Cloud Run, ya que la invalidación es
+local al proceso.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+
+
+class CacheTTL:
+    """Caché clave -> valor con TTL, tamaño máximo (LRU) e invalidación por etiqueta"""
+
+    def __init__(self, ttl_segundos: int, max_entradas: int):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        # clave -> (valor, expira_en monotónico, etiquetas)
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # etiqueta -> claves que la llevan
+        self._por_etiqueta: Dict[Hashable, Set[Hashable]] = {}
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        """Devuelve el valor si está en caché y no ha expirado"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[1] <= time.monotonic():
+                if entrada is not None:
+                    self._quitar(clave)
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[0]
+
+    def guardar(
+        self,
+        clave: Hashable,
+        valor: Any,
+        etiquetas: Iterable[Hashable] = (),
+        ttl_segundos: Optional[float] = None
+    ) -> None:
+        """
+        Guarda el valor; si la caché está llena desaloja la entrada menos usada.
+        `ttl_segundos` acorta el TTL de esta entrada (nunca lo alarga).
+        """
+        etiquetas = tuple(etiquetas)
+        ttl = self.ttl_segundos if ttl_segundos is None else min(ttl_segundos, self.ttl_segundos)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+            elif len(self._entradas) >= self.max_entradas:
+                self._quitar(next(iter(self._entradas)))
+            self._entradas[clave] = (valor, time.monotonic() + ttl, etiquetas)
+            for etiqueta in etiquetas:
+                self._por_etiqueta.setdefault(etiqueta, set()).add(clave)
+
+    def invalidar(self, clave: Hashable) -> None:
+        """Elimina una clave de la caché"""
+        with self._lock:
+            self._quitar(clave)
+
+    def invalidar_etiqueta(self, etiqueta: Hashable) -> None:
+        """Elimina todas las entradas que llevan la etiqueta"""
+        with self._lock:
+            for clave in list(self._por_etiqueta.get(etiqueta, ())):
+                self._quitar(clave)
+
+    def limpiar(self) -> None:
+        """Vacía la caché"""
+        with self._lock:
+            self._entradas.clear()
+            self._por_etiqueta.clear()
+
+    def _quitar(self, clave: Hashable) -> None:
+        """Elimina la entrada y su rastro en el índice de etiquetas (requiere el lock)"""
+        entrada = self._entradas.pop(clave, None)
+        if entrada is None:
+            return
+        for etiqueta in entrada[2]:
+            claves = self._por_etiqueta.get(etiqueta)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_etiqueta[etiqueta]
+
+    def estadisticas(self) -> Dict:
+        """Tamaño y tasa de aciertos de la caché"""
+        total = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / total, 4) if total else 0.0
+        }
@@ -1,16 +1,20 @@
 # Archivo __init__ para db
-from app.infrastructure.db.database import SessionLocal, get_db, engine
+from app.infrastructure.db.database import (
+    SessionLocal, get_db, engine, AsyncSessionLocal, get_async_db, async_engine,
+    obtener_estadisticas_pool
+)
 from app.infrastructure.db.models import (
     Base, Vivienda, Persona, PersonaFoto, PropietarioVivienda, ResidenteVivienda,
     MiembroVivienda, Cuenta, Guardia, EventoCuenta, Vehiculo, Visita, Acceso,
-    AutorizacionTelefonica, AutorizacionCodigo, QR, Notificacion, NotificacionDestino,
-    Bitacora
+    AccesoDiario, AccesoDiarioVisitante, AutorizacionTelefonica, AutorizacionCodigo, QR, Notificacion, NotificacionDestino,
+    DispositivoFCM, NotificacionEnvio, Bitacora
 )
 
 __all__ = [
-    'SessionLocal', 'get_db', 'engine', 'Base',
+    'SessionLocal', 'get_db', 'engine', 'AsyncSessionLocal', 'get_async_db', 'async_engine',
+    'obtener_estadisticas_pool', 'Base',
     'Vivienda', 'Persona', 'PersonaFoto', 'PropietarioVivienda', 'ResidenteVivienda',
     'MiembroVivienda', 'Cuenta', 'Guardia', 'EventoCuenta', 'Vehiculo', 'Visita',
-    'Acceso', 'AutorizacionTelefonica', 'AutorizacionCodigo', 'QR', 'Notificacion',
-    'NotificacionDestino', 'Bitacora'
+    'Acceso', 'AccesoDiario', 'AccesoDiarioVisitante', 'AutorizacionTelefonica', 'AutorizacionCodigo', 'QR', 'Notificacion',
+    'NotificacionDestino', 'DispositivoFCM', 'NotificacionEnvio', 'Bitacora'
 ]
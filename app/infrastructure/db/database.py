@@ -1,19 +1,56 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import get_settings
+from app.infrastructure.db.pool_metrics import MetricasPool, crear_pool_medido, estado_pool
 
 settings = get_settings()
 
+if settings.DB_POOL_PRE_PING not in ("siempre", "nunca"):
+    raise ValueError(
+        f"DB_POOL_PRE_PING inválido: '{settings.DB_POOL_PRE_PING}'. Use 'siempre' o 'nunca'"
+    )
+
+# Parámetros de pool compartidos por los engines sync y async
+POOL_KWARGS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING == "siempre",
+}
+
+metricas_pool = MetricasPool("sync")
+metricas_pool_async = MetricasPool("async")
+
 # Engine de SQLAlchemy
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.SQLALCHEMY_ECHO,
-    pool_pre_ping=True,
+    poolclass=crear_pool_medido(QueuePool, metricas_pool),
+    **POOL_KWARGS,
 )
 
 # Factory de sesiones
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine asíncrono (asyncpg) para endpoints async de alta concurrencia
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    echo=settings.SQLALCHEMY_ECHO,
+    poolclass=crear_pool_medido(AsyncAdaptedQueuePool, metricas_pool_async),
+    **POOL_KWARGS,
+)
+
+# Factory de sesiones asíncronas
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base para declarar modelos
 Base = declarative_base()
 
@@ -25,3 +62,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency para obtener sesión asíncrona de base de datos.
+    No ocupa un hilo del threadpool mientras espera a PostgreSQL.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def obtener_estadisticas_pool() -> dict:
+    """Estado actual y métricas acumuladas de ambos pools de conexiones"""
+    return {
+        "configuracion": {
+            **{k: v for k, v in POOL_KWARGS.items() if k != "pool_pre_ping"},
+            "pre_ping": settings.DB_POOL_PRE_PING,
+        },
+        "sync": {**estado_pool(engine.pool), **metricas_pool.snapshot()},
+        "async": {**estado_pool(async_engine.sync_engine.pool), **metricas_pool_async.snapshot()},
+    }
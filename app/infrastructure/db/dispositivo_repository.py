@@ -0,0 +1,96 @@
+"""
+Repositorio de tokens FCM (registro de dispositivos por persona)
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import DispositivoFCM, NotificacionDestino
+from app.infrastructure.utils.time_utils import ahora_solicitud
+
+
+class DispositivoFCMRepository:
+    """Acceso a la tabla dispositivo_fcm con sesión síncrona"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def registrar(self, persona_id: int, token: str, plataforma: str, usuario: str) -> int:
+        """
+        Registra el token del dispositivo para la persona (upsert por token).
+        Un token ya conocido se reasigna a la persona y se reactiva si estaba
+        dado de baja. No confirma la transacción.
+
+        Returns:
+            id del dispositivo
+        """
+        sentencia = insert(DispositivoFCM).values(
+            persona_fk=persona_id,
+            token=token,
+            plataforma=plataforma,
+            usuario_creado=usuario
+        )
+        sentencia = sentencia.on_conflict_do_update(
+            index_elements=[DispositivoFCM.token],
+            set_={
+                "persona_fk": sentencia.excluded.persona_fk,
+                "plataforma": sentencia.excluded.plataforma,
+                "eliminado": False,
+                "motivo_eliminado": None,
+                "fecha_actualizado": ahora_solicitud(),
+                "usuario_actualizado": usuario
+            }
+        ).returning(DispositivoFCM.dispositivo_fcm_pk)
+        return self.db.execute(sentencia).scalar_one()
+
+    def tokens_pendientes_de_notificacion(self, notificacion_id: int) -> List[Tuple[int, str]]:
+        """
+        Pares (persona_id, token) de los destinos de la notificación aún no
+        entregados: un reintento solo vuelve a enviar a quienes no lo recibieron
+        """
+        consulta = select(DispositivoFCM.persona_fk, DispositivoFCM.token).join(
+            NotificacionDestino,
+            NotificacionDestino.persona_receptor_fk == DispositivoFCM.persona_fk
+        ).where(
+            NotificacionDestino.notificacion_envio_fk == notificacion_id,
+            NotificacionDestino.entregada == False,
+            NotificacionDestino.eliminado == False,
+            DispositivoFCM.eliminado == False
+        )
+        return [(fila.persona_fk, fila.token) for fila in self.db.execute(consulta)]
+
+    def dar_de_baja(
+        self,
+        tokens: Iterable[str],
+        motivo: str,
+        usuario: str,
+        persona_id: Optional[int] = None
+    ) -> int:
+        """
+        Da de baja los tokens en un solo UPDATE (p. ej. los que FCM reporta
+        como inválidos). Con `persona_id`, solo si pertenecen a esa persona.
+        No confirma la transacción.
+
+        Returns:
+            Cantidad de dispositivos dados de baja
+        """
+        tokens = list(tokens)
+        if not tokens:
+            return 0
+        sentencia = update(DispositivoFCM).where(
+            DispositivoFCM.token.in_(tokens),
+            DispositivoFCM.eliminado == False
+        )
+        if persona_id is not None:
+            sentencia = sentencia.where(DispositivoFCM.persona_fk == persona_id)
+        resultado = self.db.execute(
+            sentencia.values(
+                eliminado=True,
+                motivo_eliminado=motivo,
+                fecha_actualizado=ahora_solicitud(),
+                usuario_actualizado=usuario
+            ).execution_options(synchronize_session=False)
+        )
+        return resultado.rowcount
@@ -1,16 +1,40 @@
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, Date, DateTime, Numeric,
-    ForeignKey, UniqueConstraint, CheckConstraint, Index, Float, JSON
+    ForeignKey, UniqueConstraint, CheckConstraint, Index, Float, JSON, event, text
 )
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from app.infrastructure.utils.time_utils import ahora_sin_tz, fecha_hoy
+from app.config import get_settings
+from app.infrastructure.utils.time_utils import ahora_solicitud, fecha_hoy, obtener_zona_horaria
+from app.infrastructure.db.particiones import crear_particiones_iniciales
 
+settings = get_settings()
 Base = declarative_base()
 
 
+def fecha_creado_servidor(zona: str = None) -> str:
+    """
+    Expresión SQL del default de fecha_creado en PostgreSQL: hora local (sin tz)
+    de la zona configurada al inicio de la transacción, igual que `ahora_sin_tz()`.
+    """
+    zona = zona or obtener_zona_horaria().key
+    return f"timezone('{zona}', now())"
+
+
+def columna_fecha_creado(**kwargs) -> Column:
+    """
+    Columna de auditoría fecha_creado. Con DB_FECHA_CREADO_SERVIDOR el valor lo
+    asigna PostgreSQL (server_default) y el ORM lo recupera con RETURNING, así
+    que los INSERT masivos van en lotes (insertmanyvalues) sin trabajo por fila
+    en Python; si no, se usa `ahora_solicitud()`.
+    """
+    if settings.DB_FECHA_CREADO_SERVIDOR:
+        return Column(DateTime, server_default=text(fecha_creado_servidor()), **kwargs)
+    return Column(DateTime, default=ahora_solicitud, **kwargs)
+
+
 class Vivienda(Base):
     """Tabla de viviendas"""
     __tablename__ = "vivienda"
@@ -21,7 +45,7 @@ class Vivienda(Base):
     estado = Column(String(10), nullable=False, default='activo')
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -57,7 +81,7 @@ class Persona(Base):
     estado = Column(String(10), nullable=False, default='activo')
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -69,6 +93,8 @@ class Persona(Base):
               postgresql_where=(
                   (estado == 'activo') & (eliminado == False)
               )),
+        Index('ix_persona_correo_activa', 'correo',
+              postgresql_where=(estado == 'activo')),
     )
     
     fotos = relationship("PersonaFoto", back_populates="persona")
@@ -95,12 +121,17 @@ class PersonaFoto(Base):
     formato = Column(String(10), nullable=False)
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
     rostro_embedding = Column(ARRAY(Float))
     
+    __table_args__ = (
+        Index('ix_persona_foto_titular', 'persona_titular_fk', 'foto_pk',
+              postgresql_where=(eliminado == False)),
+    )
+    
     persona = relationship("Persona", back_populates="fotos")
 
 
@@ -118,7 +149,7 @@ class PropietarioVivienda(Base):
     fecha_desde = Column(Date, default=lambda: fecha_hoy())
     fecha_hasta = Column(Date)
     motivo = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -138,6 +169,8 @@ class PropietarioVivienda(Base):
               postgresql_where=(
                   (tipo_propietario == 'titular') & (estado == 'activo') & (eliminado == False)
               )),
+        Index('ix_propietario_vivienda', 'vivienda_propiedad_fk', 'propietario_vivienda_pk',
+              postgresql_where=(eliminado == False)),
     )
     
     vivienda = relationship("Vivienda", back_populates="propietarios")
@@ -158,7 +191,7 @@ class ResidenteVivienda(Base):
     fecha_desde = Column(Date, default=lambda: fecha_hoy())
     fecha_hasta = Column(Date)
     motivo = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -171,6 +204,10 @@ class ResidenteVivienda(Base):
               postgresql_where=(
                   (estado == 'activo') & (eliminado == False)
               )),
+        Index('ix_residente_persona_estado', 'persona_residente_fk', 'estado',
+              postgresql_where=(eliminado == False)),
+        Index('ix_residente_vivienda', 'vivienda_reside_fk', 'residente_vivienda_pk',
+              postgresql_where=(eliminado == False)),
     )
     
     vivienda = relationship("Vivienda", back_populates="residentes")
@@ -190,7 +227,7 @@ class MiembroVivienda(Base):
     estado = Column(String(10), nullable=False, default='activo')
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -216,6 +253,10 @@ class MiembroVivienda(Base):
                   (estado == 'activo') &
                   (eliminado == False)
               )),
+        Index('ix_miembro_persona_estado', 'persona_miembro_fk', 'estado',
+              postgresql_where=(eliminado == False)),
+        Index('ix_miembro_vivienda', 'vivienda_familia_fk', 'miembro_vivienda_pk',
+              postgresql_where=(eliminado == False)),
     )
     
     vivienda = relationship("Vivienda", back_populates="miembros")
@@ -236,7 +277,7 @@ class Cuenta(Base):
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
     ultimo_login = Column(DateTime)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -244,6 +285,7 @@ class Cuenta(Base):
     __table_args__ = (
         CheckConstraint("estado IN ('activo','inactivo')", name='chk_cuenta_estado'),
         CheckConstraint("eliminado = FALSE OR estado = 'inactivo'", name='chk_cuenta_eliminado_estado'),
+        Index('ix_cuenta_persona_titular', 'persona_titular_fk'),
     )
     
     persona = relationship("Persona", back_populates="cuentas")
@@ -260,7 +302,7 @@ class Admin(Base):
     estado = Column(String(10), nullable=False, default='activo')
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -283,7 +325,7 @@ class Guardia(Base):
     estado = Column(String(10), nullable=False, default='activo')
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -311,7 +353,7 @@ class EventoCuenta(Base):
     persona_actor_fk = Column(Integer, ForeignKey('persona.persona_pk'))
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -344,7 +386,7 @@ class Vehiculo(Base):
     estado = Column(String(10), nullable=False, default='activo')
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -368,19 +410,24 @@ class Visita(Base):
     apellidos = Column(String(100))
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
     
+    __table_args__ = (
+        Index('ix_visita_vivienda_fecha', 'vivienda_visita_fk', 'fecha_creado', 'visita_pk',
+              postgresql_where=(eliminado == False)),
+    )
+    
     vivienda = relationship("Vivienda", back_populates="visitas")
 
 
 class Acceso(Base):
-    """Tabla de registros de acceso"""
+    """Tabla de registros de acceso (particionada por mes de fecha_creado)"""
     __tablename__ = "acceso"
     
-    acceso_pk = Column(Integer, primary_key=True)
+    acceso_pk = Column(Integer, primary_key=True, autoincrement=True)
     tipo = Column(String(30), nullable=False)
     vivienda_visita_fk = Column(Integer, ForeignKey('vivienda.vivienda_pk'), nullable=False)
     resultado = Column(String(30), nullable=False)
@@ -396,7 +443,8 @@ class Acceso(Base):
     observacion = Column(Text)
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    # Clave de partición: forma parte de la PK
+    fecha_creado = columna_fecha_creado(primary_key=True)
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -417,17 +465,40 @@ class Acceso(Base):
             )""",
             name='chk_acceso_resultado'
         ),
+        Index('ix_acceso_vivienda_fecha', 'vivienda_visita_fk', 'fecha_creado', 'acceso_pk',
+              postgresql_where=(eliminado == False)),
+        {'postgresql_partition_by': 'RANGE (fecha_creado)'},
     )
     
     vivienda = relationship("Vivienda", back_populates="accesos")
 
 
+class AccesoDiario(Base):
+    """Resumen diario de accesos por vivienda, tipo y resultado (consolidado)"""
+    __tablename__ = "acceso_diario"
+    
+    dia = Column(Date, primary_key=True)
+    vivienda_fk = Column(Integer, ForeignKey('vivienda.vivienda_pk'), primary_key=True)
+    tipo = Column(String(30), primary_key=True)
+    resultado = Column(String(30), primary_key=True)
+    cantidad = Column(Integer, nullable=False)
+
+
+class AccesoDiarioVisitante(Base):
+    """Visitantes distintos con acceso en cada día consolidado"""
+    __tablename__ = "acceso_diario_visitante"
+    
+    dia = Column(Date, primary_key=True)
+    visita_fk = Column(Integer, ForeignKey('visita.visita_pk'), primary_key=True)
+
+
 class AutorizacionTelefonica(Base):
     """Tabla de autorizaciones telefónicas"""
     __tablename__ = "autorizacion_telefonica"
     
     autorizacion_tel_pk = Column(Integer, primary_key=True)
-    acceso_ingreso_fk = Column(Integer, ForeignKey('acceso.acceso_pk'), nullable=False)
+    # Sin FK: acceso está particionada y su PK incluye fecha_creado
+    acceso_ingreso_fk = Column(Integer, nullable=False, index=True)
     telefono = Column(String(15))
     respuesta = Column(String(20))
     numero_intentos = Column(Integer)
@@ -435,7 +506,7 @@ class AutorizacionTelefonica(Base):
     hora_fin = Column(DateTime)
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -464,7 +535,7 @@ class AutorizacionCodigo(Base):
     estado = Column(String(20), nullable=False)
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -492,7 +563,7 @@ class QR(Base):
     token = Column(Text, nullable=False)
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -502,6 +573,14 @@ class QR(Base):
             "estado IN ('vigente','expirado','usado','anulado')",
             name='chk_estado_qr'
         ),
+        Index('uq_qr_token_activo', 'token',
+              unique=True,
+              postgresql_where=(eliminado == False)),
+        Index('ix_qr_cuenta_fecha', 'cuenta_autoriza_fk', 'fecha_creado', 'qr_pk'),
+        Index('ix_qr_vigentes', 'hora_fin_vigencia',
+              postgresql_where=(
+                  (estado == 'vigente') & (eliminado == False)
+              )),
     )
     
     cuenta = relationship("Cuenta", back_populates="qrs")
@@ -518,7 +597,7 @@ class Notificacion(Base):
     persona_emisor_fk = Column(Integer, ForeignKey('persona.persona_pk'))
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    fecha_creado = columna_fecha_creado()
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
@@ -541,10 +620,10 @@ class Notificacion(Base):
 
 
 class NotificacionDestino(Base):
-    """Tabla de destinos de notificaciones"""
+    """Tabla de destinos de notificaciones (particionada por mes de fecha_creado)"""
     __tablename__ = "notificacion_destino"
     
-    notificacion_destino_pk = Column(Integer, primary_key=True)
+    notificacion_destino_pk = Column(Integer, primary_key=True, autoincrement=True)
     notificacion_envio_fk = Column(Integer, ForeignKey('notificacion.notificacion_pk'), nullable=False)
     persona_receptor_fk = Column(Integer, ForeignKey('persona.persona_pk'), nullable=False)
     entregada = Column(Boolean, nullable=False, default=False)
@@ -552,19 +631,80 @@ class NotificacionDestino(Base):
     error = Column(Text)
     eliminado = Column(Boolean, nullable=False, default=False)
     motivo_eliminado = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    # Clave de partición: forma parte de la PK
+    fecha_creado = columna_fecha_creado(primary_key=True)
     usuario_creado = Column(String(20), nullable=False)
     fecha_actualizado = Column(DateTime)
     usuario_actualizado = Column(String(20))
     
+    __table_args__ = (
+        # Destinos aún sin entregar de una notificación (despachador de push)
+        Index('ix_notificacion_destino_pendiente', 'notificacion_envio_fk', 'persona_receptor_fk',
+              postgresql_where=((entregada == False) & (eliminado == False))),
+        {'postgresql_partition_by': 'RANGE (fecha_creado)'},
+    )
+    
     notificacion = relationship("Notificacion", back_populates="destinos")
 
 
+class DispositivoFCM(Base):
+    """Tokens FCM de los dispositivos de cada persona (notificaciones push)"""
+    __tablename__ = "dispositivo_fcm"
+    
+    dispositivo_fcm_pk = Column(Integer, primary_key=True)
+    persona_fk = Column(Integer, ForeignKey('persona.persona_pk'), nullable=False)
+    token = Column(String(512), nullable=False, unique=True)
+    plataforma = Column(String(10), nullable=False)
+    eliminado = Column(Boolean, nullable=False, default=False)
+    motivo_eliminado = Column(Text)
+    fecha_creado = columna_fecha_creado()
+    usuario_creado = Column(String(20), nullable=False)
+    fecha_actualizado = Column(DateTime)
+    usuario_actualizado = Column(String(20))
+    
+    __table_args__ = (
+        CheckConstraint("plataforma IN ('android','ios','web')", name='chk_dispositivo_fcm_plataforma'),
+        Index('ix_dispositivo_fcm_persona', 'persona_fk',
+              postgresql_where=(eliminado == False)),
+    )
+
+
+class NotificacionEnvio(Base):
+    """
+    Bandeja de salida (outbox) de notificaciones push: se escribe en la misma
+    transacción que la notificación y sus destinos, y la vacía el despachador
+    """
+    __tablename__ = "notificacion_envio"
+    
+    notificacion_envio_pk = Column(Integer, primary_key=True)
+    notificacion_fk = Column(Integer, ForeignKey('notificacion.notificacion_pk'), nullable=False)
+    titulo = Column(String(100), nullable=False)
+    datos = Column(JSONB)
+    estado = Column(String(12), nullable=False, default='pendiente')
+    intentos = Column(Integer, nullable=False, default=0)
+    # Próximo intento; mientras está 'procesando' es el vencimiento de la reserva
+    proximo_intento = Column(DateTime, nullable=False, default=ahora_solicitud)
+    ultimo_error = Column(Text)
+    fecha_creado = columna_fecha_creado()
+    usuario_creado = Column(String(20), nullable=False)
+    fecha_actualizado = Column(DateTime)
+    usuario_actualizado = Column(String(20))
+    
+    __table_args__ = (
+        CheckConstraint(
+            "estado IN ('pendiente','procesando','enviado','fallido')",
+            name='chk_notificacion_envio_estado'
+        ),
+        Index('ix_notificacion_envio_pendiente', 'proximo_intento',
+              postgresql_where=(estado.in_(('pendiente', 'procesando')))),
+    )
+
+
 class Bitacora(Base):
-    """Tabla de bitácora de auditoría"""
+    """Tabla de bitácora de auditoría (particionada por mes de fecha_creado)"""
     __tablename__ = "bitacora"
     
-    bitacora_pk = Column(Integer, primary_key=True)
+    bitacora_pk = Column(Integer, primary_key=True, autoincrement=True)
     entidad = Column(String(50), nullable=False)
     entidad_id = Column(String(50), nullable=False)
     operacion = Column(String(20), nullable=False)
@@ -572,4 +712,14 @@ class Bitacora(Base):
     valor_anterior = Column(JSONB)
     valor_nuevo = Column(JSONB)
     descripcion = Column(Text)
-    fecha_creado = Column(DateTime, default=lambda: ahora_sin_tz())
+    # Clave de partición: forma parte de la PK
+    fecha_creado = columna_fecha_creado(primary_key=True)
+    
+    __table_args__ = (
+        {'postgresql_partition_by': 'RANGE (fecha_creado)'},
+    )
+
+
+# Con DB_CREATE_ALL, las tablas particionadas nacen con sus particiones mensuales
+for _tabla in (Acceso.__table__, NotificacionDestino.__table__, Bitacora.__table__):
+    event.listen(_tabla, "after_create", crear_particiones_iniciales)
@@ -0,0 +1,198 @@
+"""
+Particionamiento mensual de tablas de solo inserción.
+
+acceso, bitacora y notificacion_destino están particionadas por rango de
+`fecha_creado` (PostgreSQL declarativo), una partición por mes con nombre
+`<tabla>_AAAA_MM`. Las consultas filtradas por fecha solo recorren las
+particiones del rango, y la retención se hace desacoplando (DETACH) o
+eliminando particiones completas en lugar de un DELETE masivo.
+
+Cada tabla tiene además una partición DEFAULT (`<tabla>_default`) que recibe
+las filas de meses sin partición, para que un INSERT no falle si el job de
+`scripts/particiones.py crear` no corrió a tiempo. Al crear después la
+partición de ese mes, sus filas se mueven desde la DEFAULT.
+
+Las funciones reciben una `Connection` de SQLAlchemy y solo actúan sobre
+PostgreSQL; en otros motores no hacen nada.
+"""
+import re
+from datetime import date
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.infrastructure.utils.time_utils import ahora_sin_tz
+
+TABLAS_PARTICIONADAS = ("acceso", "bitacora", "notificacion_destino")
+
+# Meses futuros que deben existir siempre, para que ningún INSERT quede sin partición
+MESES_ADELANTE_POR_DEFECTO = 3
+
+
+def inicio_mes(dia: date) -> date:
+    """Primer día del mes de `dia`"""
+    return dia.replace(day=1)
+
+
+def sumar_meses(mes: date, cantidad: int) -> date:
+    """Primer día del mes desplazado `cantidad` meses (acepta negativos)"""
+    indice = mes.year * 12 + mes.month - 1 + cantidad
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def nombre_particion(tabla: str, mes: date) -> str:
+    """
+    Example:
+        >>> nombre_particion("acceso", date(2026, 10, 1))
+        'acceso_2026_10'
+    """
+    return f"{tabla}_{mes.year:04d}_{mes.month:02d}"
+
+
+def nombre_particion_default(tabla: str) -> str:
+    return f"{tabla}_default"
+
+
+def _validar_tabla(tabla: str) -> None:
+    # Los nombres se interpolan en DDL: solo se aceptan tablas conocidas
+    if tabla not in TABLAS_PARTICIONADAS:
+        raise ValueError(f"Tabla no particionada: {tabla}")
+
+
+def crear_particiones(conn: Connection, tabla: str, desde: date, hasta: date) -> List[str]:
+    """
+    Crea (si no existen) las particiones mensuales de `tabla` entre los meses
+    de `desde` y `hasta`, ambos inclusive.
+
+    Returns:
+        Nombres de las particiones del rango
+    """
+    _validar_tabla(tabla)
+    if conn.dialect.name != "postgresql":
+        return []
+
+    nombres = []
+    mes = inicio_mes(desde)
+    while mes <= inicio_mes(hasta):
+        nombres.append(_crear_particion_mes(conn, tabla, mes))
+        mes = sumar_meses(mes, 1)
+    return nombres
+
+
+def _existe(conn: Connection, nombre: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:nombre) IS NOT NULL"), {"nombre": nombre}).scalar()
+
+
+def _crear_particion_mes(conn: Connection, tabla: str, mes: date) -> str:
+    """
+    Crea la partición del mes si falta. Si la partición DEFAULT ya tiene filas
+    de ese mes, PostgreSQL rechaza el CREATE ... PARTITION OF: en ese caso se
+    crea la tabla suelta, se mueven las filas y se adjunta (ATTACH), todo en la
+    transacción de `conn`.
+    """
+    nombre = nombre_particion(tabla, mes)
+    if _existe(conn, nombre):
+        return nombre
+
+    desde, hasta = mes.isoformat(), sumar_meses(mes, 1).isoformat()
+    rango = f"FOR VALUES FROM ('{desde}') TO ('{hasta}')"
+    default = nombre_particion_default(tabla)
+    filtro = f"fecha_creado >= '{desde}' AND fecha_creado < '{hasta}'"
+
+    if _existe(conn, default) and conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {filtro})")
+    ).scalar():
+        conn.execute(text(
+            f"CREATE TABLE {nombre} (LIKE {tabla} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        conn.execute(text(f"INSERT INTO {nombre} SELECT * FROM {default} WHERE {filtro}"))
+        conn.execute(text(f"DELETE FROM {default} WHERE {filtro}"))
+        conn.execute(text(f"ALTER TABLE {tabla} ATTACH PARTITION {nombre} {rango}"))
+    else:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {nombre} PARTITION OF {tabla} {rango}"))
+    return nombre
+
+
+def crear_particion_default(conn: Connection, tabla: str) -> str:
+    """Crea (si no existe) la partición DEFAULT de `tabla`"""
+    _validar_tabla(tabla)
+    nombre = nombre_particion_default(tabla)
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {nombre} PARTITION OF {tabla} DEFAULT"))
+    return nombre
+
+
+def asegurar_particiones_futuras(
+    conn: Connection,
+    hoy: date,
+    meses_adelante: int = MESES_ADELANTE_POR_DEFECTO
+) -> List[str]:
+    """Crea las particiones del mes de `hoy` y de los `meses_adelante` siguientes"""
+    nombres = []
+    for tabla in TABLAS_PARTICIONADAS:
+        nombres += crear_particiones(conn, tabla, hoy, sumar_meses(inicio_mes(hoy), meses_adelante))
+    return nombres
+
+
+def listar_particiones(conn: Connection, tabla: str) -> List[date]:
+    """Meses (primer día) de las particiones adjuntas a `tabla`, en orden"""
+    _validar_tabla(tabla)
+    if conn.dialect.name != "postgresql":
+        return []
+
+    nombres = conn.execute(text(
+        "SELECT hija.relname FROM pg_inherits "
+        "JOIN pg_class padre ON padre.oid = pg_inherits.inhparent "
+        "JOIN pg_class hija ON hija.oid = pg_inherits.inhrelid "
+        "WHERE padre.relname = :tabla"
+    ), {"tabla": tabla}).scalars()
+
+    patron = re.compile(rf"^{tabla}_(\d{{4}})_(\d{{2}})$")
+    meses = []
+    for nombre in nombres:
+        coincidencia = patron.match(nombre)
+        if coincidencia:
+            meses.append(date(int(coincidencia.group(1)), int(coincidencia.group(2)), 1))
+    return sorted(meses)
+
+
+def desacoplar_particiones(
+    conn: Connection,
+    tabla: str,
+    anteriores_a: date,
+    eliminar: bool = False
+) -> List[str]:
+    """
+    Desacopla de `tabla` las particiones de meses anteriores a `anteriores_a`.
+
+    Sin `eliminar`, cada partición queda como tabla independiente para
+    archivarla (pg_dump) y borrarla después; con `eliminar` se borra en el acto.
+
+    Returns:
+        Nombres de las particiones desacopladas
+    """
+    limite = inicio_mes(anteriores_a)
+    nombres = []
+    for mes in listar_particiones(conn, tabla):
+        if mes >= limite:
+            break
+        nombre = nombre_particion(tabla, mes)
+        conn.execute(text(f"ALTER TABLE {tabla} DETACH PARTITION {nombre}"))
+        if eliminar:
+            conn.execute(text(f"DROP TABLE {nombre}"))
+        nombres.append(nombre)
+    return nombres
+
+
+def crear_particiones_iniciales(target, connection: Connection, **kw) -> None:
+    """
+    Evento `after_create` de las tablas particionadas: con DB_CREATE_ALL en
+    desarrollo deja creadas la partición DEFAULT y las del mes actual y los
+    siguientes.
+    """
+    crear_particion_default(connection, target.name)
+    hoy = ahora_sin_tz().date()
+    crear_particiones(
+        connection, target.name, hoy, sumar_meses(inicio_mes(hoy), MESES_ADELANTE_POR_DEFECTO)
+    )
@@ -0,0 +1,119 @@
+"""
+Métricas del pool de conexiones de SQLAlchemy.
+
+Registra cuánto espera cada request por una conexión del pool (histograma)
+y cuántas veces se agota el tiempo de espera, además del estado actual del
+pool (conexiones en uso, disponibles y overflow). Permite dimensionar el pool
+de cada instancia contra el límite de conexiones de Cloud SQL.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+# Límites superiores (en milisegundos) de los buckets del histograma de espera
+BUCKETS_ESPERA_MS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class MetricasPool:
+    """Acumulador thread-safe de tiempos de espera por conexión"""
+    
+    def __init__(self, nombre: str, buckets_ms: Tuple[float, ...] = BUCKETS_ESPERA_MS):
+        self.nombre = nombre
+        self.buckets_ms = buckets_ms
+        self._lock = threading.Lock()
+        self.reiniciar()
+    
+    def reiniciar(self) -> None:
+        """Reinicia los contadores acumulados"""
+        with self._lock:
+            # Un bucket adicional para esperas mayores al último límite (+Inf)
+            self._conteos: List[int] = [0] * (len(self.buckets_ms) + 1)
+            self._total_esperas = 0
+            self._suma_espera_ms = 0.0
+            self._max_espera_ms = 0.0
+            self._timeouts = 0
+    
+    def registrar_espera(self, espera_ms: float) -> None:
+        """Registra el tiempo que tardó en obtenerse una conexión"""
+        indice = len(self.buckets_ms)
+        for i, limite in enumerate(self.buckets_ms):
+            if espera_ms <= limite:
+                indice = i
+                break
+        
+        with self._lock:
+            self._conteos[indice] += 1
+            self._total_esperas += 1
+            self._suma_espera_ms += espera_ms
+            if espera_ms > self._max_espera_ms:
+                self._max_espera_ms = espera_ms
+    
+    def registrar_timeout(self) -> None:
+        """Registra un checkout que agotó DB_POOL_TIMEOUT"""
+        with self._lock:
+            self._timeouts += 1
+    
+    def snapshot(self) -> Dict:
+        """Devuelve una copia de los contadores acumulados"""
+        with self._lock:
+            histograma = []
+            acumulado = 0
+            for limite, conteo in zip(list(self.buckets_ms) + ["+Inf"], self._conteos):
+                acumulado += conteo
+                histograma.append({"le_ms": limite, "cantidad": acumulado})
+            
+            return {
+                "checkouts": self._total_esperas,
+                "timeouts": self._timeouts,
+                "espera_promedio_ms": (
+                    round(self._suma_espera_ms / self._total_esperas, 3)
+                    if self._total_esperas else 0.0
+                ),
+                "espera_maxima_ms": round(self._max_espera_ms, 3),
+                "histograma_espera": histograma
+            }
+
+
+class _PoolMedidoMixin:
+    """Mide el tiempo de espera de cada checkout del pool"""
+    
+    metricas: Optional[MetricasPool] = None
+    
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except exc.TimeoutError:
+            if self.metricas is not None:
+                self.metricas.registrar_timeout()
+            raise
+        if self.metricas is not None:
+            self.metricas.registrar_espera((time.perf_counter() - inicio) * 1000)
+        return conexion
+
+
+def crear_pool_medido(pool_base: Type[Pool], metricas: MetricasPool) -> Type[Pool]:
+    """
+    Crea una subclase de `pool_base` que reporta a `metricas`.
+    
+    Las métricas viven en la clase (no en la instancia) para sobrevivir a
+    `Pool.recreate()`, que SQLAlchemy usa al invalidar el pool.
+    """
+    return type(
+        f"{pool_base.__name__}Medido",
+        (_PoolMedidoMixin, pool_base),
+        {"metricas": metricas}
+    )
+
+
+def estado_pool(pool: Pool) -> Dict:
+    """Estado instantáneo de un QueuePool (o AsyncAdaptedQueuePool)"""
+    return {
+        "tamano": pool.size(),
+        "disponibles": pool.checkedin(),
+        "en_uso": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
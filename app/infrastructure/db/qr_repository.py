@@ -0,0 +1,170 @@
+"""
+Repositorio de códigos QR (adaptador de persistencia para los casos de uso de QR)
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import DateTime, Integer, String, case, insert, literal, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.models import QR, EstadoQREnum
+from app.infrastructure.cache.qr_cache import CacheQRVigentes
+from app.infrastructure.db.models import QR as QRModel, Acceso as AccesoModel, Cuenta
+from app.infrastructure.utils.time_utils import ahora_sin_tz
+
+
+class QRRepository:
+    """Acceso a la tabla qr con sesión asíncrona"""
+    
+    def __init__(self, db: AsyncSession, cache: Optional[CacheQRVigentes] = None):
+        self.db = db
+        self.cache = cache
+    
+    @staticmethod
+    def a_entidad(qr: QRModel) -> QR:
+        """Convierte el modelo ORM a la entidad de dominio"""
+        return QR(
+            id=qr.qr_pk,
+            cuenta_id=qr.cuenta_autoriza_fk,
+            vivienda_id=qr.vivienda_visita_fk,
+            visita_id=qr.visita_ingreso_fk,
+            hora_inicio_vigencia=qr.hora_inicio_vigencia,
+            hora_fin_vigencia=qr.hora_fin_vigencia,
+            hora_usado=qr.hora_usado,
+            token=qr.token,
+            estado=EstadoQREnum(qr.estado),
+            eliminado=qr.eliminado,
+            usuario_creado=qr.usuario_creado,
+            fecha_creado=qr.fecha_creado,
+        )
+    
+    async def obtener_por_token(self, token: str) -> Optional[QR]:
+        """
+        Obtiene un QR no eliminado por su token.
+        Si hay caché, se consulta primero; en fallo se busca en BD con un filtro
+        que coincide con el índice parcial uq_qr_token_activo.
+        """
+        if self.cache is not None:
+            qr = self.cache.obtener(token)
+            if qr is not None:
+                return qr
+        
+        resultado = await self.db.execute(
+            select(QRModel).where(
+                QRModel.token == token,
+                QRModel.eliminado == False
+            )
+        )
+        qr = resultado.scalars().first()
+        if not qr:
+            return None
+        
+        entidad = self.a_entidad(qr)
+        if self.cache is not None:
+            self.cache.guardar(entidad)
+        return entidad
+    
+    async def listar_vigentes(self, limite: int) -> List[QR]:
+        """QRs vigentes en este momento (hora_inicio_vigencia <= ahora <= hora_fin_vigencia)"""
+        ahora = ahora_sin_tz()
+        resultado = await self.db.execute(
+            select(QRModel).where(
+                QRModel.estado == "vigente",
+                QRModel.eliminado == False,
+                QRModel.hora_inicio_vigencia <= ahora,
+                QRModel.hora_fin_vigencia >= ahora
+            ).limit(limite)
+        )
+        return [self.a_entidad(qr) for qr in resultado.scalars().all()]
+
+    async def consumir(
+        self,
+        token: str,
+        usuario: str,
+        persona_guardia_id: Optional[int] = None,
+        ahora: Optional[datetime] = None
+    ) -> Optional[Dict]:
+        """
+        Consume un QR de forma atómica en un solo round-trip:
+        
+            WITH consumido AS (UPDATE qr SET estado='usado' ... WHERE vigente RETURNING ...),
+                 registrado AS (INSERT INTO acceso ... SELECT FROM consumido RETURNING ...)
+            SELECT ... FROM consumido, registrado
+        
+        El UPDATE toma el lock de la fila, por lo que dos escaneos concurrentes
+        del mismo QR no pueden ser aceptados ambos. Confirma la transacción.
+        
+        Returns:
+            Dict con qr_id, acceso_id, tipo, vivienda_id, visita_id, o None si
+            el QR no existe, no está vigente o ya fue usado/anulado.
+        """
+        ahora = ahora or ahora_sin_tz()
+        
+        consumido = update(QRModel).where(
+            QRModel.token == token,
+            QRModel.eliminado == False,
+            QRModel.estado == "vigente",
+            QRModel.hora_inicio_vigencia <= ahora,
+            QRModel.hora_fin_vigencia >= ahora
+        ).values(
+            estado="usado",
+            hora_usado=ahora,
+            fecha_actualizado=ahora,
+            usuario_actualizado=usuario
+        ).returning(
+            QRModel.qr_pk,
+            QRModel.vivienda_visita_fk,
+            QRModel.visita_ingreso_fk,
+            QRModel.cuenta_autoriza_fk
+        ).cte("consumido")
+        
+        registrado = insert(AccesoModel).from_select(
+            [
+                "tipo", "vivienda_visita_fk", "resultado", "visita_ingreso_fk",
+                "persona_residente_autoriza_fk", "persona_guardia_fk",
+                "usuario_creado", "fecha_creado"
+            ],
+            select(
+                case(
+                    (consumido.c.visita_ingreso_fk.is_not(None), "qr_visita"),
+                    else_="qr_residente"
+                ),
+                consumido.c.vivienda_visita_fk,
+                literal("autorizado", String),
+                consumido.c.visita_ingreso_fk,
+                Cuenta.persona_titular_fk,
+                literal(persona_guardia_id, Integer),
+                literal(usuario, String),
+                literal(ahora, DateTime)
+            ).select_from(
+                consumido.join(Cuenta, Cuenta.cuenta_pk == consumido.c.cuenta_autoriza_fk)
+            )
+        ).returning(
+            AccesoModel.acceso_pk,
+            AccesoModel.tipo
+        ).cte("registrado")
+        
+        fila = (await self.db.execute(
+            select(
+                consumido.c.qr_pk,
+                consumido.c.vivienda_visita_fk,
+                consumido.c.visita_ingreso_fk,
+                registrado.c.acceso_pk,
+                registrado.c.tipo
+            ).select_from(consumido.join(registrado, true()))
+        )).first()
+        await self.db.commit()
+        
+        if self.cache is not None:
+            self.cache.invalidar(token)
+        
+        if not fila:
+            return None
+        
+        return {
+            "qr_id": fila.qr_pk,
+            "acceso_id": fila.acceso_pk,
+            "tipo": fila.tipo,
+            "vivienda_id": fila.vivienda_visita_fk,
+            "visita_id": fila.visita_ingreso_fk
+        }
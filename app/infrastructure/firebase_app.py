@@ -0,0 +1,29 @@
+"""
+App de Firebase Admin compartida por Firestore y FCM.
+
+`initialize_app` falla si la app por defecto ya existe, y `messaging` falla
+si no existe: quien la use primero (una solicitud, el despachador de
+notificaciones o un script) la crea y los demás la reutilizan.
+"""
+import threading
+
+import firebase_admin
+from firebase_admin import credentials
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_lock = threading.Lock()
+
+
+def obtener_app_firebase() -> firebase_admin.App:
+    """Retorna la app por defecto de Firebase Admin, inicializándola si falta"""
+    with _lock:
+        try:
+            return firebase_admin.get_app()
+        except ValueError:
+            cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
+            return firebase_admin.initialize_app(cred, {
+                'projectId': settings.FIREBASE_PROJECT_ID
+            })
@@ -1,6 +1,6 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import firestore
 from app.config import get_settings
+from app.infrastructure.firebase_app import obtener_app_firebase
 from typing import Dict, Any, Optional
 
 settings = get_settings()
@@ -22,12 +22,8 @@ class FirestoreClient:
             return
         
         try:
-            # Inicializar Firebase
-            cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
-            firebase_admin.initialize_app(cred, {
-                'projectId': settings.FIREBASE_PROJECT_ID
-            })
-            self.db = firestore.client()
+            # Inicializar Firebase (o reutilizar la app creada por FCM)
+            self.db = firestore.client(obtener_app_firebase())
             self._initialized = True
         except Exception as e:
             print(f"Error inicializando Firestore: {e}")
@@ -1,21 +1,169 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
 import firebase_admin
 from firebase_admin import credentials, messaging
 from app.config import get_settings
-from typing import List, Dict, Any, Optional
+from app.infrastructure.firebase_app import obtener_app_firebase
+from typing import Iterable, List, Dict, Any, Optional
 
 settings = get_settings()
 
+# Máximo de tokens por MulticastMessage que acepta FCM
+TAMANO_MAXIMO_LOTE = 500
+# Errores de FCM que indican que el token ya no sirve (app desinstalada,
+# token expirado o de otro proyecto): el token debe darse de baja
+ERRORES_TOKEN_INVALIDO = (messaging.UnregisteredError, messaging.SenderIdMismatchError)
+
+
+@dataclass
+class ResultadoToken:
+    """Resultado del envío a un token"""
+    token: str
+    exitoso: bool
+    error: Optional[str] = None
+    invalido: bool = False
+
+
+@dataclass
+class ResultadoEnvioMasivo:
+    """Resultado agregado de un envío masivo por lotes"""
+    exitosos: List[str] = field(default_factory=list)
+    # token -> mensaje de error
+    fallidos: Dict[str, str] = field(default_factory=dict)
+    # Subconjunto de fallidos que deben darse de baja
+    invalidos: List[str] = field(default_factory=list)
+    lotes: int = 0
+    
+    def resumen(self) -> Dict[str, int]:
+        return {
+            "exitosos": len(self.exitosos),
+            "fallidos": len(self.fallidos),
+            "invalidos": len(self.invalidos),
+            "lotes": self.lotes
+        }
+
+
+class TransporteMensajeria:
+    """Envía un lote de hasta TAMANO_MAXIMO_LOTE tokens"""
+    
+    def enviar_lote(
+        self,
+        tokens: List[str],
+        titulo: str,
+        cuerpo: str,
+        datos: Dict[str, str]
+    ) -> List[ResultadoToken]:
+        """Retorna un resultado por token, en el mismo orden"""
+        raise NotImplementedError
+
+
+class TransporteFirebase(TransporteMensajeria):
+    """Envío real con firebase_admin (send_each_for_multicast)"""
+    
+    def __init__(self):
+        # Sin esto, un proceso que no pasó por Firestore (despachador, scripts)
+        # no tiene app por defecto y cada envío falla
+        self.app = obtener_app_firebase()
+    
+    def enviar_lote(
+        self,
+        tokens: List[str],
+        titulo: str,
+        cuerpo: str,
+        datos: Dict[str, str]
+    ) -> List[ResultadoToken]:
+        message = messaging.MulticastMessage(
+            notification=messaging.Notification(
+                title=titulo,
+                body=cuerpo
+            ),
+            data=datos,
+            tokens=tokens
+        )
+        response = messaging.send_each_for_multicast(message, app=self.app)
+        return [
+            ResultadoToken(token, True) if respuesta.success else ResultadoToken(
+                token,
+                False,
+                error=str(respuesta.exception),
+                invalido=isinstance(respuesta.exception, ERRORES_TOKEN_INVALIDO)
+            )
+            for token, respuesta in zip(tokens, response.responses)
+        ]
+
+
+class TransporteMensajeriaFalso(TransporteMensajeria):
+    """
+    Transporte local para pruebas: no usa red. Registra los lotes recibidos y
+    la concurrencia máxima observada; `invalidos` y `errores` (token -> error)
+    simulan las respuestas de FCM.
+    """
+    
+    def __init__(
+        self,
+        invalidos: Iterable[str] = (),
+        errores: Optional[Dict[str, str]] = None,
+        latencia_segundos: float = 0.0
+    ):
+        self.invalidos = set(invalidos)
+        self.errores = dict(errores or {})
+        self.latencia_segundos = latencia_segundos
+        self.lotes: List[List[str]] = []
+        self.concurrencia_maxima = 0
+        self._en_curso = 0
+        self._lock = threading.Lock()
+    
+    def enviar_lote(
+        self,
+        tokens: List[str],
+        titulo: str,
+        cuerpo: str,
+        datos: Dict[str, str]
+    ) -> List[ResultadoToken]:
+        with self._lock:
+            self.lotes.append(list(tokens))
+            self._en_curso += 1
+            self.concurrencia_maxima = max(self.concurrencia_maxima, self._en_curso)
+        try:
+            if self.latencia_segundos:
+                time.sleep(self.latencia_segundos)
+            resultados = []
+            for token in tokens:
+                if token in self.invalidos:
+                    resultados.append(ResultadoToken(
+                        token, False, error="Requested entity was not found.", invalido=True
+                    ))
+                elif token in self.errores:
+                    resultados.append(ResultadoToken(token, False, error=self.errores[token]))
+                else:
+                    resultados.append(ResultadoToken(token, True))
+            return resultados
+        finally:
+            with self._lock:
+                self._en_curso -= 1
+
 
 class FCMClient:
     """Cliente para Firebase Cloud Messaging"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        transporte: Optional[TransporteMensajeria] = None,
+        tamano_lote: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ):
         try:
             # Usar la misma instancia de Firebase Admin del cliente de Firestore
             self.messaging_client = messaging
         except Exception as e:
             print(f"Error inicializando FCM: {e}")
             raise
+        self.transporte = transporte or TransporteFirebase()
+        self.tamano_lote = max(1, min(tamano_lote or settings.FCM_TAMANO_LOTE, TAMANO_MAXIMO_LOTE))
+        self.max_workers = max(1, max_workers or settings.FCM_MAX_WORKERS)
     
     def enviar_notificacion_push(
         self,
@@ -63,34 +211,52 @@ class FCMClient:
         Envía una notificación push a múltiples dispositivos
         
         Args:
-            tokens: Lista de tokens FCM
+            tokens: Lista de tokens FCM (sin límite: se envía por lotes)
             titulo: Título de la notificación
             cuerpo: Cuerpo del mensaje
             datos: Datos adicionales
             
         Returns:
-            Dict con estadísticas de envío
+            Dict con estadísticas de envío y los tokens inválidos
         """
-        try:
-            message = messaging.MulticastMessage(
-                notification=messaging.Notification(
-                    title=titulo,
-                    body=cuerpo
-                ),
-                data=datos or {},
-                tokens=tokens
-            )
-            
-            response = self.messaging_client.send_multicast(message)
-            
-            return {
-                "exitosos": response.success_count,
-                "fallidos": response.failure_count,
-                "respuestas": response.responses
-            }
-        except Exception as e:
-            print(f"Error enviando notificaciones multicast FCM: {e}")
-            raise
+        resultado = self.enviar_masivo(tokens, titulo, cuerpo, datos)
+        return {**resultado.resumen(), "tokens_invalidos": resultado.invalidos}
+    
+    def enviar_masivo(
+        self,
+        tokens: Iterable[str],
+        titulo: str,
+        cuerpo: str,
+        datos: Optional[Dict[str, str]] = None
+    ) -> ResultadoEnvioMasivo:
+        """
+        Envía la notificación a todos los tokens en lotes de `tamano_lote`,
+        con hasta `max_workers` lotes en paralelo. El fallo de un lote completo
+        (p. ej. error de red) marca sus tokens como fallidos sin afectar a los demás.
+        """
+        tokens = list(dict.fromkeys(tokens))
+        lotes = [tokens[i:i + self.tamano_lote] for i in range(0, len(tokens), self.tamano_lote)]
+        resultado = ResultadoEnvioMasivo(lotes=len(lotes))
+        if not lotes:
+            return resultado
+        
+        def enviar(lote: List[str]) -> List[ResultadoToken]:
+            try:
+                return self.transporte.enviar_lote(lote, titulo, cuerpo, datos or {})
+            except Exception as e:
+                print(f"Error enviando lote FCM ({len(lote)} tokens): {e}")
+                return [ResultadoToken(token, False, error=str(e)) for token in lote]
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(lotes))) as pool:
+            for resultados in pool.map(enviar, lotes):
+                for r in resultados:
+                    if r.exitoso:
+                        resultado.exitosos.append(r.token)
+                        continue
+                    resultado.fallidos[r.token] = r.error or "Error desconocido"
+                    if r.invalido:
+                        resultado.invalidos.append(r.token)
+        return resultado
     
     def suscribir_a_topico(self, tokens: List[str], topico: str) -> Dict[str, Any]:
         """
@@ -149,6 +315,17 @@ class FCMClient:
             raise
 
 
+_fcm_client: Optional[FCMClient] = None
+_fcm_lock = threading.Lock()
+
+
 def get_fcm_client() -> FCMClient:
-    """Obtiene instancia de FCMClient"""
-    return FCMClient()
+    """
+    Obtiene la instancia de FCMClient del proceso (se crea en el primer uso).
+    Si falla (p. ej. sin credenciales de Firebase), se reintenta en la siguiente llamada.
+    """
+    global _fcm_client
+    with _fcm_lock:
+        if _fcm_client is None:
+            _fcm_client = FCMClient()
+        return _fcm_client
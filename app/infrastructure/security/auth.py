@@ -1,8 +1,9 @@
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthCredential
-import firebase_admin
-from firebase_admin import auth as firebase_auth
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.config import get_settings
+from app.infrastructure.security.verificador_firebase import (
+    TokenFirebaseInvalido, get_verificador_firebase
+)
 from typing import Optional, Dict
 from datetime import timedelta
 from app.infrastructure.utils.time_utils import ahora_sin_tz
@@ -15,9 +16,10 @@ class FirebaseAuthenticator:
     """Autenticador usando Firebase Auth"""
     
     @staticmethod
-    def verificar_token_firebase(credential: HTTPAuthCredential) -> Dict:
+    def verificar_token_firebase(credential: HTTPAuthorizationCredentials) -> Dict:
         """
-        Verifica un idToken de Firebase
+        Verifica un idToken de Firebase localmente, con los certificados de
+        Google y los tokens ya verificados en caché (ver verificador_firebase)
         
         Args:
             credential: Credencial HTTP con el token
@@ -26,9 +28,8 @@ class FirebaseAuthenticator:
             Dict con datos del usuario decodificados
         """
         try:
-            decoded_token = firebase_auth.verify_id_token(credential.credentials)
-            return decoded_token
-        except firebase_auth.InvalidIdTokenError:
+            return get_verificador_firebase().verificar(credential.credentials)
+        except TokenFirebaseInvalido:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token inválido o expirado"
@@ -41,7 +42,7 @@ class FirebaseAuthenticator:
 
 
 async def obtener_usuario_firebase(
-    credential: HTTPAuthCredential = Depends(security)
+    credential: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict:
     """
     Dependency para obtener usuario autenticado con Firebase
@@ -115,7 +116,7 @@ class JWTHandler:
 
 
 async def obtener_usuario_jwt(
-    credential: HTTPAuthCredential = Depends(security)
+    credential: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict:
     """
     Dependency para obtener usuario autenticado con JWT (para migración futura)
@@ -128,7 +129,7 @@ async def obtener_usuario_jwt(
 
 # Función que elige qué autenticador usar
 async def obtener_usuario_actual(
-    credential: HTTPAuthCredential = Depends(security)
+    credential: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict:
     """
     Obtiene usuario actual.
@@ -7,40 +7,15 @@ from fastapi import Depends, HTTPException, status, Header
 from sqlalchemy.orm import Session
 from app.infrastructure.db import get_db
 from app.infrastructure.db.models import Cuenta, Persona
+from app.infrastructure.cache.principal_cache import get_principal_cache
+from app.infrastructure.security.verificador_firebase import (
+    TokenFirebaseInvalido, get_verificador_firebase
+)
+from app.config import get_settings
 from typing import Optional
 import os
 
-# Simulación de Firebase (cambiar a importar firebase_admin cuando se configure)
-class FirebaseAuth:
-    """Placeholder para Firebase Auth"""
-    
-    @staticmethod
-    def verify_id_token(token: str) -> dict:
-        """
-        Verifica un token JWT de Firebase
-        En producción, usar firebase_admin
-        """
-        try:
-            # Placeholder - implementar con firebase_admin
-            # decoded = auth.verify_id_token(token)
-            # return decoded
-            
-            # Por ahora retornar estructura esperada para testing
-            if not token:
-                raise ValueError("Token vacío")
-            
-            # En producción:
-            # import firebase_admin
-            # from firebase_admin import auth
-            # decoded = auth.verify_id_token(token)
-            # return decoded
-            
-            return {"uid": token, "email": f"user_{token}@example.com"}
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Token inválido: {str(e)}"
-            )
+settings = get_settings()
 
 
 def obtener_usuario_autenticado(
@@ -50,6 +25,12 @@ def obtener_usuario_autenticado(
     """
     Dependency que valida el token JWT y retorna datos del usuario
     
+    Cuenta y persona se toman de la caché de principales por UID; solo en un
+    fallo de caché se consultan (una consulta). La caché es por proceso: al
+    confirmar un bloqueo, desbloqueo o eliminación se invalida en la instancia
+    que hizo el cambio, pero en las demás instancias una cuenta bloqueada sigue
+    autenticándose hasta PRINCIPAL_CACHE_TTL_SECONDS (60 s por defecto).
+    
     Uso:
         @router.get("/perfil")
         def get_perfil(usuario: dict = Depends(obtener_usuario_autenticado)):
@@ -72,34 +53,57 @@ def obtener_usuario_autenticado(
             detail="Formato inválido. Use: Authorization: Bearer <token>"
         )
     
-    # Verificar token
-    firebase_auth = FirebaseAuth()
-    decoded = firebase_auth.verify_id_token(token)
-    firebase_uid = decoded.get("uid")
-    
-    # Obtener cuenta desde BD
-    cuenta = db.query(Cuenta).filter(
-        Cuenta.firebase_uid == firebase_uid,
-        Cuenta.eliminado == False,
-        Cuenta.estado == "activo"
-    ).first()
-    
-    if not cuenta:
+    # Verificar token (firma y claims, localmente con certificados en caché)
+    try:
+        decoded = get_verificador_firebase().verificar(token)
+    except TokenFirebaseInvalido:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Usuario no tiene cuenta activa en el sistema"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido o expirado"
         )
+    firebase_uid = decoded.get("uid")
     
-    # Obtener persona asociada
-    persona = db.query(Persona).filter(Persona.persona_pk == cuenta.persona_titular_fk).first()
+    cache = get_principal_cache() if settings.PRINCIPAL_CACHE_ENABLED else None
+    principal = cache.obtener_principal(firebase_uid) if cache is not None else None
+    
+    if principal is None:
+        # Cuenta activa y persona asociada en una sola consulta
+        fila = db.query(
+            Cuenta.cuenta_pk,
+            Cuenta.estado,
+            Persona.persona_pk,
+            Persona.nombres,
+            Persona.apellidos
+        ).join(
+            Persona, Persona.persona_pk == Cuenta.persona_titular_fk
+        ).filter(
+            Cuenta.firebase_uid == firebase_uid,
+            Cuenta.eliminado == False,
+            Cuenta.estado == "activo"
+        ).first()
+        
+        if not fila:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuario no tiene cuenta activa en el sistema"
+            )
+        
+        principal = {
+            "cuenta_id": fila.cuenta_pk,
+            "persona_id": fila.persona_pk,
+            "nombres": f"{fila.nombres} {fila.apellidos}",
+            "estado": fila.estado
+        }
+        if cache is not None:
+            cache.guardar_principal(firebase_uid, principal)
     
     return {
         "firebase_uid": firebase_uid,
-        "cuenta_id": cuenta.cuenta_pk,
-        "persona_id": persona.persona_pk,
-        "nombres": f"{persona.nombres} {persona.apellidos}",
+        "cuenta_id": principal["cuenta_id"],
+        "persona_id": principal["persona_id"],
+        "nombres": principal["nombres"],
         "email": decoded.get("email"),
-        "estado": cuenta.estado
+        "estado": principal["estado"]
     }
 
 
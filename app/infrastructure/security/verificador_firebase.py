@@ -0,0 +1,216 @@
+"""
+Verificación local de ID tokens de Firebase.
+
+Sustituye a `firebase_admin.auth.verify_id_token` en el camino caliente:
+
+- Los certificados públicos de Google se guardan en memoria y se renuevan
+  según su `Cache-Control: max-age` (o antes, si llega un `kid` desconocido
+  tras una rotación de claves).
+- La firma RS256 y los claims (aud, iss, exp, iat, sub) se verifican
+  localmente con python-jose, sin llamadas de red.
+- Los tokens ya verificados se memorizan (por hash SHA-256) hasta su `exp`,
+  así que un mismo token no se vuelve a verificar en cada request.
+
+La fuente de certificados es intercambiable (`FuenteCertificados`) para
+probar sin red con claves generadas localmente.
+"""
+import hashlib
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+from jose import JWTError, jwt
+
+from app.config import get_settings
+from app.infrastructure.cache.ttl_cache import CacheTTL
+
+settings = get_settings()
+
+URL_CERTIFICADOS_GOOGLE = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+# Vigencia de los certificados si la respuesta no trae max-age
+MAX_AGE_POR_DEFECTO = 3600
+# Intervalo mínimo entre descargas forzadas por un kid desconocido
+MIN_SEGUNDOS_ENTRE_RECARGAS = 60
+# Tolerancia de reloj para exp/iat/auth_time
+TOLERANCIA_RELOJ_SEGUNDOS = 60
+
+
+class TokenFirebaseInvalido(ValueError):
+    """El token no es un ID token de Firebase válido para este proyecto"""
+
+
+def max_age_de_cache_control(cache_control: Optional[str]) -> Optional[int]:
+    """
+    Example:
+        >>> max_age_de_cache_control("public, max-age=19302, must-revalidate")
+        19302
+    """
+    coincidencia = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(coincidencia.group(1)) if coincidencia else None
+
+
+class FuenteCertificados:
+    """Origen de los certificados públicos: kid -> certificado PEM"""
+
+    def obtener(self) -> Tuple[Dict[str, str], int]:
+        """Retorna (certificados, segundos de vigencia)"""
+        raise NotImplementedError
+
+
+class FuenteCertificadosGoogle(FuenteCertificados):
+    """Descarga los certificados de securetoken@system.gserviceaccount.com"""
+
+    def __init__(self, url: str = URL_CERTIFICADOS_GOOGLE, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def obtener(self) -> Tuple[Dict[str, str], int]:
+        respuesta = httpx.get(self.url, timeout=self.timeout)
+        respuesta.raise_for_status()
+        max_age = max_age_de_cache_control(respuesta.headers.get("cache-control"))
+        return respuesta.json(), max_age if max_age is not None else MAX_AGE_POR_DEFECTO
+
+
+class FuenteCertificadosEstatica(FuenteCertificados):
+    """Certificados fijos en memoria (pruebas sin red)"""
+
+    def __init__(self, certificados: Dict[str, str], max_age: int = MAX_AGE_POR_DEFECTO):
+        self.certificados = dict(certificados)
+        self.max_age = max_age
+        self.descargas = 0
+
+    def obtener(self) -> Tuple[Dict[str, str], int]:
+        self.descargas += 1
+        return dict(self.certificados), self.max_age
+
+
+class VerificadorTokensFirebase:
+    """Verifica ID tokens de Firebase con certificados y resultados en caché"""
+
+    def __init__(
+        self,
+        project_id: str,
+        fuente: Optional[FuenteCertificados] = None,
+        max_tokens: int = 50000
+    ):
+        self.project_id = project_id
+        self.emisor = f"https://securetoken.google.com/{project_id}"
+        self.fuente = fuente or FuenteCertificadosGoogle()
+        self._lock = threading.Lock()
+        self._certificados: Dict[str, str] = {}
+        self._certificados_expiran = 0.0
+        self._ultima_descarga = 0.0
+        # El TTL real de cada token es su exp; este es solo el máximo (1 h en Firebase)
+        self.tokens = CacheTTL(ttl_segundos=3600, max_entradas=max_tokens)
+
+    def verificar(self, token: str) -> Dict:
+        """
+        Verifica firma y claims del token.
+
+        Returns:
+            Claims decodificados, con `uid` igual a `sub` (como firebase_admin)
+
+        Raises:
+            TokenFirebaseInvalido: si el token no es válido
+        """
+        clave = hashlib.sha256(token.encode()).hexdigest()
+        claims = self.tokens.obtener(clave)
+        if claims is not None:
+            return dict(claims)
+
+        claims = self._decodificar(token)
+        self.tokens.guardar(clave, claims, ttl_segundos=claims["exp"] - time.time())
+        return dict(claims)
+
+    def _decodificar(self, token: str) -> Dict:
+        try:
+            cabecera = jwt.get_unverified_header(token)
+        except JWTError as e:
+            raise TokenFirebaseInvalido(f"Token mal formado: {e}")
+
+        if cabecera.get("alg") != "RS256":
+            raise TokenFirebaseInvalido("El token debe estar firmado con RS256")
+        certificado = self._certificado(cabecera.get("kid"))
+
+        try:
+            claims = jwt.decode(
+                token,
+                certificado,
+                algorithms=["RS256"],
+                audience=self.project_id,
+                issuer=self.emisor,
+                options={
+                    "leeway": TOLERANCIA_RELOJ_SEGUNDOS,
+                    "require_exp": True,
+                    "require_iat": True,
+                    "require_sub": True
+                }
+            )
+        except JWTError as e:
+            raise TokenFirebaseInvalido(str(e))
+
+        ahora = time.time()
+        sub = claims.get("sub")
+        if not isinstance(sub, str) or not sub or len(sub) > 128:
+            raise TokenFirebaseInvalido("Claim sub inválido")
+        for claim in ("iat", "auth_time"):
+            valor = claims.get(claim)
+            if not isinstance(valor, (int, float)) or valor > ahora + TOLERANCIA_RELOJ_SEGUNDOS:
+                raise TokenFirebaseInvalido(f"Claim {claim} inválido")
+
+        claims["uid"] = sub
+        return claims
+
+    def _certificado(self, kid: Optional[str]) -> str:
+        """Certificado del kid; recarga si expiró o si el kid no se conoce"""
+        with self._lock:
+            ahora = time.monotonic()
+            desconocido = kid not in self._certificados
+            puede_recargar = ahora - self._ultima_descarga >= MIN_SEGUNDOS_ENTRE_RECARGAS
+            if ahora >= self._certificados_expiran or (desconocido and puede_recargar):
+                self._recargar(ahora)
+            certificado = self._certificados.get(kid)
+        if certificado is None:
+            raise TokenFirebaseInvalido("kid desconocido")
+        return certificado
+
+    def _recargar(self, ahora: float) -> None:
+        """Descarga los certificados (requiere el lock)"""
+        try:
+            certificados, max_age = self.fuente.obtener()
+        except Exception as e:
+            # Se siguen usando los certificados previos y se reintenta más tarde
+            print(f"Error descargando certificados de Firebase: {e}")
+            self._ultima_descarga = ahora
+            self._certificados_expiran = ahora + MIN_SEGUNDOS_ENTRE_RECARGAS
+            if not self._certificados:
+                raise TokenFirebaseInvalido("No hay certificados disponibles")
+            return
+        self._certificados = certificados
+        self._certificados_expiran = ahora + max_age
+        self._ultima_descarga = ahora
+
+    def estadisticas(self) -> Dict:
+        """Certificados cargados y tasa de aciertos de la caché de tokens"""
+        return {
+            "certificados": len(self._certificados),
+            "tokens": self.tokens.estadisticas()
+        }
+
+
+_verificador: Optional[VerificadorTokensFirebase] = None
+
+
+def get_verificador_firebase() -> VerificadorTokensFirebase:
+    """Obtiene el verificador de tokens del proceso (se crea en el primer uso)"""
+    global _verificador
+    if _verificador is None:
+        _verificador = VerificadorTokensFirebase(
+            project_id=settings.FIREBASE_PROJECT_ID,
+            max_tokens=settings.FIREBASE_TOKEN_CACHE_MAX_ENTRIES
+        )
+    return _verificador
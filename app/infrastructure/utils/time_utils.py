@@ -18,17 +18,24 @@ Ejemplos de zonas horarias válidas:
   
 Ver lista completa: https://en.wikipedia.org/wiki/List_of_tz_database_time_zones
 """
-from datetime import datetime, timedelta
-from typing import Optional
-import pytz
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Iterator, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 
-def obtener_zona_horaria():
+@lru_cache(maxsize=1)
+def obtener_zona_horaria() -> ZoneInfo:
     """
     Obtiene la zona horaria configurada en settings.
     
+    Se resuelve una sola vez por proceso (settings es inmutable) y se
+    reutiliza en cada llamada a `ahora()` / `ahora_sin_tz()`.
+    
     Returns:
-        pytz.timezone: Objeto zona horaria configurada
+        ZoneInfo: Objeto zona horaria configurada
         
     Raises:
         ValueError: Si la zona horaria configurada no es válida
@@ -36,14 +43,14 @@ def obtener_zona_horaria():
     Example:
         >>> tz = obtener_zona_horaria()
         >>> print(tz)
-        # <DstTzInfo 'America/Bogota' LMT-1 day, 19:04:00 STD>
+        # America/Bogota
     """
     from app.config import get_settings
     
     settings = get_settings()
     try:
-        return pytz.timezone(settings.TIMEZONE)
-    except pytz.exceptions.UnknownTimeZoneError:
+        return ZoneInfo(settings.TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
         raise ValueError(
             f"Zona horaria inválida configurada: '{settings.TIMEZONE}'. "
             f"Ver: https://en.wikipedia.org/wiki/List_of_tz_database_time_zones"
@@ -81,6 +88,48 @@ def ahora_sin_tz() -> datetime:
     return datetime.now(obtener_zona_horaria()).replace(tzinfo=None)
 
 
+# Hora de la solicitud en curso: lista vacía al abrir el ámbito, se llena
+# en la primera llamada a `ahora_solicitud()`
+_ahora_solicitud: ContextVar[Optional[List[datetime]]] = ContextVar("ahora_solicitud", default=None)
+
+
+@contextmanager
+def ambito_solicitud() -> Iterator[None]:
+    """
+    Abre un ámbito (una solicitud HTTP, un lote de un script) en el que
+    `ahora_solicitud()` devuelve siempre la misma hora.
+    
+    Example:
+        >>> with ambito_solicitud():
+        ...     ahora_solicitud() == ahora_solicitud()
+        True
+    """
+    token = _ahora_solicitud.set([])
+    try:
+        yield
+    finally:
+        _ahora_solicitud.reset(token)
+
+
+def ahora_solicitud() -> datetime:
+    """
+    Hora local (sin tz) de la solicitud en curso: se calcula en la primera
+    llamada dentro de `ambito_solicitud()` y se reutiliza en las siguientes,
+    igual que CURRENT_TIMESTAMP en una transacción de PostgreSQL. Fuera de un
+    ámbito equivale a `ahora_sin_tz()`.
+    
+    Es el default de las columnas fecha_creado: los registros creados en una
+    misma solicitud comparten la marca de tiempo y un INSERT masivo no
+    recalcula la hora por fila.
+    """
+    fijada = _ahora_solicitud.get()
+    if fijada is None:
+        return ahora_sin_tz()
+    if not fijada:
+        fijada.append(ahora_sin_tz())
+    return fijada[0]
+
+
 def ahora_utc() -> datetime:
     """
     Obtiene la hora actual en UTC (solo si es necesario).
@@ -93,7 +142,7 @@ def ahora_utc() -> datetime:
         >>> print(ahora_u)
         # 2026-01-19 19:30:45.123456+00:00
     """
-    return datetime.now(pytz.UTC)
+    return datetime.now(timezone.utc)
 
 
 def convertir_a_local(dt_utc: datetime) -> datetime:
@@ -107,13 +156,13 @@ def convertir_a_local(dt_utc: datetime) -> datetime:
         datetime: datetime convertido a la zona horaria local
         
     Example:
-        >>> dt_utc = datetime.now(pytz.UTC)
+        >>> dt_utc = datetime.now(timezone.utc)
         >>> dt_local = convertir_a_local(dt_utc)
         >>> print(dt_local)
         # 2026-01-19 14:30:45-05:00 (en Bogotá desde UTC)
     """
     if dt_utc.tzinfo is None:
-        dt_utc = pytz.UTC.localize(dt_utc)
+        dt_utc = dt_utc.replace(tzinfo=timezone.utc)
     
     return dt_utc.astimezone(obtener_zona_horaria())
 
@@ -135,9 +184,9 @@ def convertir_de_local_a_utc(dt_local: datetime) -> datetime:
         # 2026-01-19 19:30:45+00:00
     """
     if dt_local.tzinfo is None:
-        dt_local = obtener_zona_horaria().localize(dt_local)
+        dt_local = dt_local.replace(tzinfo=obtener_zona_horaria())
     
-    return dt_local.astimezone(pytz.UTC)
+    return dt_local.astimezone(timezone.utc)
 
 
 def fecha_hoy() -> datetime:
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.infrastructure.db import get_db
+from app.infrastructure.db import SessionLocal, get_db
 from app.infrastructure.db.models import Acceso, Vivienda, Persona, Visita
 from datetime import datetime, date
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Iterator, List, Optional
+import json
 from app.application.services.accesos_service import AccesosService
+from app.interfaces.schemas.schemas import PaginaCursorResponse
+from app.interfaces.schemas.paginacion import ParametrosPagina
 
 router = APIRouter(prefix="/api/v1/accesos", tags=["Accesos"])
 
@@ -31,8 +35,8 @@ class AccesoResponse(BaseModel):
     visita_nombres: Optional[str]
 
 
-class AccesosPorViviendaResponse(BaseModel):
-    """Schema para respuesta de accesos por vivienda"""
+class AccesosPorViviendaResponse(PaginaCursorResponse):
+    """Schema para respuesta de accesos por vivienda (paginada por cursor)"""
     vivienda_id: int
     manzana: str
     villa: str
@@ -79,6 +83,7 @@ def obtener_accesos_vivienda(
     fecha_fin: Optional[date] = None,
     tipo: Optional[str] = None,
     resultado: Optional[str] = None,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db)
 ):
     """
@@ -91,10 +96,13 @@ def obtener_accesos_vivienda(
     - tipo: Filtrar por tipo de acceso
     - resultado: Filtrar por resultado del acceso
     
+    Paginado por cursor sobre (fecha_creado, acceso_pk), más recientes primero:
+    - page_size, cursor (`next_cursor` de la página anterior), incluir_total
+    
     RF-ACC-01: Consultar accesos por vivienda
     """
     try:
-        vivienda, accesos = AccesosService.obtener_accesos_vivienda(
+        vivienda, query_accesos = AccesosService.obtener_accesos_vivienda(
             db, vivienda_id, fecha_inicio, fecha_fin, tipo, resultado
         )
         
@@ -104,18 +112,23 @@ def obtener_accesos_vivienda(
                 detail="Vivienda no encontrada"
             )
         
-        # Enriquecer datos de accesos
+        resultado_pagina = pagina.paginar(
+            query_accesos, (Acceso.fecha_creado, Acceso.acceso_pk), incluir_total=True
+        )
+        
+        # Los nombres relacionados ya vienen en cada fila (una sola consulta)
         accesos_data = [
-            AccesoResponse(**AccesosService.obtener_detalles_acceso(db, acceso))
-            for acceso in accesos
+            AccesoResponse(**AccesosService.obtener_detalles_acceso(fila))
+            for fila in resultado_pagina.filas
         ]
         
         return AccesosPorViviendaResponse(
             vivienda_id=vivienda_id,
             manzana=vivienda.manzana,
             villa=vivienda.villa,
-            total_accesos=len(accesos_data),
-            accesos=accesos_data
+            total_accesos=resultado_pagina.total_aproximado,
+            accesos=accesos_data,
+            **resultado_pagina.metadatos()
         )
     
     except HTTPException:
@@ -127,6 +140,79 @@ def obtener_accesos_vivienda(
         )
 
 
+# Filas que se leen de la base y se escriben en la respuesta por bloque
+FILAS_POR_BLOQUE_HISTORIAL = 500
+
+
+def _transmitir_historial(encabezado: dict, query_accesos) -> Iterator[str]:
+    """
+    Genera el JSON del historial por bloques.
+    
+    `yield_per` usa un cursor del lado del servidor, así que en memoria solo
+    hay un bloque de filas a la vez, sin importar el largo del historial.
+    
+    El generador se consume después de que el endpoint retorna y `get_db`
+    cierra su sesión, por eso abre una sesión propia que cierra al terminar
+    (o si el cliente corta la descarga).
+    """
+    yield json.dumps(encabezado)[:-1] + ', "accesos": ['
+    
+    consulta = query_accesos.order_by(
+        Acceso.fecha_creado.desc(), Acceso.acceso_pk.desc()
+    ).statement.execution_options(yield_per=FILAS_POR_BLOQUE_HISTORIAL)
+    
+    db = SessionLocal()
+    try:
+        separador = ""
+        for bloque in db.execute(consulta).partitions():
+            yield separador + ",".join(
+                AccesoResponse(**AccesosService.obtener_detalles_acceso(fila)).model_dump_json()
+                for fila in bloque
+            )
+            separador = ","
+    finally:
+        db.close()
+    yield "]}"
+
+
+@router.get("/vivienda/{vivienda_id}/historial")
+def transmitir_historial_vivienda(
+    vivienda_id: int,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo: Optional[str] = None,
+    resultado: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Historial completo de accesos de una vivienda como JSON transmitido por bloques.
+    Pensado para exportaciones: no tiene límite de filas y la memoria del
+    servidor se mantiene constante. Acepta los mismos filtros que
+    `/vivienda/{vivienda_id}`.
+    
+    Respuesta: {vivienda_id, manzana, villa, accesos: [AccesoResponse, ...]}
+    
+    RF-ACC-01: Consultar accesos por vivienda
+    """
+    vivienda, query_accesos = AccesosService.obtener_accesos_vivienda(
+        db, vivienda_id, fecha_inicio, fecha_fin, tipo, resultado
+    )
+    
+    if not vivienda:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Vivienda no encontrada"
+        )
+    
+    return StreamingResponse(
+        _transmitir_historial(
+            {"vivienda_id": vivienda.vivienda_pk, "manzana": vivienda.manzana, "villa": vivienda.villa},
+            query_accesos
+        ),
+        media_type="application/json"
+    )
+
+
 @router.get("/admin/estadisticas", response_model=EstadisticasAdminResponse)
 def obtener_estadisticas_admin(
     fecha_inicio: Optional[date] = None,
@@ -1,11 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import Integer, String, and_, cast, literal, null, select, true, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.infrastructure.db import get_db
+from app.infrastructure.db import get_db, get_async_db
 from app.infrastructure.db.models import Cuenta, Persona, MiembroVivienda, EventoCuenta, ResidenteVivienda, Vivienda, PropietarioVivienda, Admin
 from app.interfaces.schemas.schemas import PerfilUsuarioResponse, ViviendaInfo
 from datetime import datetime
 from pydantic import BaseModel
 from app.infrastructure.utils.time_utils import ahora_sin_tz
+from app.infrastructure.cache.perfil_cache import get_perfil_cache
+from app.application.services.servicios import CuentaService
+from app.infrastructure.db.dispositivo_repository import DispositivoFCMRepository
+from app.config import get_settings
+
+settings = get_settings()
 
 router = APIRouter(prefix="/api/v1/cuentas", tags=["Cuentas"])
 
@@ -18,6 +26,13 @@ class CuentaFirebaseCreate(BaseModel):
     usuario_creado: str = "api_user"
 
 
+class DispositivoFCMRegistro(BaseModel):
+    """Schema para registrar el token FCM de un dispositivo"""
+    token: str
+    plataforma: str  # android, ios, web
+    usuario_creado: str = "api_user"
+
+
 class BloquearDesbloquearRequest(BaseModel):
     """Schema para bloquear/desbloquear cuenta"""
     usuario_actualizado: str
@@ -245,69 +260,25 @@ def bloquear_cuenta(
                 detail="La cuenta ya se encuentra inactiva"
             )
         
-        cuentas_a_bloquear = [cuenta_principal]
-        vivienda_id = None
-        es_residente = False
-        cascada_aplicada = False
-        
-        # Si cascada=true, verificar si es residente y obtener miembros
-        if request.cascada:
-            # Obtener persona titular
-            persona = db.query(Persona).filter(
-                Persona.persona_pk == cuenta_principal.persona_titular_fk
-            ).first()
-            
-            # Verificar si es residente activo
-            residente = db.query(ResidenteVivienda).filter(
-                ResidenteVivienda.persona_residente_fk == persona.persona_pk,
-                ResidenteVivienda.estado == "activo"
-            ).first()
-            
-            if residente:
-                es_residente = True
-                vivienda_id = residente.vivienda_reside_fk
-                cascada_aplicada = True
-                
-                # Obtener todos los miembros de esa vivienda
-                miembros = db.query(MiembroVivienda).filter(
-                    MiembroVivienda.vivienda_familia_fk == vivienda_id,
-                    MiembroVivienda.estado == "activo"
-                ).all()
-                
-                # Obtener cuentas de cada miembro
-                for miembro in miembros:
-                    cuenta_miembro = db.query(Cuenta).filter(
-                        Cuenta.persona_titular_fk == miembro.persona_miembro_fk,
-                        Cuenta.estado == "activo"
-                    ).first()
-                    
-                    if cuenta_miembro:
-                        cuentas_a_bloquear.append(cuenta_miembro)
-        
-        # Bloquear todas las cuentas
-        for cuenta in cuentas_a_bloquear:
-            cuenta.estado = "inactivo"
-            cuenta.fecha_actualizado = ahora_sin_tz()
-            cuenta.usuario_actualizado = request.usuario_actualizado
-            
-            evento = EventoCuenta(
-                cuenta_afectada_fk=cuenta.cuenta_pk,
-                tipo_evento="cuenta_bloqueada",
-                motivo=request.motivo,
-                usuario_creado=request.usuario_actualizado
-            )
-            db.add(evento)
-        
-        db.commit()
+        # Cascada a miembros de la vivienda en un solo UPDATE ... RETURNING
+        resultado = CuentaService(db).cambiar_estado_en_cascada(
+            cuenta_principal,
+            estado_nuevo="inactivo",
+            tipo_evento="cuenta_bloqueada",
+            motivo=request.motivo,
+            usuario=request.usuario_actualizado,
+            cascada=request.cascada
+        )
+        cantidad = len(resultado["cuentas_ids"])
         
         return {
-            "mensaje": f"Se han bloqueado {len(cuentas_a_bloquear)} cuenta(s)",
-            "cuentas_bloqueadas": len(cuentas_a_bloquear),
+            "mensaje": f"Se han bloqueado {cantidad} cuenta(s)",
+            "cuentas_bloqueadas": cantidad,
             "cuenta_principal_id": cuenta_id,
-            "es_residente": es_residente,
+            "es_residente": resultado["es_residente"],
             "cascada_solicitada": request.cascada,
-            "cascada_aplicada": cascada_aplicada,
-            "vivienda_id": vivienda_id
+            "cascada_aplicada": resultado["cascada_aplicada"],
+            "vivienda_id": resultado["vivienda_id"]
         }
     
     except HTTPException:
@@ -345,69 +316,25 @@ def desbloquear_cuenta(
                 detail="La cuenta ya se encuentra activa"
             )
         
-        cuentas_a_desbloquear = [cuenta_principal]
-        vivienda_id = None
-        es_residente = False
-        cascada_aplicada = False
-        
-        # Si cascada=true, verificar si es residente y obtener miembros
-        if request.cascada:
-            # Obtener persona titular
-            persona = db.query(Persona).filter(
-                Persona.persona_pk == cuenta_principal.persona_titular_fk
-            ).first()
-            
-            # Verificar si es residente activo
-            residente = db.query(ResidenteVivienda).filter(
-                ResidenteVivienda.persona_residente_fk == persona.persona_pk,
-                ResidenteVivienda.estado == "activo"
-            ).first()
-            
-            if residente:
-                es_residente = True
-                vivienda_id = residente.vivienda_reside_fk
-                cascada_aplicada = True
-                
-                # Obtener todos los miembros de esa vivienda
-                miembros = db.query(MiembroVivienda).filter(
-                    MiembroVivienda.vivienda_familia_fk == vivienda_id,
-                    MiembroVivienda.estado == "activo"
-                ).all()
-                
-                # Obtener cuentas de cada miembro
-                for miembro in miembros:
-                    cuenta_miembro = db.query(Cuenta).filter(
-                        Cuenta.persona_titular_fk == miembro.persona_miembro_fk,
-                        Cuenta.estado == "inactivo"
-                    ).first()
-                    
-                    if cuenta_miembro:
-                        cuentas_a_desbloquear.append(cuenta_miembro)
-        
-        # Desbloquear todas las cuentas
-        for cuenta in cuentas_a_desbloquear:
-            cuenta.estado = "activo"
-            cuenta.fecha_actualizado = ahora_sin_tz()
-            cuenta.usuario_actualizado = request.usuario_actualizado
-            
-            evento = EventoCuenta(
-                cuenta_afectada_fk=cuenta.cuenta_pk,
-                tipo_evento="cuenta_desbloqueada",
-                motivo=request.motivo,
-                usuario_creado=request.usuario_actualizado
-            )
-            db.add(evento)
-        
-        db.commit()
+        # Cascada a miembros de la vivienda en un solo UPDATE ... RETURNING
+        resultado = CuentaService(db).cambiar_estado_en_cascada(
+            cuenta_principal,
+            estado_nuevo="activo",
+            tipo_evento="cuenta_desbloqueada",
+            motivo=request.motivo,
+            usuario=request.usuario_actualizado,
+            cascada=request.cascada
+        )
+        cantidad = len(resultado["cuentas_ids"])
         
         return {
-            "mensaje": f"Se han desbloqueado {len(cuentas_a_desbloquear)} cuenta(s)",
-            "cuentas_desbloqueadas": len(cuentas_a_desbloquear),
+            "mensaje": f"Se han desbloqueado {cantidad} cuenta(s)",
+            "cuentas_desbloqueadas": cantidad,
             "cuenta_principal_id": cuenta_id,
-            "es_residente": es_residente,
+            "es_residente": resultado["es_residente"],
             "cascada_solicitada": request.cascada,
-            "cascada_aplicada": cascada_aplicada,
-            "vivienda_id": vivienda_id
+            "cascada_aplicada": resultado["cascada_aplicada"],
+            "vivienda_id": resultado["vivienda_id"]
         }
     
     except HTTPException:
@@ -477,10 +404,99 @@ def eliminar_cuenta(
         )
 
 
+@router.post("/{persona_id}/dispositivos", response_model=dict)
+def registrar_dispositivo_fcm(
+    persona_id: int,
+    request: DispositivoFCMRegistro,
+    db: Session = Depends(get_db)
+):
+    """
+    Registra el token FCM del dispositivo de una persona (notificaciones push).
+    Si el token ya existía se reasigna a la persona y se reactiva.
+    """
+    try:
+        if request.plataforma not in ("android", "ios", "web"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Plataforma inválida (android, ios, web)"
+            )
+        
+        persona = db.query(Persona.persona_pk).filter(
+            Persona.persona_pk == persona_id,
+            Persona.estado == "activo",
+            Persona.eliminado == False
+        ).first()
+        if not persona:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Persona no encontrada o inactiva"
+            )
+        
+        dispositivo_id = DispositivoFCMRepository(db).registrar(
+            persona_id,
+            request.token,
+            request.plataforma,
+            request.usuario_creado
+        )
+        db.commit()
+        
+        return {
+            "id": dispositivo_id,
+            "persona_id": persona_id,
+            "mensaje": "Dispositivo registrado"
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.delete("/{persona_id}/dispositivos", response_model=dict)
+def eliminar_dispositivo_fcm(
+    persona_id: int,
+    token: str,
+    usuario_actualizado: str,
+    db: Session = Depends(get_db)
+):
+    """Da de baja el token FCM de un dispositivo (p. ej. al cerrar sesión)"""
+    try:
+        eliminados = DispositivoFCMRepository(db).dar_de_baja(
+            [token],
+            motivo="Dispositivo dado de baja por el usuario",
+            usuario=usuario_actualizado,
+            persona_id=persona_id
+        )
+        if not eliminados:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Dispositivo no encontrado"
+            )
+        db.commit()
+        
+        return {
+            "mensaje": "Dispositivo dado de baja",
+            "persona_id": persona_id
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
 @router.get("/perfil/{firebase_uid}", response_model=dict)
-def obtener_perfil_usuario(
+async def obtener_perfil_usuario(
     firebase_uid: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtiene la información completa del perfil de un usuario basado en su Firebase UID
@@ -496,120 +512,65 @@ def obtener_perfil_usuario(
     - Residentes con vivienda
     - Miembros de familia con vivienda
     - Admins/Usuarios con solo cuenta+persona (sin vivienda)
+    
+    Rol y vivienda se resuelven en una sola consulta (`_consulta_perfil`) y
+    el perfil queda en caché por UID hasta que cambie la persona, su cuenta,
+    sus roles o alguna vivienda.
     """
     try:
-        # Obtener cuenta por Firebase UID
-        cuenta = db.query(Cuenta).filter(
-            Cuenta.firebase_uid == firebase_uid,
-            Cuenta.estado == "activo",
-            Cuenta.eliminado == False
-        ).first()
+        cache = get_perfil_cache() if settings.PERFIL_CACHE_ENABLED else None
+        if cache is not None:
+            perfil = cache.obtener_perfil(firebase_uid)
+            if perfil is not None:
+                return perfil
         
-        if not cuenta:
+        fila = (await db.execute(_consulta_perfil(firebase_uid))).first()
+        
+        if not fila:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cuenta no encontrada"
             )
         
-        # Obtener persona
-        persona = db.query(Persona).filter(
-            Persona.persona_pk == cuenta.persona_titular_fk
-        ).first()
-        
-        if not persona:
+        if fila.persona_pk is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Persona no encontrada en BD"
             )
         
-        # Determinar rol y obtener información de vivienda
-        rol = None
-        parentesco = None
-        vivienda_info = None
-        
-        # Verificar si es residente
-        residente = db.query(ResidenteVivienda).filter(
-            ResidenteVivienda.persona_residente_fk == persona.persona_pk,
-            ResidenteVivienda.estado == "activo",
-            ResidenteVivienda.eliminado == False
-        ).first()
+        if fila.rol is None:
+            # No tiene rol válido
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuario no tiene un rol válido (residente, propietario, miembro de familia o admin)"
+            )
         
-        if residente:
-            rol = "residente"
-            vivienda = residente.vivienda
-            if vivienda:
-                vivienda_info = {
-                    "vivienda_id": vivienda.vivienda_pk,
-                    "manzana": vivienda.manzana,
-                    "villa": vivienda.villa
-                }
-        else:
-            # Verificar si es propietario (también tiene rol residente)
-            propietario = db.query(PropietarioVivienda).filter(
-                PropietarioVivienda.persona_propietario_fk == persona.persona_pk,
-                PropietarioVivienda.estado == "activo",
-                PropietarioVivienda.eliminado == False
-            ).first()
-            
-            if propietario:
-                rol = "residente"
-                vivienda = propietario.vivienda
-                if vivienda:
-                    vivienda_info = {
-                        "vivienda_id": vivienda.vivienda_pk,
-                        "manzana": vivienda.manzana,
-                        "villa": vivienda.villa
-                    }
-            else:
-                # Verificar si es miembro de familia
-                miembro = db.query(MiembroVivienda).filter(
-                    MiembroVivienda.persona_miembro_fk == persona.persona_pk,
-                    MiembroVivienda.estado == "activo",
-                    MiembroVivienda.eliminado == False
-                ).first()
-                
-                if miembro:
-                    rol = "miembro_familia"
-                    parentesco = miembro.parentesco
-                    vivienda = miembro.vivienda
-                    if vivienda:
-                        vivienda_info = {
-                            "vivienda_id": vivienda.vivienda_pk,
-                            "manzana": vivienda.manzana,
-                            "villa": vivienda.villa
-                        }
-                else:
-                    # Verificar si es admin
-                    admin = db.query(Admin).filter(
-                        Admin.persona_admin_fk == persona.persona_pk,
-                        Admin.estado == "activo",
-                        Admin.eliminado == False
-                    ).first()
-                    
-                    if admin:
-                        rol = "admin"
-                    else:
-                        # No tiene rol válido
-                        raise HTTPException(
-                            status_code=status.HTTP_403_FORBIDDEN,
-                            detail="Usuario no tiene un rol válido (residente, propietario, miembro de familia o admin)"
-                        )
+        vivienda_info = None
+        if fila.vivienda_pk is not None:
+            vivienda_info = {
+                "vivienda_id": fila.vivienda_pk,
+                "manzana": fila.manzana,
+                "villa": fila.villa
+            }
         
         # Construir respuesta
         respuesta = {
-            "persona_id": persona.persona_pk,
-            "identificacion": persona.identificacion,
-            "nombres": persona.nombres,
-            "apellidos": persona.apellidos,
-            "correo": persona.correo,
-            "celular": persona.celular,
-            "estado": persona.estado,
-            "rol": rol,
+            "persona_id": fila.persona_pk,
+            "identificacion": fila.identificacion,
+            "nombres": fila.nombres,
+            "apellidos": fila.apellidos,
+            "correo": fila.correo,
+            "celular": fila.celular,
+            "estado": fila.estado,
+            "rol": fila.rol,
             "vivienda": vivienda_info,
-            "parentesco": parentesco,
-            "fecha_creado": persona.fecha_creado.isoformat() if persona.fecha_creado else None
+            "parentesco": fila.parentesco,
+            "fecha_creado": fila.fecha_creado.isoformat() if fila.fecha_creado else None
         }
         
+        if cache is not None:
+            cache.guardar_perfil(firebase_uid, respuesta)
+        
         return respuesta
     
     except HTTPException:
@@ -621,6 +582,84 @@ def obtener_perfil_usuario(
         )
 
 
+def _consulta_perfil(firebase_uid: str):
+    """
+    Cuenta, persona, rol y vivienda en una sola consulta.
+    
+    Los roles activos de la persona se unen con UNION ALL, cada uno con su
+    prioridad (residente, propietario, miembro de familia, admin), y se toma
+    el de mayor prioridad. Si la persona no tiene rol, el LEFT JOIN deja
+    `rol` en NULL.
+    """
+    persona_id = select(Cuenta.persona_titular_fk).where(
+        Cuenta.firebase_uid == firebase_uid
+    ).scalar_subquery()
+    
+    sin_vivienda = cast(null(), Integer)
+    sin_parentesco = cast(null(), String)
+    roles = union_all(
+        select(
+            literal(1).label("prioridad"),
+            literal("residente").label("rol"),
+            ResidenteVivienda.vivienda_reside_fk.label("vivienda_fk"),
+            sin_parentesco.label("parentesco")
+        ).where(
+            ResidenteVivienda.persona_residente_fk == persona_id,
+            ResidenteVivienda.estado == "activo",
+            ResidenteVivienda.eliminado == False
+        ),
+        # El propietario también tiene rol residente
+        select(
+            literal(2), literal("residente"),
+            PropietarioVivienda.vivienda_propiedad_fk, sin_parentesco
+        ).where(
+            PropietarioVivienda.persona_propietario_fk == persona_id,
+            PropietarioVivienda.estado == "activo",
+            PropietarioVivienda.eliminado == False
+        ),
+        select(
+            literal(3), literal("miembro_familia"),
+            MiembroVivienda.vivienda_familia_fk, MiembroVivienda.parentesco
+        ).where(
+            MiembroVivienda.persona_miembro_fk == persona_id,
+            MiembroVivienda.estado == "activo",
+            MiembroVivienda.eliminado == False
+        ),
+        select(
+            literal(4), literal("admin"), sin_vivienda, sin_parentesco
+        ).where(
+            Admin.persona_admin_fk == persona_id,
+            Admin.estado == "activo",
+            Admin.eliminado == False
+        ),
+    ).subquery("roles")
+    
+    return select(
+        Persona.persona_pk,
+        Persona.identificacion,
+        Persona.nombres,
+        Persona.apellidos,
+        Persona.correo,
+        Persona.celular,
+        Persona.estado,
+        Persona.fecha_creado,
+        roles.c.rol,
+        roles.c.parentesco,
+        Vivienda.vivienda_pk,
+        Vivienda.manzana,
+        Vivienda.villa
+    ).select_from(Cuenta).join(
+        Persona, Persona.persona_pk == Cuenta.persona_titular_fk, isouter=True
+    ).join(
+        roles, true(), isouter=True
+    ).join(
+        Vivienda, Vivienda.vivienda_pk == roles.c.vivienda_fk, isouter=True
+    ).where(
+        Cuenta.firebase_uid == firebase_uid,
+        Cuenta.estado == "activo",
+        Cuenta.eliminado == False
+    ).order_by(roles.c.prioridad).limit(1)
+
 
 @router.get("/usuario/por-correo/{correo}", response_model=dict)
 def obtener_usuario_por_correo(
@@ -734,82 +773,40 @@ def obtener_usuarios_vivienda(
 ):
     """
     Obtiene todos los usuarios (residentes y miembros con cuenta) de una vivienda por manzana y villa
+    
+    Vivienda, residentes, miembros, personas y cuentas se leen en una sola
+    consulta (`_consulta_usuarios_vivienda`).
     """
     try:
-        # Obtener vivienda
-        vivienda = db.query(Vivienda).filter(
-            Vivienda.manzana == manzana,
-            Vivienda.villa == villa,
-            Vivienda.estado == "activo"
-        ).first()
+        filas = db.execute(_consulta_usuarios_vivienda(manzana, villa)).all()
         
-        if not vivienda:
+        if not filas:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Vivienda no encontrada"
             )
         
         usuarios = []
+        for fila in filas:
+            # Vivienda sin usuarios con cuenta: el LEFT JOIN deja una fila vacía
+            if fila.usuario_id is None:
+                continue
+            usuario_info = {
+                "usuario_id": fila.usuario_id,
+                "persona_id": fila.persona_id,
+                "identificacion": fila.identificacion,
+                "nombres": fila.nombres,
+                "apellidos": fila.apellidos,
+                "correo": fila.correo,
+                "celular": fila.celular,
+                "tipo": fila.tipo,
+                "estado": fila.estado
+            }
+            if fila.parentesco:
+                usuario_info["parentesco"] = fila.parentesco
+            usuarios.append(usuario_info)
         
-        # Obtener residentes con cuenta
-        residentes = db.query(ResidenteVivienda).filter(
-            ResidenteVivienda.vivienda_reside_fk == vivienda.vivienda_pk,
-            ResidenteVivienda.estado == "activo",
-            ResidenteVivienda.eliminado == False
-        ).all()
-        
-        for residente in residentes:
-            cuenta = db.query(Cuenta).filter(
-                Cuenta.persona_titular_fk == residente.persona_residente_fk,
-                # Cuenta.estado == "activo",
-                Cuenta.eliminado == False
-            ).first()
-            
-            if cuenta:
-                persona = residente.persona
-                usuarios.append({
-                    "usuario_id": cuenta.cuenta_pk,
-                    "persona_id": persona.persona_pk,
-                    "identificacion": persona.identificacion,
-                    "nombres": persona.nombres,
-                    "apellidos": persona.apellidos,
-                    "correo": persona.correo,
-                    "celular": persona.celular,
-                    "tipo": "residente",
-                    "estado": cuenta.estado
-                })
-        
-        # Obtener miembros de familia con cuenta
-        miembros = db.query(MiembroVivienda).filter(
-            MiembroVivienda.vivienda_familia_fk == vivienda.vivienda_pk,
-            MiembroVivienda.estado == "activo",
-            MiembroVivienda.eliminado == False
-        ).all()
-        
-        for miembro in miembros:
-            cuenta = db.query(Cuenta).filter(
-                Cuenta.persona_titular_fk == miembro.persona_miembro_fk,
-                # Cuenta.estado == "activo",
-                Cuenta.eliminado == False
-            ).first()
-            
-            if cuenta:
-                persona = miembro.persona_miembro
-                usuario_info = {
-                    "usuario_id": cuenta.cuenta_pk,
-                    "persona_id": persona.persona_pk,
-                    "identificacion": persona.identificacion,
-                    "nombres": persona.nombres,
-                    "apellidos": persona.apellidos,
-                    "correo": persona.correo,
-                    "celular": persona.celular,
-                    "tipo": "miembro_familia",
-                    "estado": cuenta.estado
-                }
-                if miembro.parentesco:
-                    usuario_info["parentesco"] = miembro.parentesco
-                usuarios.append(usuario_info)
-        
+        vivienda = filas[0]
         return {
             "vivienda_id": vivienda.vivienda_pk,
             "manzana": vivienda.manzana,
@@ -827,6 +824,71 @@ def obtener_usuarios_vivienda(
         )
 
 
+def _consulta_usuarios_vivienda(manzana: str, villa: str):
+    """
+    Vivienda activa y sus usuarios con cuenta no eliminada en una sola consulta.
+    
+    Residentes y miembros activos se unen con UNION ALL, cada rama con su
+    persona y su cuenta; la vivienda se resuelve por el índice único
+    uq_vivienda (manzana, villa). Con LEFT JOIN, una vivienda sin usuarios
+    devuelve una fila con las columnas de usuario en NULL.
+    """
+    vivienda_id = select(Vivienda.vivienda_pk).where(
+        Vivienda.manzana == manzana,
+        Vivienda.villa == villa
+    ).scalar_subquery()
+    
+    def rama(orden: int, tipo: str, relacion, relacion_pk, persona_fk, vivienda_fk, estado, eliminado, parentesco):
+        return select(
+            literal(orden).label("orden"),
+            relacion_pk.label("relacion_pk"),
+            literal(tipo).label("tipo"),
+            parentesco.label("parentesco"),
+            Cuenta.cuenta_pk.label("usuario_id"),
+            Cuenta.estado.label("estado"),
+            Persona.persona_pk.label("persona_id"),
+            Persona.identificacion,
+            Persona.nombres,
+            Persona.apellidos,
+            Persona.correo,
+            Persona.celular
+        ).select_from(relacion).join(
+            Persona, Persona.persona_pk == persona_fk
+        ).join(
+            Cuenta, and_(Cuenta.persona_titular_fk == persona_fk, Cuenta.eliminado == False)
+        ).where(
+            vivienda_fk == vivienda_id,
+            estado == "activo",
+            eliminado == False
+        )
+    
+    usuarios = union_all(
+        rama(
+            1, "residente", ResidenteVivienda, ResidenteVivienda.residente_vivienda_pk,
+            ResidenteVivienda.persona_residente_fk, ResidenteVivienda.vivienda_reside_fk,
+            ResidenteVivienda.estado, ResidenteVivienda.eliminado, cast(null(), String)
+        ),
+        rama(
+            2, "miembro_familia", MiembroVivienda, MiembroVivienda.miembro_vivienda_pk,
+            MiembroVivienda.persona_miembro_fk, MiembroVivienda.vivienda_familia_fk,
+            MiembroVivienda.estado, MiembroVivienda.eliminado, MiembroVivienda.parentesco
+        ),
+    ).subquery("usuarios")
+    
+    return select(
+        Vivienda.vivienda_pk,
+        Vivienda.manzana,
+        Vivienda.villa,
+        usuarios
+    ).join(
+        usuarios, true(), isouter=True
+    ).where(
+        Vivienda.manzana == manzana,
+        Vivienda.villa == villa,
+        Vivienda.estado == "activo"
+    ).order_by(usuarios.c.orden, usuarios.c.relacion_pk)
+
+
 @router.get("/prospecto/residente/{identificacion}", response_model=dict)
 def validar_prospecto_residente(
     identificacion: str,
@@ -6,6 +6,7 @@ from app.infrastructure.db.models import Persona, ResidenteVivienda, MiembroVivi
 from datetime import datetime, date
 from app.infrastructure.utils.time_utils import ahora_sin_tz
 from pydantic import BaseModel
+from app.interfaces.schemas.paginacion import ParametrosPagina
 
 router = APIRouter(prefix="/api/v1/miembros", tags=["Miembros de Familia"])
 
@@ -166,10 +167,11 @@ def agregar_miembro_familia(
 @router.get("/{vivienda_id}", response_model=dict)
 def obtener_miembros_familia(
     vivienda_id: int,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db)
 ):
     """
-    Obtiene todos los miembros de familia de una vivienda
+    Obtiene los miembros de familia de una vivienda (paginado por cursor)
     """
     try:
         vivienda = db.query(Vivienda).filter(Vivienda.vivienda_pk == vivienda_id).first()
@@ -179,14 +181,18 @@ def obtener_miembros_familia(
                 detail="Vivienda no encontrada"
             )
         
-        miembros = db.query(MiembroVivienda).filter(
+        query_miembros = db.query(MiembroVivienda).filter(
             MiembroVivienda.vivienda_familia_fk == vivienda_id,
             MiembroVivienda.eliminado == False,
             MiembroVivienda.estado == "activo"
-        ).all()
+        )
+        resultado = pagina.paginar(
+            query_miembros, (MiembroVivienda.miembro_vivienda_pk,),
+            descendente=False, incluir_total=True
+        )
         
         miembros_data = []
-        for miembro in miembros:
+        for miembro in resultado.filas:
             persona = miembro.persona_miembro
             residente = db.query(Persona).filter(
                 Persona.persona_pk == miembro.persona_residente_fk
@@ -205,8 +211,9 @@ def obtener_miembros_familia(
         
         return {
             "vivienda_id": vivienda_id,
-            "total_miembros": len(miembros_data),
-            "miembros": miembros_data
+            "total_miembros": resultado.total_aproximado,
+            "miembros": miembros_data,
+            **resultado.metadatos()
         }
     
     except HTTPException:
@@ -349,10 +356,12 @@ def eliminar_miembro(
 def obtener_miembros_por_ubicacion(
     manzana: str,
     villa: str,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db)
 ):
     """
-    Obtiene todos los miembros de familia de una vivienda por manzana y villa
+    Obtiene los miembros de familia de una vivienda por manzana y villa
+    (paginado por cursor)
     """
     try:
         # Obtener vivienda
@@ -369,14 +378,18 @@ def obtener_miembros_por_ubicacion(
             )
         
         # Obtener miembros de familia activos
-        miembros = db.query(MiembroVivienda).filter(
+        query_miembros = db.query(MiembroVivienda).filter(
             MiembroVivienda.vivienda_familia_fk == vivienda.vivienda_pk,
             # MiembroVivienda.estado == "activo",
             MiembroVivienda.eliminado == False
-        ).all()
+        )
+        resultado = pagina.paginar(
+            query_miembros, (MiembroVivienda.miembro_vivienda_pk,),
+            descendente=False, incluir_total=True
+        )
         
         miembros_data = []
-        for miembro in miembros:
+        for miembro in resultado.filas:
             persona = miembro.persona_miembro
             miembros_data.append({
                 "miembro_id": miembro.miembro_vivienda_pk,
@@ -394,8 +407,9 @@ def obtener_miembros_por_ubicacion(
             "vivienda_id": vivienda.vivienda_pk,
             "manzana": vivienda.manzana,
             "villa": vivienda.villa,
-            "total_miembros": len(miembros_data),
-            "miembros": miembros_data
+            "total_miembros": resultado.total_aproximado,
+            "miembros": miembros_data,
+            **resultado.metadatos()
         }
     
     except HTTPException:
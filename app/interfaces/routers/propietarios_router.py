@@ -7,6 +7,7 @@ from app.interfaces.schemas.schemas import (
 from app.infrastructure.db.models import Persona, PropietarioVivienda, ResidenteVivienda, Vivienda
 from datetime import datetime, date
 from pydantic import BaseModel
+from app.interfaces.schemas.paginacion import ParametrosPagina
 from app.infrastructure.utils.time_utils import ahora_sin_tz
 
 router = APIRouter(prefix="/api/v1/propietarios", tags=["Propietarios"])
@@ -274,10 +275,11 @@ def registrar_conyuge_propietario(
 @router.get("/{vivienda_id}", response_model=dict)
 def obtener_propietarios_vivienda(
     vivienda_id: int,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db)
 ):
     """
-    Obtiene todos los propietarios de una vivienda
+    Obtiene los propietarios de una vivienda (paginado por cursor)
     """
     try:
         vivienda = db.query(Vivienda).filter(Vivienda.vivienda_pk == vivienda_id).first()
@@ -287,13 +289,17 @@ def obtener_propietarios_vivienda(
                 detail="Vivienda no encontrada"
             )
         
-        propietarios = db.query(PropietarioVivienda).filter(
+        query_propietarios = db.query(PropietarioVivienda).filter(
             PropietarioVivienda.vivienda_propiedad_fk == vivienda_id,
             PropietarioVivienda.eliminado == False
-        ).all()
+        )
+        resultado = pagina.paginar(
+            query_propietarios, (PropietarioVivienda.propietario_vivienda_pk,),
+            descendente=False, incluir_total=True
+        )
         
         propietarios_data = []
-        for prop in propietarios:
+        for prop in resultado.filas:
             persona = prop.persona
             propietarios_data.append({
                 "propietario_id": prop.propietario_vivienda_pk,
@@ -306,8 +312,9 @@ def obtener_propietarios_vivienda(
         
         return {
             "vivienda_id": vivienda_id,
-            "total_propietarios": len(propietarios_data),
-            "propietarios": propietarios_data
+            "total_propietarios": resultado.total_aproximado,
+            "propietarios": propietarios_data,
+            **resultado.metadatos()
         }
     
     except HTTPException:
@@ -658,10 +665,12 @@ def cambio_propietario_vivienda(
 def obtener_propietarios_por_ubicacion(
     manzana: str,
     villa: str,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db)
 ):
     """
-    Obtiene todos los propietarios de una vivienda por manzana y villa
+    Obtiene los propietarios de una vivienda por manzana y villa
+    (paginado por cursor)
     """
     try:
         # Obtener vivienda
@@ -678,14 +687,18 @@ def obtener_propietarios_por_ubicacion(
             )
         
         # Obtener propietarios activos
-        propietarios = db.query(PropietarioVivienda).filter(
+        query_propietarios = db.query(PropietarioVivienda).filter(
             PropietarioVivienda.vivienda_propiedad_fk == vivienda.vivienda_pk,
             # PropietarioVivienda.estado == "activo",
             PropietarioVivienda.eliminado == False
-        ).all()
+        )
+        resultado = pagina.paginar(
+            query_propietarios, (PropietarioVivienda.propietario_vivienda_pk,),
+            descendente=False, incluir_total=True
+        )
         
         propietarios_data = []
-        for propietario in propietarios:
+        for propietario in resultado.filas:
             persona = propietario.persona
             propietarios_data.append({
                 "propietario_id": propietario.propietario_vivienda_pk,
@@ -703,8 +716,9 @@ def obtener_propietarios_por_ubicacion(
             "vivienda_id": vivienda.vivienda_pk,
             "manzana": vivienda.manzana,
             "villa": vivienda.villa,
-            "total_propietarios": len(propietarios_data),
-            "propietarios": propietarios_data
+            "total_propietarios": resultado.total_aproximado,
+            "propietarios": propietarios_data,
+            **resultado.metadatos()
         }
     
     except HTTPException:
@@ -1,25 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.infrastructure.db import get_db, SessionLocal
+from app.infrastructure.db import get_db, get_async_db, SessionLocal
 from app.interfaces.schemas.schemas import (
     QRGenerarPropio, QRGenerarVisita, QRResponse, AccesoValidarRequest, QRListResponse, QRPaginatedResponse,
-    VisitaResponse, ViviendaVisitasResponse
+    VisitaResponse, ViviendaVisitasResponse, QRValidarResponse, QRAnular, QRGenerarVisitasLote
 )
+from app.interfaces.schemas.paginacion import ParametrosPagina
+from app.infrastructure.db.qr_repository import QRRepository
+from app.infrastructure.cache.qr_cache import get_qr_cache
+from app.domain.use_cases.qr_use_cases import _ValidarQRImpl, _ConsumirQRImpl
+from app.domain.entities.models import QR as QREntidad
 from app.infrastructure.db.models import QR as QRModel, Cuenta, Acceso as AccesoModel, ResidenteVivienda, Persona, Visita as VisitaModel, MiembroVivienda, Vivienda
 from datetime import datetime
-from app.infrastructure.utils.time_utils import ahora_sin_tz, timedelta
+from app.infrastructure.utils.time_utils import ahora_solicitud, timedelta
+from app.infrastructure.utils.token_utils import generar_token, generar_tokens
 from app.config import get_settings
-import secrets
-import string
 
 router = APIRouter(prefix="/api/v1/qr", tags=["QR"])
 settings = get_settings()
 
 
-def generar_token() -> str:
-    """Genera un token QR seguro de longitud configurable"""
-    caracteres = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(caracteres) for _ in range(settings.QR_TOKEN_LENGTH))
+def cache_qr():
+    """Caché de QRs vigentes del proceso, o None si está deshabilitada"""
+    return get_qr_cache() if settings.QR_CACHE_ENABLED else None
 
 
 @router.post("/generar-propio", response_model=dict)
@@ -46,7 +51,7 @@ def generar_qr_propio(
         if request.fecha_acceso:
             fecha_acceso = request.fecha_acceso
         else:
-            fecha_acceso = ahora_sin_tz().date()
+            fecha_acceso = ahora_solicitud().date()
         
         # Si hora_inicio no viene, usar la hora actual
         if request.hora_inicio:
@@ -59,12 +64,12 @@ def generar_qr_propio(
                 )
         else:
             # Usar hora actual
-            hora_inicio = ahora_sin_tz().time()
+            hora_inicio = ahora_solicitud().time()
         
         dt_inicio = datetime.combine(fecha_acceso, hora_inicio).replace(second=0, microsecond=0)
         
         # Permitir que sea exactamente ahora
-        if dt_inicio < ahora_sin_tz().replace(second=0, microsecond=0):
+        if dt_inicio < ahora_solicitud().replace(second=0, microsecond=0):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"La fecha y hora no pueden ser pasadas {dt_inicio}"
@@ -124,6 +129,9 @@ def generar_qr_propio(
         db.commit()
         db.refresh(qr)
         
+        if cache_qr() is not None:
+            cache_qr().guardar(QRRepository.a_entidad(qr))
+        
         return {
             "id": qr.qr_pk,
             "token": token,
@@ -174,7 +182,7 @@ def generar_qr_visita(
         if request.fecha_acceso:
             fecha_acceso = request.fecha_acceso
         else:
-            fecha_acceso = ahora_sin_tz().date()
+            fecha_acceso = ahora_solicitud().date()
         
         # Si hora_inicio no viene, usar la hora actual
         if request.hora_inicio:
@@ -187,12 +195,12 @@ def generar_qr_visita(
                 )
         else:
             # Usar hora actual
-            hora_inicio = ahora_sin_tz().time().replace(second=0, microsecond=0)
+            hora_inicio = ahora_solicitud().time().replace(second=0, microsecond=0)
         
         dt_inicio = datetime.combine(fecha_acceso, hora_inicio)
         
         # Permitir que sea exactamente ahora
-        if dt_inicio < ahora_sin_tz().replace(second=0, microsecond=0)  :
+        if dt_inicio < ahora_solicitud().replace(second=0, microsecond=0)  :
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="La fecha y hora no pueden ser pasadas"
@@ -277,6 +285,9 @@ def generar_qr_visita(
         db.commit()
         db.refresh(qr)
         
+        if cache_qr() is not None:
+            cache_qr().guardar(QRRepository.a_entidad(qr))
+        
         # Determinar si la visita fue nueva o reutilizada
         mensaje_visita = "Visitante reutilizado" if visita_existente else "Nuevo visitante registrado"
         
@@ -301,12 +312,305 @@ def generar_qr_visita(
         )
 
 
+@router.post("/generar-visitas-lote", response_model=dict)
+def generar_qr_visitas_lote(
+    request: QRGenerarVisitasLote,
+    usuario_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Genera códigos QR para una lista de visitantes (eventos, reuniones)
+    Resuelve cuenta y vivienda una sola vez, reutiliza visitantes existentes
+    e inserta visitas y QRs con inserciones multi-fila en una sola transacción.
+    RF-Q02 (lote)
+    """
+    try:
+        if len(request.visitantes) > settings.QR_LOTE_MAX_VISITANTES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Máximo {settings.QR_LOTE_MAX_VISITANTES} visitantes por lote"
+            )
+        
+        # Obtener cuenta del usuario
+        cuenta = db.query(Cuenta).filter(Cuenta.persona_titular_fk == usuario_id).first()
+        if not cuenta or cuenta.estado != "activo":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuario no autorizado para generar QR"
+            )
+        
+        # Validar datos de visitantes y eliminar identificaciones repetidas
+        visitantes = {}
+        for v in request.visitantes:
+            if not v.identificacion or not v.nombres or not v.apellidos:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Los datos de cada visitante son obligatorios"
+                )
+            visitantes.setdefault(v.identificacion, v)
+        
+        # Validar fecha y hora (una vez para todo el lote)
+        ahora_actual = ahora_solicitud()
+        fecha_acceso = request.fecha_acceso or ahora_actual.date()
+        
+        if request.hora_inicio:
+            try:
+                hora_inicio = datetime.strptime(request.hora_inicio, "%H:%M").time()
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Formato de hora inválido. Use HH:MM"
+                )
+        else:
+            hora_inicio = ahora_actual.time().replace(second=0, microsecond=0)
+        
+        dt_inicio = datetime.combine(fecha_acceso, hora_inicio)
+        
+        if dt_inicio < ahora_actual.replace(second=0, microsecond=0):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La fecha y hora no pueden ser pasadas"
+            )
+        
+        # Obtener vivienda: verificar si es residente o miembro de familia
+        vivienda_id = db.query(ResidenteVivienda.vivienda_reside_fk).filter(
+            ResidenteVivienda.persona_residente_fk == cuenta.persona_titular_fk,
+            ResidenteVivienda.estado == "activo",
+            ResidenteVivienda.eliminado == False
+        ).scalar()
+        
+        if not vivienda_id:
+            vivienda_id = db.query(MiembroVivienda.vivienda_familia_fk).filter(
+                MiembroVivienda.persona_miembro_fk == cuenta.persona_titular_fk,
+                MiembroVivienda.estado == "activo",
+                MiembroVivienda.eliminado == False
+            ).limit(1).scalar()
+        
+        if not vivienda_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuario no tiene una vivienda asignada como residente o miembro de familia activo"
+            )
+        
+        # Visitantes ya registrados en la vivienda (una sola consulta)
+        visitas_existentes = dict(
+            db.query(VisitaModel.identificacion, VisitaModel.visita_pk).filter(
+                VisitaModel.vivienda_visita_fk == vivienda_id,
+                VisitaModel.identificacion.in_(list(visitantes)),
+                VisitaModel.eliminado == False
+            ).all()
+        )
+        
+        # Registrar visitantes nuevos con un INSERT multi-fila
+        nuevos = [
+            {
+                "vivienda_visita_fk": vivienda_id,
+                "identificacion": v.identificacion,
+                "nombres": v.nombres,
+                "apellidos": v.apellidos,
+                "usuario_creado": request.usuario_creado
+            }
+            for identificacion, v in visitantes.items()
+            if identificacion not in visitas_existentes
+        ]
+        
+        visitas_ids = dict(visitas_existentes)
+        if nuevos:
+            filas = db.execute(
+                insert(VisitaModel).returning(
+                    VisitaModel.identificacion, VisitaModel.visita_pk,
+                    sort_by_parameter_order=True
+                ),
+                nuevos
+            ).all()
+            visitas_ids.update({identificacion: visita_pk for identificacion, visita_pk in filas})
+        
+        # Generar tokens e insertar todos los QRs con un INSERT multi-fila
+        hora_fin = dt_inicio + timedelta(hours=request.duracion_horas)
+        tokens = generar_tokens(len(visitantes))
+        qrs = [
+            {
+                "cuenta_autoriza_fk": cuenta.cuenta_pk,
+                "vivienda_visita_fk": vivienda_id,
+                "visita_ingreso_fk": visitas_ids[identificacion],
+                "hora_inicio_vigencia": dt_inicio,
+                "hora_fin_vigencia": hora_fin,
+                "token": token,
+                "estado": "vigente",
+                "usuario_creado": request.usuario_creado
+            }
+            for identificacion, token in zip(visitantes, tokens)
+        ]
+        
+        filas_qr = db.execute(
+            insert(QRModel).returning(
+                QRModel.qr_pk, QRModel.token,
+                sort_by_parameter_order=True
+            ),
+            qrs
+        ).all()
+        
+        db.commit()
+        
+        if cache_qr() is not None:
+            for (qr_pk, _), datos in zip(filas_qr, qrs):
+                cache_qr().guardar(QREntidad(
+                    id=qr_pk,
+                    cuenta_id=datos["cuenta_autoriza_fk"],
+                    vivienda_id=datos["vivienda_visita_fk"],
+                    visita_id=datos["visita_ingreso_fk"],
+                    hora_inicio_vigencia=dt_inicio,
+                    hora_fin_vigencia=hora_fin,
+                    token=datos["token"],
+                    usuario_creado=request.usuario_creado
+                ))
+        
+        return {
+            "cantidad": len(filas_qr),
+            "visitantes_nuevos": len(nuevos),
+            "visitantes_reutilizados": len(visitas_existentes),
+            "hora_inicio": dt_inicio.isoformat(),
+            "hora_fin": hora_fin.isoformat(),
+            "estado": "vigente",
+            "qrs": [
+                {
+                    "id": qr_pk,
+                    "token": token,
+                    "visita_id": datos["visita_ingreso_fk"],
+                    "visita_identificacion": identificacion
+                }
+                for (qr_pk, token), datos, identificacion in zip(filas_qr, qrs, visitantes)
+            ],
+            "mensaje": f"Se generaron {len(filas_qr)} código(s) QR para visitas"
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/validar", response_model=QRValidarResponse)
+async def validar_qr(
+    request: AccesoValidarRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Valida un código QR escaneado en garita.
+    La búsqueda por token consulta primero la caché de QRs vigentes y, en
+    fallo, usa el índice único parcial uq_qr_token_activo.
+    """
+    if not request.token_qr:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="token_qr es obligatorio"
+        )
+    
+    try:
+        resultado = await _ValidarQRImpl(QRRepository(db, cache_qr())).ejecutar(request.token_qr)
+        return QRValidarResponse(**resultado)
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/consumir", response_model=QRValidarResponse)
+async def consumir_qr(
+    request: AccesoValidarRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Registra el ingreso con un código QR escaneado en garita.
+    Valida vigencia, marca el QR como usado e inserta el acceso en una sola
+    sentencia atómica, por lo que un QR no puede ser aceptado dos veces
+    aunque se escanee simultáneamente en dos garitas.
+    """
+    if not request.token_qr:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="token_qr es obligatorio"
+        )
+    
+    try:
+        resultado = await _ConsumirQRImpl(QRRepository(db, cache_qr())).ejecutar(
+            request.token_qr,
+            request.usuario_guardia,
+            request.persona_guardia_id
+        )
+        return QRValidarResponse(**resultado)
+    
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/{qr_id}/anular", response_model=dict)
+def anular_qr(
+    qr_id: int,
+    request: QRAnular,
+    db: Session = Depends(get_db)
+):
+    """
+    Anula un código QR vigente para que no pueda utilizarse
+    """
+    try:
+        qr = db.query(QRModel).filter(
+            QRModel.qr_pk == qr_id,
+            QRModel.eliminado == False
+        ).first()
+        if not qr:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="QR no encontrado"
+            )
+        
+        if qr.estado != "vigente":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Solo se pueden anular QRs vigentes (estado actual: {qr.estado})"
+            )
+        
+        qr.estado = "anulado"
+        qr.fecha_actualizado = ahora_solicitud()
+        qr.usuario_actualizado = request.usuario_actualizado
+        db.commit()
+        
+        if cache_qr() is not None:
+            cache_qr().invalidar(qr.token)
+        
+        return {
+            "id": qr.qr_pk,
+            "estado": qr.estado,
+            "mensaje": "Código QR anulado correctamente"
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
 @router.get("/{qr_id}", response_model=QRResponse)
-def obtener_qr(qr_id: int, db: Session = Depends(get_db)):
+async def obtener_qr(qr_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Obtiene información de un código QR
     """
-    qr = db.query(QRModel).filter(QRModel.qr_pk == qr_id).first()
+    resultado = await db.execute(select(QRModel).where(QRModel.qr_pk == qr_id))
+    qr = resultado.scalars().first()
     if not qr:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -318,29 +622,25 @@ def obtener_qr(qr_id: int, db: Session = Depends(get_db)):
 @router.get("/cuenta/generados", response_model=QRPaginatedResponse)
 def listar_qr_por_cuenta(
     persona_id: int,
-    page: int = Query(settings.PAGINATION_DEFAULT_PAGE, ge=1),
-    page_size: int = Query(settings.PAGINATION_DEFAULT_PAGE_SIZE, ge=1, le=settings.PAGINATION_MAX_PAGE_SIZE),
     tipo_ingreso: str = None,  # "propio", "visita", o None para todos
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db)
 ):
     """
-    Lista QRs generados por la cuenta del usuario autenticado (paginado)
+    Lista QRs generados por la cuenta del usuario autenticado (paginado por cursor)
     Parámetros:
-    - page: número de página (default 1)
     - page_size: cantidad de items por página (default 10, máximo 100)
+    - cursor: valor de `next_cursor` de la página anterior (vacío para la primera)
+    - incluir_total: si true, agrega `total_aproximado` a la respuesta
     - tipo_ingreso: filtrar por tipo ("propio", "visita", o None para todos)
     Retorna: datos paginados con token, estado, tipo de ingreso, fechas de vigencia
+    
+    La página se obtiene con una sola consulta (QR + visita) ordenada por
+    (fecha_creado, qr_pk), por lo que las páginas profundas cuestan lo mismo
+    que la primera.
     RF-Q03
     """
     try:
-        # Validar parámetros de paginación
-        if page < 1:
-            page = 1
-        if page_size < 1:
-            page_size = 10
-        if page_size > 100:
-            page_size = 100  # Máximo 100 items por página
-        
         # Validar tipo_ingreso
         if tipo_ingreso and tipo_ingreso not in ["propio", "visita", "all"]:
             raise HTTPException(
@@ -348,16 +648,25 @@ def listar_qr_por_cuenta(
                 detail="tipo_ingreso debe ser 'propio', 'visita' o 'all' o vacio"
             )
         
-        # Obtener cuenta del usuario
-        cuenta = db.query(Cuenta).filter(Cuenta.persona_titular_fk == persona_id).first()
-        if not cuenta:
+        # Obtener cuenta del usuario y su titular (quien autoriza todos los QRs)
+        fila = db.query(Cuenta, Persona).outerjoin(
+            Persona, Persona.persona_pk == Cuenta.persona_titular_fk
+        ).filter(Cuenta.persona_titular_fk == persona_id).first()
+        if not fila:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Usuario no autorizado"
             )
         
-        # Construir query base
-        query_base = db.query(QRModel).filter(
+        cuenta, persona_autoriza = fila
+        autorizado_por_nombre = f"{persona_autoriza.nombres} {persona_autoriza.apellidos}" if persona_autoriza else "Desconocido"
+        
+        # Construir query base: QR + datos de la visita en una sola consulta
+        query_base = db.query(
+            QRModel, VisitaModel.nombres, VisitaModel.apellidos
+        ).outerjoin(
+            VisitaModel, VisitaModel.visita_pk == QRModel.visita_ingreso_fk
+        ).filter(
             QRModel.cuenta_autoriza_fk == cuenta.cuenta_pk
         )
         
@@ -367,31 +676,20 @@ def listar_qr_por_cuenta(
         elif tipo_ingreso == "visita":
             query_base = query_base.filter(QRModel.visita_ingreso_fk != None)
         
-        # Obtener total de QRs con filtro aplicado
-        total = query_base.count()
-        
-        # Calcular offset y total de páginas
-        offset = (page - 1) * page_size
-        total_pages = (total + page_size - 1) // page_size
-        has_next = page < total_pages
-        
-        # Obtener QRs paginados con filtro
-        qrs = query_base.order_by(QRModel.fecha_creado.desc()).offset(offset).limit(page_size).all()
+        resultado = pagina.paginar(query_base, (QRModel.fecha_creado, QRModel.qr_pk))
         
         # Transformar QRs para incluir tipo de ingreso y datos de autorización
         data = []
-        for qr in qrs:
+        for qr, visita_nombres, visita_apellidos in resultado.filas:
             tipo_ingreso_calc = "visita" if qr.visita_ingreso_fk is not None else "propio"
             
-            # Obtener nombre de quien autoriza (titular de la cuenta)
-            persona_autoriza = db.query(Persona).filter(Persona.persona_pk == cuenta.persona_titular_fk).first()
-            autorizado_por_nombre = f"{persona_autoriza.nombres} {persona_autoriza.apellidos}" if persona_autoriza else "Desconocido"
-            
             # Obtener nombre de quien es autorizado
-            if tipo_ingreso_calc == "visita" and qr.visita_ingreso_fk:
+            if tipo_ingreso_calc == "visita":
                 # Es una visita, traer nombre del visitante
-                visita = db.query(VisitaModel).filter(VisitaModel.visita_pk == qr.visita_ingreso_fk).first()
-                autorizado_para = f"{visita.nombres} {visita.apellidos}" if visita else "Visitante desconocido"
+                autorizado_para = (
+                    f"{visita_nombres} {visita_apellidos}"
+                    if visita_nombres is not None else "Visitante desconocido"
+                )
             else:
                 # Es acceso propio, es el mismo titular
                 autorizado_para = autorizado_por_nombre
@@ -408,14 +706,7 @@ def listar_qr_por_cuenta(
                 fecha_creado=qr.fecha_creado
             ))
         
-        return QRPaginatedResponse(
-            data=data,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages,
-            has_next=has_next
-        )
+        return QRPaginatedResponse(data=data, **resultado.metadatos())
     
     except HTTPException:
         raise
@@ -429,6 +720,7 @@ def listar_qr_por_cuenta(
 @router.get("/visitantes/{persona_id}", response_model=ViviendaVisitasResponse)
 def obtener_visitantes_vivienda(
     persona_id: int,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db)
 ):
     """
@@ -436,6 +728,7 @@ def obtener_visitantes_vivienda(
     El usuario puede ser residente o miembro de familia
     Retorna identificación, nombres, apellidos y fecha de registro
     para que puedan ser reutilizados al generar QRs de visita
+    Paginado por cursor sobre (fecha_creado, visita_pk), más recientes primero
     
     RF-Q04: Consultar visitantes disponibles para reutilización
     """
@@ -486,10 +779,13 @@ def obtener_visitantes_vivienda(
             )
         
         # Obtener visitantes de la vivienda
-        visitantes = db.query(VisitaModel).filter(
+        query_visitantes = db.query(VisitaModel).filter(
             VisitaModel.vivienda_visita_fk == vivienda_id,
             VisitaModel.eliminado == False
-        ).order_by(VisitaModel.fecha_creado.desc()).all()
+        )
+        resultado = pagina.paginar(
+            query_visitantes, (VisitaModel.fecha_creado, VisitaModel.visita_pk), incluir_total=True
+        )
         
         # Transformar a VisitaResponse
         visitantes_response = [
@@ -500,7 +796,7 @@ def obtener_visitantes_vivienda(
                 apellidos=v.apellidos,
                 fecha_creado=v.fecha_creado
             )
-            for v in visitantes
+            for v in resultado.filas
         ]
         
         return ViviendaVisitasResponse(
@@ -508,7 +804,8 @@ def obtener_visitantes_vivienda(
             manzana=vivienda.manzana,
             villa=vivienda.villa,
             visitantes=visitantes_response,
-            total=len(visitantes_response)
+            total=resultado.total_aproximado,
+            **resultado.metadatos()
         )
     
     except HTTPException:
@@ -7,6 +7,7 @@ from app.interfaces.schemas.schemas import (
 from app.infrastructure.db.models import Persona, ResidenteVivienda, Vivienda
 from datetime import datetime
 from app.infrastructure.utils.time_utils import ahora_sin_tz
+from app.interfaces.schemas.paginacion import ParametrosPagina
 
 router = APIRouter(prefix="/api/v1/residentes", tags=["Residentes"])
 
@@ -267,10 +268,11 @@ def agregar_foto_residente(
 @router.get("/{persona_id}/fotos", response_model=dict)
 def obtener_fotos_residente(
     persona_id: int,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db)
 ):
     """
-    Obtiene todas las fotos del residente
+    Obtiene las fotos del residente (paginado por cursor)
     """
     try:
         from app.infrastructure.db.models import PersonaFoto
@@ -282,14 +284,18 @@ def obtener_fotos_residente(
                 detail="Persona no encontrada"
             )
         
-        fotos = db.query(PersonaFoto).filter(
+        query_fotos = db.query(PersonaFoto).filter(
             PersonaFoto.persona_titular_fk == persona_id,
             PersonaFoto.eliminado == False
-        ).all()
+        )
+        resultado = pagina.paginar(
+            query_fotos, (PersonaFoto.foto_pk,), descendente=False, incluir_total=True
+        )
+        fotos = resultado.filas
         
         return {
             "persona_id": persona_id,
-            "total_fotos": len(fotos),
+            "total_fotos": resultado.total_aproximado,
             "fotos": [
                 {
                     "foto_id": f.foto_pk,
@@ -298,7 +304,8 @@ def obtener_fotos_residente(
                     "fecha_creado": f.fecha_creado.isoformat()
                 }
                 for f in fotos
-            ]
+            ],
+            **resultado.metadatos()
         }
     
     except HTTPException:
@@ -314,10 +321,12 @@ def obtener_fotos_residente(
 def obtener_residentes_por_ubicacion(
     manzana: str,
     villa: str,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db)
 ):
     """
-    Obtiene todos los residentes de una vivienda por manzana y villa
+    Obtiene los residentes de una vivienda por manzana y villa
+    (paginado por cursor)
     """
     try:
         # Obtener vivienda
@@ -334,14 +343,18 @@ def obtener_residentes_por_ubicacion(
             )
         
         # Obtener residentes activos
-        residentes = db.query(ResidenteVivienda).filter(
+        query_residentes = db.query(ResidenteVivienda).filter(
             ResidenteVivienda.vivienda_reside_fk == vivienda.vivienda_pk,
             # ResidenteVivienda.estado == "activo",
             ResidenteVivienda.eliminado == False
-        ).all()
+        )
+        resultado = pagina.paginar(
+            query_residentes, (ResidenteVivienda.residente_vivienda_pk,),
+            descendente=False, incluir_total=True
+        )
         
         residentes_data = []
-        for residente in residentes:
+        for residente in resultado.filas:
             persona = residente.persona
             residentes_data.append({
                 "residente_id": residente.residente_vivienda_pk,
@@ -358,8 +371,9 @@ def obtener_residentes_por_ubicacion(
             "vivienda_id": vivienda.vivienda_pk,
             "manzana": vivienda.manzana,
             "villa": vivienda.villa,
-            "total_residentes": len(residentes_data),
-            "residentes": residentes_data
+            "total_residentes": resultado.total_aproximado,
+            "residentes": residentes_data,
+            **resultado.metadatos()
         }
     
     except HTTPException:
@@ -0,0 +1,243 @@
+"""
+Paginación por cursor (keyset) para endpoints de listado.
+
+El cursor es opaco para el cliente: codifica en base64 url-safe los valores de
+la clave de ordenamiento de la última fila devuelta (p. ej. fecha_creado y pk).
+La siguiente página se obtiene con `WHERE (fecha_creado, pk) < (:f, :pk)`, que
+usa el índice y cuesta lo mismo en la página 1 que en la 1000, a diferencia de
+OFFSET + COUNT(*).
+
+`paginar_query` aplica el cursor, el orden y el límite a cualquier query del
+ORM; los endpoints de listado solo eligen las columnas de la clave (siempre
+terminando en la pk para que el orden sea total).
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Query as QueryParam, status
+from sqlalchemy import func, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Hasta cuántas filas se cuentan exactamente al pedir el total
+TOTAL_MAXIMO_CONTEO = 1000
+
+
+def codificar_cursor(valores: Sequence[Any]) -> str:
+    """
+    Codifica los valores de la clave de ordenamiento en un cursor opaco.
+    
+    Example:
+        >>> codificar_cursor([datetime(2026, 1, 19, 14, 30), 42])
+        'WyIyMDI2LTAxLTE5VDE0OjMwOjAwIiwgNDJd'
+    """
+    serializables = [
+        v.isoformat() if isinstance(v, (datetime, date)) else v
+        for v in valores
+    ]
+    return base64.urlsafe_b64encode(json.dumps(serializables).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, tipos: Sequence[Type]) -> Tuple:
+    """
+    Decodifica un cursor generado por `codificar_cursor`.
+    
+    Args:
+        cursor: Cursor recibido del cliente
+        tipos: Tipo esperado de cada valor (datetime, date, int, str)
+        
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(tipos):
+            raise ValueError
+        
+        resultado = []
+        for valor, tipo in zip(valores, tipos):
+            if tipo is datetime:
+                resultado.append(datetime.fromisoformat(valor))
+            elif tipo is date:
+                resultado.append(date.fromisoformat(valor))
+            else:
+                resultado.append(tipo(valor))
+        return tuple(resultado)
+    except (ValueError, TypeError, json.JSONDecodeError, UnicodeDecodeError):
+        raise ValueError("Cursor de paginación inválido")
+
+
+@dataclass
+class PaginaCursor:
+    """Resultado de `paginar_query`"""
+    filas: List[Any]
+    page_size: int
+    has_next: bool
+    next_cursor: Optional[str] = None
+    total_aproximado: Optional[int] = None
+    total_exacto: bool = True
+
+    def metadatos(self) -> dict:
+        """Campos de paginación para incluir en la respuesta del endpoint"""
+        return {
+            "page_size": self.page_size,
+            "has_next": self.has_next,
+            "next_cursor": self.next_cursor,
+            "total_aproximado": self.total_aproximado,
+            "total_exacto": self.total_exacto,
+        }
+
+
+def _valores_clave(fila: Any, columnas: Sequence) -> list:
+    """
+    Lee los valores de la clave de ordenamiento de la fila: de sus columnas si
+    la query las selecciona directamente, o de la entidad en la primera posición
+    """
+    if isinstance(fila, Row):
+        if all(columna.key in fila._fields for columna in columnas):
+            return [getattr(fila, columna.key) for columna in columnas]
+        fila = fila[0]
+    return [getattr(fila, columna.key) for columna in columnas]
+
+
+def estimar_total(query: Query, maximo: int = TOTAL_MAXIMO_CONTEO) -> Tuple[int, bool]:
+    """
+    Cuenta las filas de la query hasta `maximo`.
+    
+    Por debajo del máximo el conteo es exacto. Si se alcanza, en PostgreSQL se
+    usa la estimación del planificador (EXPLAIN) en lugar de recorrer todo el
+    historial; en otros motores se devuelve el máximo como cota inferior.
+    
+    Returns:
+        Tupla (total, es_exacto)
+    """
+    acotada = query.order_by(None).limit(maximo).subquery()
+    contados = query.session.query(func.count()).select_from(acotada).scalar()
+    if contados < maximo:
+        return contados, True
+
+    sesion = query.session
+    dialecto = sesion.get_bind().dialect
+    if dialecto.name == "postgresql":
+        # Los valores de los filtros viajan como parámetros del driver, no
+        # dentro del SQL: `:x` o `%` en un filtro del usuario no se reinterpretan
+        compilada = query.order_by(None).statement.compile(
+            dialect=dialecto,
+            compile_kwargs={"render_postcompile": True},
+        )
+        parametros = compilada.params
+        if compilada.positional:
+            parametros = tuple(parametros[nombre] for nombre in compilada.positiontup)
+        plan = sesion.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compilada}", parametros
+        ).scalar()
+        return max(maximo, int(plan[0]["Plan"]["Plan Rows"])), False
+    return maximo, False
+
+
+def paginar_query(
+    query: Query,
+    columnas: Sequence,
+    page_size: int,
+    cursor: Optional[str] = None,
+    incluir_total: bool = False,
+    descendente: bool = True,
+) -> PaginaCursor:
+    """
+    Devuelve una página de la query usando paginación keyset.
+    
+    Args:
+        query: Query del ORM ya filtrada; cada fila (o su primera entidad)
+            debe exponer las columnas de la clave
+        columnas: Columnas de la clave de ordenamiento, terminando en la pk
+            (p. ej. `(Acceso.fecha_creado, Acceso.acceso_pk)`)
+        page_size: Cantidad máxima de filas de la página
+        cursor: `next_cursor` de la página anterior (None para la primera)
+        incluir_total: Si True, calcula `total_aproximado` con `estimar_total`
+        descendente: Orden de la clave (por defecto, más recientes primero)
+        
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    query_total = query
+    if cursor:
+        valores = decodificar_cursor(cursor, [c.type.python_type for c in columnas])
+        clave = tuple_(*columnas)
+        query = query.filter(clave < valores if descendente else clave > valores)
+
+    orden = [c.desc() if descendente else c.asc() for c in columnas]
+    # Pedir una fila extra para saber si hay página siguiente
+    filas = query.order_by(*orden).limit(page_size + 1).all()
+
+    has_next = len(filas) > page_size
+    filas = filas[:page_size]
+    next_cursor = codificar_cursor(_valores_clave(filas[-1], columnas)) if has_next else None
+
+    total, exacto = (None, True)
+    if incluir_total:
+        if not cursor and not has_next:
+            # La primera página ya trae todas las filas: no hace falta contar
+            total = len(filas)
+        else:
+            total, exacto = estimar_total(query_total)
+
+    return PaginaCursor(
+        filas=filas,
+        page_size=page_size,
+        has_next=has_next,
+        next_cursor=next_cursor,
+        total_aproximado=total,
+        total_exacto=exacto,
+    )
+
+
+class ParametrosPagina:
+    """
+    Parámetros de paginación comunes a los endpoints de listado.
+    
+    Se usa como dependencia: `pagina: ParametrosPagina = Depends()`.
+    """
+
+    def __init__(
+        self,
+        page_size: int = QueryParam(
+            settings.PAGINATION_DEFAULT_PAGE_SIZE, ge=1, le=settings.PAGINATION_MAX_PAGE_SIZE
+        ),
+        cursor: Optional[str] = None,
+        incluir_total: bool = False,
+    ):
+        self.page_size = page_size
+        self.cursor = cursor
+        self.incluir_total = incluir_total
+
+    def paginar(
+        self,
+        query: Query,
+        columnas: Sequence,
+        descendente: bool = True,
+        incluir_total: bool = False,
+    ) -> PaginaCursor:
+        """
+        `paginar_query` con estos parámetros; un cursor inválido responde 400.
+        
+        `incluir_total=True` calcula el total aunque el cliente no lo pida
+        (endpoints cuya respuesta ya tenía un campo `total_*`).
+        """
+        try:
+            return paginar_query(
+                query, columnas, self.page_size, self.cursor,
+                incluir_total=self.incluir_total or incluir_total, descendente=descendente,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
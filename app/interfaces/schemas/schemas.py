@@ -184,6 +184,26 @@ class QRGenerarVisita(BaseModel):
     usuario_creado: str
 
 
+class VisitanteLote(BaseModel):
+    identificacion: str
+    nombres: str
+    apellidos: str
+
+
+class QRGenerarVisitasLote(BaseModel):
+    """Generación de QRs para una lista de visitantes (eventos)"""
+    visitantes: List[VisitanteLote] = Field(..., min_length=1)
+    motivo_visita: str
+    duracion_horas: int = Field(..., gt=0)
+    fecha_acceso: date = None  # Opcional, si no viene usa fecha actual
+    hora_inicio: str = None  # HH:MM (opcional, si no viene usa hora actual)
+    usuario_creado: str
+
+
+class QRAnular(BaseModel):
+    usuario_actualizado: str
+
+
 class QRResponse(BaseModel):
     id: int
     token: str
@@ -212,14 +232,18 @@ class QRListResponse(BaseModel):
         from_attributes = True
 
 
-class QRPaginatedResponse(BaseModel):
-    """Response paginada para listar QRs de una cuenta"""
-    data: list[QRListResponse]
-    total: int
-    page: int
+class PaginaCursorResponse(BaseModel):
+    """Campos comunes de las respuestas paginadas por cursor"""
     page_size: int
-    total_pages: int
     has_next: bool
+    next_cursor: Optional[str] = None  # Enviar como `cursor` para obtener la siguiente página
+    total_aproximado: Optional[int] = None  # Solo si se pidió incluir_total=true
+    total_exacto: bool = True
+
+
+class QRPaginatedResponse(PaginaCursorResponse):
+    """Response paginada (por cursor) para listar QRs de una cuenta"""
+    data: list[QRListResponse]
 
     class Config:
         from_attributes = True
@@ -229,6 +253,20 @@ class QRPaginatedResponse(BaseModel):
 class AccesoValidarRequest(BaseModel):
     token_qr: Optional[str] = None
     tipo_acceso: str
+    persona_guardia_id: Optional[int] = None
+    usuario_guardia: str = "garita"
+
+
+class QRValidarResponse(BaseModel):
+    """Resultado de la validación de un QR en garita"""
+    valido: bool
+    razon: Optional[str] = None
+    qr_id: Optional[int] = None
+    cuenta_id: Optional[int] = None
+    vivienda_id: Optional[int] = None
+    visita_id: Optional[int] = None
+    acceso_id: Optional[int] = None  # Solo al consumir
+    tipo: Optional[str] = None  # Tipo de acceso registrado al consumir
 
 
 class AccesoResponse(BaseModel):
@@ -366,8 +404,8 @@ class VisitaResponse(BaseModel):
         from_attributes = True
 
 
-class ViviendaVisitasResponse(BaseModel):
-    """Response con lista de visitantes de una vivienda"""
+class ViviendaVisitasResponse(PaginaCursorResponse):
+    """Response con lista de visitantes de una vivienda (paginada por cursor)"""
     vivienda_id: int
     manzana: str
     villa: str
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
@@ -5,10 +6,17 @@ from app.interfaces.routers import (
     qr_router, cuentas_router, residentes_router, 
     propietarios_router, miembros_router, accesos_router
 )
-from app.infrastructure.db import Base, engine
-
-# Crear tablas (comentar en producción si usas Alembic)
-Base.metadata.create_all(bind=engine)
+from app.infrastructure.db import (
+    Base, engine, async_engine, obtener_estadisticas_pool, AsyncSessionLocal, SessionLocal
+)
+from app.application.services.accesos_service import AccesosService
+from app.application.services.despacho_notificaciones import DespachadorNotificaciones
+from app.infrastructure.db.qr_repository import QRRepository
+from app.infrastructure.cache.qr_cache import get_qr_cache
+from app.infrastructure.cache.perfil_cache import get_perfil_cache
+from app.infrastructure.cache.principal_cache import get_principal_cache
+from app.infrastructure.db.particiones import asegurar_particiones_futuras
+from app.infrastructure.utils.time_utils import ahora_sin_tz, ambito_solicitud
 
 settings = get_settings()
 
@@ -22,6 +30,27 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+class HoraSolicitudMiddleware:
+    """
+    Middleware ASGI que abre un `ambito_solicitud()` por cada request HTTP:
+    la hora se calcula una vez y la reutilizan los endpoints y los defaults
+    de fecha_creado (ver time_utils.ahora_solicitud). Cubre también el
+    cuerpo de las respuestas en streaming.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with ambito_solicitud():
+            await self.app(scope, receive, send)
+
+
+app.add_middleware(HoraSolicitudMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +69,142 @@ app.include_router(miembros_router.router)
 app.include_router(accesos_router.router)
 
 
+@app.on_event("startup")
+def crear_tablas_desarrollo():
+    """
+    Crea las tablas solo si DB_CREATE_ALL=True (desarrollo local).
+    Por defecto el arranque no hace round-trips a la BD; el esquema se
+    aplica fuera de banda con `alembic upgrade head`.
+    """
+    if settings.DB_CREATE_ALL:
+        Base.metadata.create_all(bind=engine)
+
+
+async def precargar_cache_qr():
+    """Carga en memoria los QRs vigentes para la validación en garita"""
+    try:
+        async with AsyncSessionLocal() as db:
+            cache = get_qr_cache()
+            qrs = await QRRepository(db).listar_vigentes(cache.max_entradas)
+            cache.precargar(qrs)
+    except Exception as e:
+        print(f"Error precargando caché de QRs vigentes: {e}")
+
+
+@app.on_event("startup")
+async def iniciar_cache_qr():
+    """
+    Precarga la caché de QRs en segundo plano para no retrasar
+    la primera respuesta de la instancia.
+    """
+    if settings.QR_CACHE_ENABLED:
+        app.state.tarea_precarga_qr = asyncio.create_task(precargar_cache_qr())
+
+
+def consolidar_accesos_diarios():
+    """Consolida en acceso_diario los días cerrados aún no resumidos"""
+    db = SessionLocal()
+    try:
+        AccesosService.consolidar_pendientes(db)
+    except Exception as e:
+        print(f"Error consolidando accesos diarios: {e}")
+    finally:
+        db.close()
+
+
+async def consolidar_accesos_periodicamente():
+    """Ejecuta la consolidación cada ACCESO_DIARIO_INTERVALO_MINUTOS"""
+    while True:
+        await asyncio.to_thread(consolidar_accesos_diarios)
+        await asyncio.sleep(settings.ACCESO_DIARIO_INTERVALO_MINUTOS * 60)
+
+
+@app.on_event("startup")
+async def iniciar_consolidacion_accesos():
+    """
+    Mantiene al día el resumen de accesos usado por las estadísticas de admin.
+    Desactivado por defecto (se usa scripts/consolidar_accesos.py programado).
+    Si se activa en varias instancias, el advisory lock de
+    `consolidar_pendientes` deja consolidar a una sola por ciclo.
+    """
+    if settings.ACCESO_DIARIO_INTERVALO_MINUTOS > 0:
+        app.state.tarea_consolidacion_accesos = asyncio.create_task(
+            consolidar_accesos_periodicamente()
+        )
+
+
+def crear_particiones_futuras():
+    """Crea las particiones mensuales de los próximos meses si faltan"""
+    try:
+        with engine.begin() as conn:
+            asegurar_particiones_futuras(
+                conn, ahora_sin_tz().date(), settings.PARTICIONES_MESES_ADELANTE
+            )
+    except Exception as e:
+        print(f"Error creando particiones mensuales: {e}")
+
+
+async def mantener_particiones_periodicamente():
+    """Revisa las particiones una vez al día (CREATE TABLE IF NOT EXISTS)"""
+    while True:
+        await asyncio.to_thread(crear_particiones_futuras)
+        await asyncio.sleep(24 * 60 * 60)
+
+
+@app.on_event("startup")
+async def iniciar_mantenimiento_particiones():
+    """
+    Evita que un INSERT en acceso/bitacora/notificacion_destino quede sin partición.
+    Desactivado por defecto: el DDL corre fuera de la API con
+    `scripts/particiones.py crear` programado.
+    """
+    if settings.PARTICIONES_MESES_ADELANTE > 0:
+        app.state.tarea_particiones = asyncio.create_task(
+            mantener_particiones_periodicamente()
+        )
+
+
+def despachar_notificaciones() -> int:
+    """Envía un lote de la bandeja de salida de notificaciones push"""
+    db = SessionLocal()
+    try:
+        return DespachadorNotificaciones(db).procesar_pendientes()
+    except Exception as e:
+        print(f"Error despachando notificaciones: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+async def despachar_notificaciones_periodicamente():
+    """
+    Vacía la bandeja de salida: si el lote salió lleno sigue de inmediato,
+    si no espera NOTIFICACIONES_DESPACHO_INTERVALO_SEGUNDOS
+    """
+    while True:
+        procesados = await asyncio.to_thread(despachar_notificaciones)
+        if procesados < settings.NOTIFICACIONES_DESPACHO_LOTE:
+            await asyncio.sleep(settings.NOTIFICACIONES_DESPACHO_INTERVALO_SEGUNDOS)
+
+
+@app.on_event("startup")
+async def iniciar_despacho_notificaciones():
+    """
+    Envía por FCM los push encolados por los servicios, fuera de las
+    solicitudes HTTP. Varias instancias pueden despachar a la vez (SKIP LOCKED).
+    """
+    if settings.NOTIFICACIONES_DESPACHO_INTERVALO_SEGUNDOS > 0:
+        app.state.tarea_despacho_notificaciones = asyncio.create_task(
+            despachar_notificaciones_periodicamente()
+        )
+
+
+@app.on_event("shutdown")
+async def cerrar_conexiones():
+    """Libera las conexiones del pool asíncrono al detener la instancia"""
+    await async_engine.dispose()
+
+
 @app.get("/", tags=["Health"])
 def root():
     """Endpoint raíz para verificar que la API está en funcionamiento"""
@@ -56,6 +221,30 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/db-pool", tags=["Health"])
+def estadisticas_pool_db():
+    """Estadísticas del pool de conexiones: en uso, overflow e histograma de espera"""
+    return obtener_estadisticas_pool()
+
+
+@app.get("/health/qr-cache", tags=["Health"])
+def estadisticas_cache_qr():
+    """Tamaño y tasa de aciertos de la caché de QRs vigentes"""
+    return get_qr_cache().estadisticas()
+
+
+@app.get("/health/perfil-cache", tags=["Health"])
+def estadisticas_cache_perfil():
+    """Tamaño y tasa de aciertos de la caché de perfiles por Firebase UID"""
+    return get_perfil_cache().estadisticas()
+
+
+@app.get("/health/principal-cache", tags=["Health"])
+def estadisticas_cache_principal():
+    """Tamaño y tasa de aciertos de la caché de usuarios autenticados"""
+    return get_principal_cache().estadisticas()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,14 +1,21 @@
 SET search_path TO public;
 
+-- fecha_creado usa como DEFAULT la hora local de TIMEZONE (America/Bogota),
+-- igual que la aplicación; con otra TIMEZONE ajustar los DEFAULT (ver 0006).
+
 -- =====================================================
 -- LIMPIEZA TOTAL
 -- =====================================================
 DROP TABLE IF EXISTS
+    notificacion_envio,
+    dispositivo_fcm,
     notificacion_destino,
     notificacion,
     qr,
     autorizacion_codigo,
     autorizacion_telefonica,
+    acceso_diario_visitante,
+    acceso_diario,
     acceso,
     visita,
     vehiculo,
@@ -35,7 +42,7 @@ CREATE TABLE vivienda (
     estado VARCHAR(10) NOT NULL DEFAULT 'activo',
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -62,7 +69,7 @@ CREATE TABLE persona (
     estado VARCHAR(10) NOT NULL DEFAULT 'activo',
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -85,7 +92,7 @@ CREATE TABLE persona_foto (
     formato VARCHAR(10) NOT NULL,
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20)
@@ -114,7 +121,7 @@ CREATE TABLE propietario_vivienda (
 	fecha_desde date DEFAULT CURRENT_DATE NULL,
 	fecha_hasta date NULL,
 	motivo text NULL,
-	fecha_creado timestamp DEFAULT CURRENT_TIMESTAMP NULL,
+	fecha_creado timestamp DEFAULT timezone('America/Bogota', now()) NULL,
 	usuario_creado varchar(20) NOT NULL,
 	fecha_actualizado timestamp NULL,
 	usuario_actualizado varchar(20) NULL,
@@ -145,7 +152,7 @@ CREATE TABLE residente_vivienda (
     fecha_desde DATE DEFAULT CURRENT_DATE,
     fecha_hasta DATE,
     motivo TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -173,7 +180,7 @@ CREATE TABLE miembro_vivienda (
     estado VARCHAR(10) NOT NULL DEFAULT 'activo',
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -213,7 +220,7 @@ CREATE TABLE cuenta (
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
     ultimo_login TIMESTAMP,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -232,7 +239,7 @@ CREATE TABLE guardia (
     estado VARCHAR(10) NOT NULL DEFAULT 'activo',
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -256,7 +263,7 @@ CREATE TABLE evento_cuenta (
     persona_actor_fk INTEGER REFERENCES persona(persona_pk),
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -283,7 +290,7 @@ CREATE TABLE vehiculo (
     estado VARCHAR(10) NOT NULL DEFAULT 'activo',
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -303,7 +310,7 @@ CREATE TABLE visita (
     apellidos VARCHAR(100),
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20)
@@ -312,8 +319,9 @@ CREATE TABLE visita (
 -- =====================================================
 -- ACCESO
 -- =====================================================
+-- Particionada por mes de fecha_creado (ver bloque PARTICIONES al final)
 CREATE TABLE acceso (
-    acceso_pk SERIAL PRIMARY KEY,
+    acceso_pk SERIAL,
     tipo VARCHAR(30) NOT NULL,
     vivienda_visita_fk INTEGER NOT NULL REFERENCES vivienda(vivienda_pk),
     resultado VARCHAR(30) NOT NULL,
@@ -329,10 +337,11 @@ CREATE TABLE acceso (
     observacion TEXT,
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP NOT NULL DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
+    PRIMARY KEY (acceso_pk, fecha_creado),
     CONSTRAINT chk_acceso_tipo CHECK (
         tipo IN (
             'qr_residente','qr_visita','visita_sin_qr',
@@ -346,6 +355,24 @@ CREATE TABLE acceso (
             'cuenta_bloqueada','error_sistema','cancelado'
         )
     )
+) PARTITION BY RANGE (fecha_creado);
+
+-- =====================================================
+-- ACCESO_DIARIO (resumen consolidado por día)
+-- =====================================================
+CREATE TABLE acceso_diario (
+    dia DATE NOT NULL,
+    vivienda_fk INTEGER NOT NULL REFERENCES vivienda(vivienda_pk),
+    tipo VARCHAR(30) NOT NULL,
+    resultado VARCHAR(30) NOT NULL,
+    cantidad INTEGER NOT NULL,
+    PRIMARY KEY (dia, vivienda_fk, tipo, resultado)
+);
+
+CREATE TABLE acceso_diario_visitante (
+    dia DATE NOT NULL,
+    visita_fk INTEGER NOT NULL REFERENCES visita(visita_pk),
+    PRIMARY KEY (dia, visita_fk)
 );
 
 -- =====================================================
@@ -353,7 +380,8 @@ CREATE TABLE acceso (
 -- =====================================================
 CREATE TABLE autorizacion_telefonica (
     autorizacion_tel_pk SERIAL PRIMARY KEY,
-    acceso_ingreso_fk INTEGER NOT NULL REFERENCES acceso(acceso_pk),
+    -- Sin FK: acceso está particionada y su PK incluye fecha_creado
+    acceso_ingreso_fk INTEGER NOT NULL,
     telefono VARCHAR(15),
     respuesta VARCHAR(20),
     numero_intentos INTEGER,
@@ -361,7 +389,7 @@ CREATE TABLE autorizacion_telefonica (
     hora_fin TIMESTAMP,
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -386,7 +414,7 @@ CREATE TABLE autorizacion_codigo (
     estado VARCHAR(20) NOT NULL,
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -410,7 +438,7 @@ CREATE TABLE qr (
     token TEXT NOT NULL,
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -419,6 +447,11 @@ CREATE TABLE qr (
     )
 );
 
+-- Búsqueda O(1) de QR por token en la validación de garita
+CREATE UNIQUE INDEX uq_qr_token_activo
+ON qr (token)
+WHERE eliminado = FALSE;
+
 -- =====================================================
 -- NOTIFICACION
 -- =====================================================
@@ -429,7 +462,7 @@ CREATE TABLE notificacion (
     persona_emisor_fk INTEGER REFERENCES persona(persona_pk),
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
     usuario_actualizado VARCHAR(20),
@@ -448,8 +481,9 @@ CREATE TABLE notificacion (
 -- =====================================================
 -- NOTIFICACION_DESTINO
 -- =====================================================
+-- Particionada por mes de fecha_creado (ver bloque PARTICIONES al final)
 CREATE TABLE notificacion_destino (
-    notificacion_destino_pk SERIAL PRIMARY KEY,
+    notificacion_destino_pk SERIAL,
     notificacion_envio_fk INTEGER NOT NULL REFERENCES notificacion(notificacion_pk),
     persona_receptor_fk INTEGER NOT NULL REFERENCES persona(persona_pk),
     entregada BOOLEAN NOT NULL DEFAULT FALSE,
@@ -457,22 +491,120 @@ CREATE TABLE notificacion_destino (
     error TEXT,
     eliminado BOOLEAN NOT NULL DEFAULT FALSE,
     motivo_eliminado TEXT,
-    fecha_creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_creado TIMESTAMP NOT NULL DEFAULT timezone('America/Bogota', now()),
     usuario_creado VARCHAR(20) NOT NULL,
     fecha_actualizado TIMESTAMP,
-    usuario_actualizado VARCHAR(20)
+    usuario_actualizado VARCHAR(20),
+    PRIMARY KEY (notificacion_destino_pk, fecha_creado)
+) PARTITION BY RANGE (fecha_creado);
+
+-- =====================================================
+-- DISPOSITIVO FCM
+-- =====================================================
+-- Tokens de notificaciones push; los que FCM reporta como inválidos se
+-- dan de baja (eliminado = TRUE) y se reactivan si el dispositivo se vuelve a registrar.
+CREATE TABLE dispositivo_fcm (
+    dispositivo_fcm_pk SERIAL PRIMARY KEY,
+    persona_fk INTEGER NOT NULL REFERENCES persona(persona_pk),
+    token VARCHAR(512) NOT NULL UNIQUE,
+    plataforma VARCHAR(10) NOT NULL,
+    eliminado BOOLEAN NOT NULL DEFAULT FALSE,
+    motivo_eliminado TEXT,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
+    usuario_creado VARCHAR(20) NOT NULL,
+    fecha_actualizado TIMESTAMP,
+    usuario_actualizado VARCHAR(20),
+    CONSTRAINT chk_dispositivo_fcm_plataforma CHECK (plataforma IN ('android','ios','web'))
+);
+
+-- =====================================================
+-- NOTIFICACION ENVIO (OUTBOX)
+-- =====================================================
+-- Push pendientes: se insertan en la misma transacción que la notificación y
+-- los procesa el despachador (reintentos con espera exponencial).
+CREATE TABLE notificacion_envio (
+    notificacion_envio_pk SERIAL PRIMARY KEY,
+    notificacion_fk INTEGER NOT NULL REFERENCES notificacion(notificacion_pk),
+    titulo VARCHAR(100) NOT NULL,
+    datos JSONB,
+    estado VARCHAR(12) NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    proximo_intento TIMESTAMP NOT NULL DEFAULT timezone('America/Bogota', now()),
+    ultimo_error TEXT,
+    fecha_creado TIMESTAMP DEFAULT timezone('America/Bogota', now()),
+    usuario_creado VARCHAR(20) NOT NULL,
+    fecha_actualizado TIMESTAMP,
+    usuario_actualizado VARCHAR(20),
+    CONSTRAINT chk_notificacion_envio_estado
+        CHECK (estado IN ('pendiente','procesando','enviado','fallido'))
 );
 
 -- =====================================================
 -- BITACORA
 -- =====================================================
+-- Particionada por mes de fecha_creado (ver bloque PARTICIONES al final)
 CREATE TABLE bitacora (
-    bitacora_pk SERIAL PRIMARY KEY,
+    bitacora_pk SERIAL,
     entidad VARCHAR(50) NOT NULL,
     entidad_id VARCHAR(50) NOT NULL,
     operacion VARCHAR(20) NOT NULL,
     persona_actor_fk INTEGER REFERENCES persona(persona_pk),
     valor_anterior JSONB,
     valor_nuevo JSONB,
-    descripcion TEXT
-);
\ No newline at end of file
+    descripcion TEXT,
+    fecha_creado TIMESTAMP NOT NULL DEFAULT timezone('America/Bogota', now()),
+    PRIMARY KEY (bitacora_pk, fecha_creado)
+) PARTITION BY RANGE (fecha_creado);
+
+-- =====================================================
+-- ÍNDICES DE CONSULTA
+-- =====================================================
+-- Siguen los predicados de los endpoints más usados; los parciales
+-- (WHERE eliminado = FALSE) excluyen los registros dados de baja.
+CREATE INDEX ix_persona_correo_activa ON persona (correo) WHERE estado = 'activo';
+CREATE INDEX ix_persona_foto_titular ON persona_foto (persona_titular_fk, foto_pk) WHERE eliminado = FALSE;
+CREATE INDEX ix_propietario_vivienda ON propietario_vivienda (vivienda_propiedad_fk, propietario_vivienda_pk) WHERE eliminado = FALSE;
+CREATE INDEX ix_residente_persona_estado ON residente_vivienda (persona_residente_fk, estado) WHERE eliminado = FALSE;
+CREATE INDEX ix_residente_vivienda ON residente_vivienda (vivienda_reside_fk, residente_vivienda_pk) WHERE eliminado = FALSE;
+CREATE INDEX ix_miembro_persona_estado ON miembro_vivienda (persona_miembro_fk, estado) WHERE eliminado = FALSE;
+CREATE INDEX ix_miembro_vivienda ON miembro_vivienda (vivienda_familia_fk, miembro_vivienda_pk) WHERE eliminado = FALSE;
+CREATE INDEX ix_cuenta_persona_titular ON cuenta (persona_titular_fk);
+CREATE INDEX ix_visita_vivienda_fecha ON visita (vivienda_visita_fk, fecha_creado, visita_pk) WHERE eliminado = FALSE;
+CREATE INDEX ix_acceso_vivienda_fecha ON acceso (vivienda_visita_fk, fecha_creado, acceso_pk) WHERE eliminado = FALSE;
+CREATE INDEX ix_notificacion_destino_pendiente ON notificacion_destino (notificacion_envio_fk, persona_receptor_fk) WHERE entregada = FALSE AND eliminado = FALSE;
+CREATE INDEX ix_autorizacion_telefonica_acceso_ingreso_fk ON autorizacion_telefonica (acceso_ingreso_fk);
+CREATE INDEX ix_qr_cuenta_fecha ON qr (cuenta_autoriza_fk, fecha_creado, qr_pk);
+CREATE INDEX ix_qr_vigentes ON qr (hora_fin_vigencia) WHERE estado = 'vigente' AND eliminado = FALSE;
+CREATE INDEX ix_dispositivo_fcm_persona ON dispositivo_fcm (persona_fk) WHERE eliminado = FALSE;
+CREATE INDEX ix_notificacion_envio_pendiente ON notificacion_envio (proximo_intento) WHERE estado IN ('pendiente', 'procesando');
+
+-- =====================================================
+-- PARTICIONES
+-- =====================================================
+-- Una partición por mes (<tabla>_AAAA_MM): mes actual y los 3 siguientes.
+-- IMPORTANTE: la API no crea las siguientes (PARTICIONES_MESES_ADELANTE=0 por
+-- defecto). Es obligatorio programar `python scripts/particiones.py crear`
+-- (p. ej. cron diario). Si no corre, las filas de meses sin partición caen en
+-- <tabla>_default: no se pierden, pero las consultas por fecha recorren toda
+-- la DEFAULT hasta que `crear` las mueva a su mes.
+DO $$
+DECLARE
+    tabla TEXT;
+    mes DATE;
+BEGIN
+    FOREACH tabla IN ARRAY ARRAY['acceso', 'bitacora', 'notificacion_destino'] LOOP
+        EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF %I DEFAULT', tabla || '_default', tabla);
+        FOR mes IN
+            SELECT generate_series(
+                date_trunc('month', CURRENT_DATE),
+                date_trunc('month', CURRENT_DATE) + INTERVAL '3 months',
+                INTERVAL '1 month'
+            )::date
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                tabla || '_' || to_char(mes, 'YYYY_MM'), tabla, mes, (mes + INTERVAL '1 month')::date
+            );
+        END LOOP;
+    END LOOP;
+END $$;
\ No newline at end of file
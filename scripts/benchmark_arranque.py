@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío de la API
+
+Mide, para varias ejecuciones independientes:
+  - Tiempo de import de app.main (proceso nuevo, sin caché de módulos)
+  - Tiempo hasta la primera respuesta: desde que se lanza uvicorn hasta que
+    GET /health responde 200
+
+Uso:
+    python scripts/benchmark_arranque.py
+    python scripts/benchmark_arranque.py --ejecuciones 10 --puerto 8099
+
+Variables de entorno (.env) se heredan del proceso actual, por lo que se puede
+comparar DB_CREATE_ALL=True contra el modo de arranque rápido (por defecto).
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def medir_import() -> float:
+    """Segundos que tarda un proceso nuevo en importar app.main"""
+    codigo = (
+        "import time; t = time.perf_counter(); import app.main; "
+        "print(time.perf_counter() - t)"
+    )
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(salida.stdout.strip().splitlines()[-1])
+
+
+def medir_primera_respuesta(puerto: int, timeout: float) -> float:
+    """Segundos desde que se lanza uvicorn hasta el primer 200 de /health"""
+    url = f"http://127.0.0.1:{puerto}/health"
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(puerto)],
+        cwd=RAIZ,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - inicio < timeout:
+            if proceso.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó con código {proceso.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as respuesta:
+                    if respuesta.status == 200:
+                        return time.perf_counter() - inicio
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"Sin respuesta de {url} en {timeout}s")
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+
+def resumen(nombre: str, valores: list) -> None:
+    ms = [v * 1000 for v in valores]
+    print(
+        f"  {nombre:<22} min={min(ms):8.1f} ms  mediana={statistics.median(ms):8.1f} ms  "
+        f"max={max(ms):8.1f} ms"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío")
+    parser.add_argument("--ejecuciones", type=int, default=5)
+    parser.add_argument("--puerto", type=int, default=8099)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BENCHMARK DE ARRANQUE EN FRÍO")
+    print("=" * 70)
+    print(f"  DB_CREATE_ALL={os.getenv('DB_CREATE_ALL', 'False')}  ejecuciones={args.ejecuciones}\n")
+
+    imports, respuestas = [], []
+    for i in range(args.ejecuciones):
+        imports.append(medir_import())
+        respuestas.append(medir_primera_respuesta(args.puerto, args.timeout))
+        print(f"  #{i + 1}: import={imports[-1] * 1000:.1f} ms  "
+              f"primera_respuesta={respuestas[-1] * 1000:.1f} ms")
+
+    print()
+    resumen("import app.main", imports)
+    resumen("primera respuesta", respuestas)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark del reloj de la aplicación (time_utils)
+
+Compara, por llamada y en un INSERT masivo:
+  - anterior:  get_settings() + pytz.timezone(TIMEZONE) en cada llamada
+               (como hacía ahora_sin_tz antes de cachear la zona)
+  - ahora_sin_tz:     zona ZoneInfo resuelta una vez por proceso
+  - ahora_solicitud:  hora calculada una vez por solicitud (ambito_solicitud)
+  - servidor:         DEFAULT de la base (DB_FECHA_CREADO_SERVIDOR), solo INSERT
+
+El INSERT masivo usa SQLite en memoria con una tabla cuyo fecha_creado tiene
+como default cada variante, para aislar el costo del default por fila.
+
+Uso:
+    python scripts/benchmark_reloj.py
+    python scripts/benchmark_reloj.py --llamadas 200000 --filas 20000
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import pytz
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, insert, text
+
+from app.config import get_settings
+from app.infrastructure.utils.time_utils import ahora_sin_tz, ahora_solicitud, ambito_solicitud
+
+
+def ahora_sin_tz_anterior() -> datetime:
+    """Implementación previa: resuelve settings y la zona en cada llamada"""
+    settings = get_settings()
+    return datetime.now(pytz.timezone(settings.TIMEZONE)).replace(tzinfo=None)
+
+
+VARIANTES = {
+    "anterior (pytz)": ahora_sin_tz_anterior,
+    "ahora_sin_tz": ahora_sin_tz,
+    "ahora_solicitud": ahora_solicitud,
+}
+
+
+def medir_llamadas(funcion, llamadas: int) -> float:
+    """Nanosegundos por llamada"""
+    with ambito_solicitud():
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        return (time.perf_counter() - inicio) / llamadas * 1e9
+
+
+def medir_insert(funcion, filas: int) -> float:
+    """
+    Milisegundos de un INSERT de `filas` filas con `funcion` como default
+    (None: DEFAULT de la base, sin trabajo por fila en Python)
+    """
+    engine = create_engine("sqlite://")
+    if funcion is None:
+        fecha_creado = Column("fecha_creado", DateTime, server_default=text("CURRENT_TIMESTAMP"))
+    else:
+        fecha_creado = Column("fecha_creado", DateTime, default=funcion)
+    tabla = Table(
+        "registro", MetaData(),
+        Column("registro_pk", Integer, primary_key=True),
+        Column("detalle", String(20)),
+        fecha_creado,
+    )
+    tabla.metadata.create_all(engine)
+    valores = [{"detalle": f"fila {i}"} for i in range(filas)]
+    with engine.begin() as conn, ambito_solicitud():
+        inicio = time.perf_counter()
+        conn.execute(insert(tabla), valores)
+        return (time.perf_counter() - inicio) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del reloj de time_utils")
+    parser.add_argument("--llamadas", type=int, default=100000)
+    parser.add_argument("--filas", type=int, default=10000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BENCHMARK DEL RELOJ (time_utils)")
+    print("=" * 70)
+    print(f"  TIMEZONE={get_settings().TIMEZONE}  llamadas={args.llamadas}  "
+          f"filas={args.filas}  repeticiones={args.repeticiones}\n")
+
+    print("  Costo por llamada (mediana):")
+    for nombre, funcion in VARIANTES.items():
+        ns = [medir_llamadas(funcion, args.llamadas) for _ in range(args.repeticiones)]
+        print(f"    {nombre:<18} {statistics.median(ns):10.0f} ns")
+
+    print(f"\n  INSERT masivo de {args.filas} filas con fecha_creado por default (mediana):")
+    for nombre, funcion in {**VARIANTES, "servidor (DEFAULT)": None}.items():
+        ms = [medir_insert(funcion, args.filas) for _ in range(args.repeticiones)]
+        print(f"    {nombre:<18} {statistics.median(ms):10.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de generación de tokens QR
+
+Compara la implementación anterior (un `secrets.choice` por carácter) con
+`app.infrastructure.utils.token_utils` (una lectura de `secrets.token_bytes`
+y codificación base62 con `bytes.translate`), y verifica que la distribución
+de caracteres se mantenga uniforme.
+
+Uso:
+    python scripts/benchmark_tokens.py
+    python scripts/benchmark_tokens.py --cantidad 100000
+"""
+
+import argparse
+import secrets
+import string
+import sys
+import timeit
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.infrastructure.utils.token_utils import ALFABETO, generar_token, generar_tokens
+
+LONGITUD = 32
+
+
+def token_anterior() -> str:
+    """Implementación previa en qr_router / qr_use_cases / servicios"""
+    caracteres = string.ascii_letters + string.digits
+    return ''.join(secrets.choice(caracteres) for _ in range(LONGITUD))
+
+
+def medir(nombre: str, funcion, cantidad: int, repeticiones: int) -> float:
+    mejor = min(timeit.repeat(funcion, number=1, repeat=repeticiones))
+    print(f"  {nombre:<34} {mejor * 1000:9.2f} ms  ({mejor / cantidad * 1e6:7.2f} µs/token)")
+    return mejor
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de generación de tokens")
+    parser.add_argument("--cantidad", type=int, default=10000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+    n = args.cantidad
+
+    print("=" * 70)
+    print(f"BENCHMARK DE TOKENS QR ({n} tokens de {LONGITUD} caracteres)")
+    print("=" * 70)
+
+    anterior = medir("secrets.choice por carácter", lambda: [token_anterior() for _ in range(n)],
+                     n, args.repeticiones)
+    nuevo = medir("generar_token()", lambda: [generar_token(LONGITUD) for _ in range(n)],
+                  n, args.repeticiones)
+    lote = medir("generar_tokens() (lote)", lambda: generar_tokens(n, LONGITUD),
+                 n, args.repeticiones)
+
+    print(f"\n  Aceleración generar_token:  x{anterior / nuevo:.1f}")
+    print(f"  Aceleración generar_tokens: x{anterior / lote:.1f}")
+
+    # Uniformidad: cada carácter debería aparecer ~1/62 de las veces
+    conteo = Counter("".join(generar_tokens(n, LONGITUD)))
+    esperado = n * LONGITUD / len(ALFABETO)
+    desviacion = max(abs(conteo[c] - esperado) / esperado for c in ALFABETO)
+    print(f"\n  Caracteres usados: {len(conteo)}/{len(ALFABETO)}  "
+          f"desviación máxima vs uniforme: {desviacion:.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Consolidación de accesos diarios (tabla acceso_diario)
+
+Sin argumentos consolida los días cerrados posteriores al último consolidado,
+igual que la tarea periódica de la API. Con --desde/--hasta recalcula un rango
+(p. ej. para poblar el histórico tras la migración 0003 o después de eliminar
+accesos de días pasados).
+
+Uso:
+    python scripts/consolidar_accesos.py
+    python scripts/consolidar_accesos.py --desde 2025-01-01 --hasta 2025-12-31
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.application.services.accesos_service import AccesosService  # noqa: E402
+from app.infrastructure.db import SessionLocal  # noqa: E402
+from app.infrastructure.utils.time_utils import ahora_sin_tz  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Consolidar accesos diarios")
+    parser.add_argument("--desde", type=date.fromisoformat, help="Primer día (YYYY-MM-DD)")
+    parser.add_argument("--hasta", type=date.fromisoformat, help="Último día (por defecto, ayer)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.desde:
+            hasta = args.hasta or ahora_sin_tz().date() - timedelta(days=1)
+            filas = AccesosService.consolidar_dias(db, args.desde, hasta)
+            print(f"✅ {args.desde} a {hasta}: {filas} filas en acceso_diario")
+        else:
+            filas = AccesosService.consolidar_pendientes(db)
+            print(f"✅ {filas} filas nuevas en acceso_diario "
+                  f"(último día consolidado: {AccesosService.ultimo_dia_consolidado(db)})")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
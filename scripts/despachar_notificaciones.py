@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Despachador de notificaciones push (bandeja de salida notificacion_envio)
+
+Alternativa a la tarea periódica de la API (NOTIFICACIONES_DESPACHO_INTERVALO_SEGUNDOS=0)
+para correr el despacho como proceso aparte, p. ej. en un servicio o job
+dedicado. Puede ejecutarse junto a otras instancias: cada una reserva filas
+distintas (FOR UPDATE SKIP LOCKED).
+
+Uso:
+    python scripts/despachar_notificaciones.py             # en bucle
+    python scripts/despachar_notificaciones.py --una-vez   # vacía lo vencido y termina
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.application.services.despacho_notificaciones import DespachadorNotificaciones  # noqa: E402
+from app.config import get_settings  # noqa: E402
+from app.infrastructure.db import SessionLocal  # noqa: E402
+
+
+def despachar_lote(limite: int) -> int:
+    db = SessionLocal()
+    try:
+        return DespachadorNotificaciones(db).procesar_pendientes(limite)
+    finally:
+        db.close()
+
+
+def main() -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Despachar notificaciones push pendientes")
+    parser.add_argument("--una-vez", action="store_true", help="Procesar lo vencido y terminar")
+    parser.add_argument("--lote", type=int, default=settings.NOTIFICACIONES_DESPACHO_LOTE)
+    parser.add_argument(
+        "--intervalo", type=float,
+        default=settings.NOTIFICACIONES_DESPACHO_INTERVALO_SEGUNDOS or 5,
+        help="Segundos de espera cuando no hay pendientes"
+    )
+    args = parser.parse_args()
+
+    total = 0
+    while True:
+        try:
+            procesados = despachar_lote(args.lote)
+        except Exception as e:
+            print(f"❌ Error despachando notificaciones: {e}")
+            if args.una_vez:
+                return 1
+            procesados = 0
+        total += procesados
+        if procesados < args.lote:
+            if args.una_vez:
+                print(f"✅ {total} envíos procesados")
+                return 0
+            time.sleep(args.intervalo)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
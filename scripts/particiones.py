@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Administración de particiones mensuales (acceso, bitacora, notificacion_destino)
+
+Subcomandos:
+    listar       Muestra las particiones de cada tabla
+    crear        Crea las particiones del mes actual y los N siguientes
+    desacoplar   Desacopla (DETACH) las particiones anteriores a una fecha;
+                 quedan como tablas sueltas para archivarlas con pg_dump,
+                 o se borran con --eliminar
+
+Uso:
+    python scripts/particiones.py listar
+    python scripts/particiones.py crear --meses 6
+    python scripts/particiones.py desacoplar --antes-de 2025-01-01 --tabla bitacora
+    python scripts/particiones.py desacoplar --antes-de 2025-01-01 --eliminar
+"""
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.infrastructure.db import engine  # noqa: E402
+from app.infrastructure.db.particiones import (  # noqa: E402
+    MESES_ADELANTE_POR_DEFECTO, TABLAS_PARTICIONADAS, asegurar_particiones_futuras,
+    desacoplar_particiones, listar_particiones, nombre_particion, nombre_particion_default
+)
+from app.infrastructure.utils.time_utils import ahora_sin_tz  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Particiones mensuales")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    subcomandos.add_parser("listar")
+
+    crear = subcomandos.add_parser("crear")
+    crear.add_argument("--meses", type=int, default=MESES_ADELANTE_POR_DEFECTO)
+
+    desacoplar = subcomandos.add_parser("desacoplar")
+    desacoplar.add_argument("--antes-de", type=date.fromisoformat, required=True)
+    desacoplar.add_argument("--tabla", choices=TABLAS_PARTICIONADAS)
+    desacoplar.add_argument("--eliminar", action="store_true")
+
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        if args.comando == "listar":
+            for tabla in TABLAS_PARTICIONADAS:
+                meses = listar_particiones(conn, tabla)
+                print(f"{tabla}: {len(meses)} particiones")
+                for mes in meses:
+                    print(f"  {nombre_particion(tabla, mes)}")
+                default = nombre_particion_default(tabla)
+                filas = conn.execute(text(f"SELECT count(*) FROM {default}")).scalar()
+                aviso = " (ejecutar `crear` para moverlas a su mes)" if filas else ""
+                print(f"  {default}: {filas} filas{aviso}")
+        elif args.comando == "crear":
+            nombres = asegurar_particiones_futuras(conn, ahora_sin_tz().date(), args.meses)
+            print(f"✅ {len(nombres)} particiones verificadas hasta {args.meses} meses adelante")
+        else:
+            tablas = [args.tabla] if args.tabla else TABLAS_PARTICIONADAS
+            for tabla in tablas:
+                nombres = desacoplar_particiones(conn, tabla, args.antes_de, args.eliminar)
+                accion = "eliminadas" if args.eliminar else "desacopladas"
+                print(f"✅ {tabla}: {len(nombres)} particiones {accion} {nombres}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
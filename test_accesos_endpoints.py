@@ -210,6 +210,40 @@ def test_file_structure():
         return False
 
 
+def test_historial_sesion_propia():
+    """Test 7: El historial transmitido usa y cierra su propia sesión"""
+    print("\n" + "=" * 70)
+    print("TEST 7: Historial Transmitido con Sesión Propia")
+    print("=" * 70)
+    
+    try:
+        from unittest import mock
+        from app.interfaces.routers import accesos_router
+        
+        sesion = mock.MagicMock()
+        sesion.execute.return_value.partitions.return_value = [[]]
+        encabezado = {"vivienda_id": 1, "manzana": "A", "villa": "2"}
+        
+        with mock.patch.object(accesos_router, "SessionLocal", return_value=sesion):
+            cuerpo = "".join(
+                accesos_router._transmitir_historial(encabezado, mock.MagicMock())
+            )
+        
+        if json.loads(cuerpo) != {**encabezado, "accesos": []}:
+            print(f"❌ JSON inesperado: {cuerpo}")
+            return False
+        print("✅ JSON del historial bien formado")
+        
+        if sesion.execute.call_count == 1 and sesion.close.called:
+            print("✅ Consulta en una sesión propia, cerrada al terminar")
+            return True
+        print("❌ La sesión del generador no se usó o no se cerró")
+        return False
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
 def run_all_tests():
     """Ejecutar todos los tests"""
     print("\n")
@@ -224,6 +258,7 @@ def run_all_tests():
         "Schemas Pydantic": test_schemas(),
         "Arquitectura Hexagonal": test_architecture(),
         "Estructura de Archivos": test_file_structure(),
+        "Historial con sesión propia": test_historial_sesion_propia(),
     }
     
     print("\n" + "=" * 70)
@@ -0,0 +1,264 @@
+"""
+Test del Despachador de Notificaciones (bandeja de salida)
+
+Valida la política de reintentos, la sentencia de reserva de envíos compilada
+para PostgreSQL y el despacho de cada fila con el transporte de mensajería
+falso y una sesión simulada; no requiere base de datos ni red.
+
+Uso:
+    python test_despacho_notificaciones.py
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Agregar app al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy.dialects import postgresql
+
+from app.application.services.despacho_notificaciones import (
+    DespachadorNotificaciones,
+    espera_reintento,
+)
+from app.config import get_settings
+from app.infrastructure.notifications.fcm_client import FCMClient, TransporteMensajeriaFalso
+
+settings = get_settings()
+
+
+def test_espera_exponencial():
+    """Test 1: La espera entre intentos se duplica hasta el máximo configurado"""
+    print("=" * 70)
+    print("TEST 1: Espera Exponencial entre Reintentos")
+    print("=" * 70)
+
+    base = settings.NOTIFICACIONES_REINTENTO_SEGUNDOS
+    maximo = settings.NOTIFICACIONES_REINTENTO_MAX_SEGUNDOS
+    esperas = [espera_reintento(i).total_seconds() for i in range(1, 12)]
+    esperadas = [min(base * 2 ** (i - 1), maximo) for i in range(1, 12)]
+
+    if esperas == esperadas and esperas[-1] == maximo:
+        print(f"✅ Esperas: {esperas[:5]} ... hasta {maximo:.0f} s")
+        return True
+    print(f"❌ Esperas {esperas}, esperadas {esperadas}")
+    return False
+
+
+def test_reserva_sin_bloqueos_cruzados():
+    """Test 2: La reserva es un solo UPDATE ... RETURNING con FOR UPDATE SKIP LOCKED"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Reserva con SKIP LOCKED")
+    print("=" * 70)
+
+    db = mock.MagicMock()
+    DespachadorNotificaciones(db, fcm=mock.MagicMock())._reservar(20)
+    sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+
+    correcto = True
+    for fragmento in ("UPDATE notificacion_envio", "FOR UPDATE SKIP LOCKED", "LIMIT", "RETURNING"):
+        if fragmento in sql:
+            print(f"✅ {fragmento}")
+        else:
+            print(f"❌ Falta {fragmento}")
+            correcto = False
+    if db.commit.call_count != 1:
+        print("❌ La reserva debe confirmarse antes de enviar")
+        correcto = False
+    return correcto
+
+
+def despachador_falso(destinos, invalidos=(), errores=None):
+    """
+    Despachador con sesión simulada, repositorio de dispositivos simulado que
+    devuelve `destinos` [(persona_id, token)] y FCM con el transporte falso
+    """
+    db = mock.MagicMock()
+    db.execute.return_value.scalar_one.return_value = "Corte de agua"
+    fcm = FCMClient(
+        transporte=TransporteMensajeriaFalso(invalidos=set(invalidos), errores=errores or {}),
+        max_workers=2
+    )
+    despachador = DespachadorNotificaciones(db, fcm=fcm)
+    despachador.dispositivos = mock.MagicMock()
+    despachador.dispositivos.tokens_pendientes_de_notificacion.return_value = destinos
+    return despachador, db
+
+
+def actualizaciones_destinos(db):
+    """Parámetros de cada UPDATE notificacion_destino ejecutado (sin la lectura del mensaje)"""
+    return [
+        llamada.args[0].compile(dialect=postgresql.dialect()).params
+        for llamada in db.execute.call_args_list[1:]
+    ]
+
+
+def envio(intentos: int = 1):
+    return SimpleNamespace(
+        notificacion_envio_pk=1, notificacion_fk=10, titulo="Aviso", datos=None, intentos=intentos
+    )
+
+
+def test_entrega_solo_con_token_exitoso():
+    """Test 3: entregada solo para personas con algún token exitoso"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Entregada por Persona")
+    print("=" * 70)
+
+    # Persona 1: un token ok y otro con error; 2: solo token inválido;
+    # 3: solo error transitorio; 4: token ok
+    despachador, db = despachador_falso(
+        [(1, "tok-a"), (1, "tok-b"), (2, "tok-c"), (3, "tok-d"), (4, "tok-e")],
+        invalidos={"tok-c"},
+        errores={"tok-b": "Internal error", "tok-d": "Unavailable"}
+    )
+    error = despachador._despachar(envio())
+    actualizaciones = actualizaciones_destinos(db)
+
+    entregadas = [a["persona_receptor_fk_1"] for a in actualizaciones if a.get("entregada") is True]
+    con_error = {
+        persona: a["error"]
+        for a in actualizaciones if "entregada" not in a
+        for persona in a["persona_receptor_fk_1"]
+    }
+    bajas = despachador.dispositivos.dar_de_baja.call_args.args[0]
+
+    correcto = (
+        entregadas == [[1, 4]]
+        and set(con_error) == {2, 3}
+        and con_error[3] == "Unavailable"
+        and list(bajas) == ["tok-c"]
+        and error is not None and "Unavailable" in error
+        and db.commit.call_count == 1
+    )
+    if correcto:
+        print("✅ Entregadas: personas 1 y 4; error registrado para 2 y 3")
+        print("✅ tok-c dado de baja; se reintenta por el error transitorio de la persona 3")
+        return True
+    print(f"❌ entregadas={entregadas} errores={con_error} bajas={bajas} error={error}")
+    return False
+
+
+def test_invalidos_no_se_reintentan():
+    """Test 4: Si solo fallan tokens inválidos, el envío no se reintenta"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Tokens Inválidos sin Reintento")
+    print("=" * 70)
+
+    despachador, _ = despachador_falso(
+        [(1, "tok-a"), (2, "tok-b"), (2, "tok-c")],
+        invalidos={"tok-b", "tok-c"}
+    )
+    error = despachador._despachar(envio())
+    bajas = sorted(despachador.dispositivos.dar_de_baja.call_args.args[0])
+
+    if error is None and bajas == ["tok-b", "tok-c"]:
+        print("✅ Sin error que reintentar; tok-b y tok-c dados de baja")
+        return True
+    print(f"❌ error={error} bajas={bajas}")
+    return False
+
+
+def test_fallido_tras_max_intentos():
+    """Test 5: _finalizar reprograma con espera y marca 'fallido' al agotar los intentos"""
+    print("\n" + "=" * 70)
+    print("TEST 5: Estado Final del Envío")
+    print("=" * 70)
+
+    maximo = settings.NOTIFICACIONES_MAX_INTENTOS
+    casos = [
+        ("sin error", 1, None, "enviado"),
+        ("error transitorio", maximo - 1, "Unavailable", "pendiente"),
+        ("intentos agotados", maximo, "Unavailable", "fallido"),
+    ]
+    correcto = True
+    for nombre, intentos, error, esperado in casos:
+        despachador, db = despachador_falso([])
+        despachador._finalizar(1, intentos, error)
+        valores = db.execute.call_args.args[0].compile(dialect=postgresql.dialect()).params
+        reprogramado = "proximo_intento" in valores
+        if valores["estado"] == esperado and reprogramado == (esperado == "pendiente"):
+            print(f"✅ {nombre} ({intentos} intento(s)): {esperado}")
+        else:
+            print(f"❌ {nombre}: {valores['estado']}, esperado {esperado}")
+            correcto = False
+    return correcto
+
+
+def test_fallo_de_una_fila_no_aborta_el_lote():
+    """Test 6: Una fila que falla se revierte y se reprograma; las demás siguen"""
+    print("\n" + "=" * 70)
+    print("TEST 6: Fallo Aislado por Fila")
+    print("=" * 70)
+
+    despachador, db = despachador_falso([])
+    envios = [envio(), envio(), envio()]
+    with mock.patch.object(despachador, "_reservar", return_value=envios), \
+            mock.patch.object(
+                despachador, "_despachar", side_effect=[None, RuntimeError("FCM caído"), None]
+            ), \
+            mock.patch.object(despachador, "_finalizar") as finalizar:
+        procesados = despachador.procesar_pendientes()
+
+    errores = [llamada.args[2] for llamada in finalizar.call_args_list]
+    if procesados == 3 and errores == [None, "FCM caído", None] and db.rollback.call_count == 1:
+        print("✅ 3 filas finalizadas; solo la segunda con error, tras un rollback")
+        return True
+    print(f"❌ procesados={procesados} errores={errores} rollbacks={db.rollback.call_count}")
+    return False
+
+
+def test_bandeja_vacia_sin_fcm():
+    """Test 7: Sin filas pendientes no se crea el cliente FCM"""
+    print("\n" + "=" * 70)
+    print("TEST 7: Bandeja Vacía sin Inicializar FCM")
+    print("=" * 70)
+
+    db = mock.MagicMock()
+    with mock.patch(
+        "app.application.services.despacho_notificaciones.get_fcm_client",
+        side_effect=ValueError("Sin credenciales de Firebase")
+    ) as obtener:
+        despachador = DespachadorNotificaciones(db)
+        with mock.patch.object(despachador, "_reservar", return_value=[]):
+            procesados = despachador.procesar_pendientes()
+
+    if procesados == 0 and not obtener.called:
+        print("✅ Ciclo sin pendientes: no se pidió el cliente FCM")
+        return True
+    print(f"❌ procesados={procesados} get_fcm_client llamado={obtener.called}")
+    return False
+
+
+def run_all_tests():
+    """Ejecutar todos los tests"""
+    results = {
+        "Espera exponencial": test_espera_exponencial(),
+        "Reserva con SKIP LOCKED": test_reserva_sin_bloqueos_cruzados(),
+        "Entregada por persona": test_entrega_solo_con_token_exitoso(),
+        "Inválidos sin reintento": test_invalidos_no_se_reintentan(),
+        "Fallido tras max intentos": test_fallido_tras_max_intentos(),
+        "Fallo aislado por fila": test_fallo_de_una_fila_no_aborta_el_lote(),
+        "Bandeja vacía sin FCM": test_bandeja_vacia_sin_fcm(),
+    }
+
+    print("\n" + "=" * 70)
+    print("RESUMEN DE TESTS")
+    print("=" * 70)
+
+    passed = sum(1 for v in results.values() if v)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {test_name}")
+
+    print(f"\nRESULTADO FINAL: {passed}/{total} tests pasados")
+    return passed == total
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,212 @@
+"""
+Test del Envío Masivo FCM por Lotes
+
+Usa el transporte de mensajería falso (TransporteMensajeriaFalso) y, para
+el transporte real, credenciales de servicio generadas localmente con el
+envío a FCM simulado: no requiere red ni credenciales de Firebase.
+
+Uso:
+    python test_fcm_envio_masivo.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Agregar app al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import firebase_admin
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from firebase_admin import messaging
+
+from app.infrastructure import firebase_app
+from app.infrastructure.firestore.client import FirestoreClient
+from app.infrastructure.notifications.fcm_client import (
+    FCMClient,
+    TransporteFirebase,
+    TransporteMensajeriaFalso,
+)
+
+
+def tokens(cantidad: int, prefijo: str = "tok"):
+    return [f"{prefijo}-{i}" for i in range(cantidad)]
+
+
+def test_lotes_de_500():
+    """Test 1: Los tokens se envían en lotes de hasta 500"""
+    print("=" * 70)
+    print("TEST 1: Lotes de 500 Tokens")
+    print("=" * 70)
+
+    transporte = TransporteMensajeriaFalso()
+    cliente = FCMClient(transporte=transporte, tamano_lote=500, max_workers=4)
+    resultado = cliente.enviar_masivo(tokens(1201), "Aviso", "Corte de agua")
+
+    tamanos = sorted(len(lote) for lote in transporte.lotes)
+    if tamanos == [201, 500, 500] and len(resultado.exitosos) == 1201 and resultado.lotes == 3:
+        print(f"✅ 1201 tokens en lotes {tamanos}, todos exitosos")
+        return True
+    print(f"❌ lotes={tamanos} exitosos={len(resultado.exitosos)}")
+    return False
+
+
+def test_concurrencia_acotada():
+    """Test 2: Nunca hay más lotes en vuelo que max_workers"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Concurrencia Acotada")
+    print("=" * 70)
+
+    transporte = TransporteMensajeriaFalso(latencia_segundos=0.05)
+    cliente = FCMClient(transporte=transporte, tamano_lote=10, max_workers=3)
+    cliente.enviar_masivo(tokens(100), "Aviso", "Corte de agua")
+
+    if len(transporte.lotes) == 10 and transporte.concurrencia_maxima == 3:
+        print(f"✅ 10 lotes, concurrencia máxima {transporte.concurrencia_maxima}")
+        return True
+    print(f"❌ lotes={len(transporte.lotes)} concurrencia={transporte.concurrencia_maxima}")
+    return False
+
+
+def test_tokens_invalidos_y_errores():
+    """Test 3: Tokens inválidos se reportan para darlos de baja; errores transitorios no"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Tokens Inválidos y Errores")
+    print("=" * 70)
+
+    transporte = TransporteMensajeriaFalso(
+        invalidos={"tok-3", "tok-700"},
+        errores={"tok-5": "Internal error"}
+    )
+    cliente = FCMClient(transporte=transporte, tamano_lote=500, max_workers=2)
+    resultado = cliente.enviar_masivo(tokens(800), "Aviso", "Corte de agua")
+
+    correcto = (
+        sorted(resultado.invalidos) == ["tok-3", "tok-700"]
+        and set(resultado.fallidos) == {"tok-3", "tok-5", "tok-700"}
+        and len(resultado.exitosos) == 797
+    )
+    if correcto:
+        print("✅ 2 inválidos, 1 error transitorio, 797 exitosos")
+        return True
+    print(f"❌ {resultado.resumen()} invalidos={resultado.invalidos}")
+    return False
+
+
+def test_fallo_de_un_lote():
+    """Test 4: Un lote que falla completo no afecta a los demás"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Fallo de un Lote Completo")
+    print("=" * 70)
+
+    class TransporteConCaida(TransporteMensajeriaFalso):
+        def enviar_lote(self, lote, titulo, cuerpo, datos):
+            if "tok-0" in lote:
+                raise ConnectionError("FCM no disponible")
+            return super().enviar_lote(lote, titulo, cuerpo, datos)
+
+    cliente = FCMClient(transporte=TransporteConCaida(), tamano_lote=100, max_workers=2)
+    resultado = cliente.enviar_masivo(tokens(250), "Aviso", "Corte de agua")
+
+    if len(resultado.fallidos) == 100 and len(resultado.exitosos) == 150 and not resultado.invalidos:
+        print("✅ 100 fallidos del lote caído, 150 exitosos, ninguno dado de baja")
+        return True
+    print(f"❌ {resultado.resumen()}")
+    return False
+
+
+def credenciales_de_prueba() -> str:
+    """Archivo JSON de cuenta de servicio con una clave RSA generada localmente"""
+    clave = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    privada = clave.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    archivo = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+    json.dump({
+        "type": "service_account",
+        "project_id": "proyecto-prueba",
+        "private_key_id": "kid-1",
+        "private_key": privada,
+        "client_email": "fcm@proyecto-prueba.iam.gserviceaccount.com",
+        "client_id": "1",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }, archivo)
+    archivo.close()
+    return archivo.name
+
+
+def test_transporte_real_sin_firestore():
+    """Test 5: El transporte real inicializa Firebase sin pasar por Firestore"""
+    print("\n" + "=" * 70)
+    print("TEST 5: Transporte Firebase sin Firestore")
+    print("=" * 70)
+
+    ruta = credenciales_de_prueba()
+    try:
+        with mock.patch.object(firebase_app.settings, "FIREBASE_CREDENTIALS_PATH", ruta):
+            transporte = TransporteFirebase()
+    finally:
+        os.unlink(ruta)
+    respuesta = messaging.BatchResponse([
+        messaging.SendResponse({"name": "projects/p/messages/1"}, None),
+        messaging.SendResponse(None, messaging.UnregisteredError("Requested entity was not found.")),
+    ])
+    with mock.patch.object(messaging, "send_each_for_multicast", return_value=respuesta) as enviar:
+        resultados = transporte.enviar_lote(["tok1", "tok2"], "Aviso", "Corte de agua", {})
+
+    try:
+        app_por_defecto = firebase_admin.get_app()
+    except ValueError:
+        app_por_defecto = None
+
+    correcto = (
+        app_por_defecto is not None
+        and transporte.app is app_por_defecto
+        and FirestoreClient._instance is None
+        and firebase_app.obtener_app_firebase() is app_por_defecto
+        and enviar.call_args.kwargs.get("app") is app_por_defecto
+        and resultados[0].exitoso
+        and resultados[1].invalido
+    )
+    if correcto:
+        print("✅ App por defecto creada por el transporte, sin Firestore, y reutilizada")
+        print("✅ tok1 exitoso, tok2 inválido")
+        return True
+    print(f"❌ app={app_por_defecto} resultados={resultados}")
+    return False
+
+
+def run_all_tests():
+    """Ejecutar todos los tests"""
+    results = {
+        "Lotes de 500": test_lotes_de_500(),
+        "Concurrencia acotada": test_concurrencia_acotada(),
+        "Tokens inválidos y errores": test_tokens_invalidos_y_errores(),
+        "Fallo de un lote": test_fallo_de_un_lote(),
+        "Transporte real sin Firestore": test_transporte_real_sin_firestore(),
+    }
+
+    print("\n" + "=" * 70)
+    print("RESUMEN DE TESTS")
+    print("=" * 70)
+
+    passed = sum(1 for v in results.values() if v)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {test_name}")
+
+    print(f"\nRESULTADO FINAL: {passed}/{total} tests pasados")
+    return passed == total
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,241 @@
+"""
+Test del Verificador Local de ID Tokens de Firebase
+
+Genera localmente un par de claves RSA y su certificado, firma tokens con la
+misma forma que los de Firebase y los verifica con una fuente de certificados
+estática: no requiere red ni credenciales.
+
+Uso:
+    python test_verificador_firebase.py
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Agregar app al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from fastapi import HTTPException
+from jose import jwt
+
+from app.infrastructure.security import firebase_auth
+from app.infrastructure.security.verificador_firebase import (
+    FuenteCertificadosEstatica,
+    TokenFirebaseInvalido,
+    VerificadorTokensFirebase,
+    max_age_de_cache_control,
+)
+
+PROYECTO = "proyecto-prueba"
+
+
+def generar_claves():
+    """Clave privada PEM y certificado X.509 autofirmado PEM"""
+    clave = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    nombre = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken")])
+    ahora = datetime.now(timezone.utc)
+    certificado = (
+        x509.CertificateBuilder()
+        .subject_name(nombre)
+        .issuer_name(nombre)
+        .public_key(clave.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(ahora - timedelta(days=1))
+        .not_valid_after(ahora + timedelta(days=1))
+        .sign(clave, hashes.SHA256())
+    )
+    privada = clave.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return privada, certificado.public_bytes(serialization.Encoding.PEM).decode()
+
+
+def firmar(privada: str, kid: str = "kid-1", **cambios) -> str:
+    """Token con los claims de un ID token de Firebase; `cambios` los sobrescribe"""
+    ahora = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROYECTO}",
+        "aud": PROYECTO,
+        "sub": "uid-123",
+        "iat": ahora,
+        "auth_time": ahora,
+        "exp": ahora + 3600,
+        "email": "ana@example.com",
+    }
+    claims.update(cambios)
+    return jwt.encode(claims, privada, algorithm="RS256", headers={"kid": kid})
+
+
+PRIVADA, CERTIFICADO = generar_claves()
+
+
+def nuevo_verificador():
+    fuente = FuenteCertificadosEstatica({"kid-1": CERTIFICADO})
+    return VerificadorTokensFirebase(PROYECTO, fuente=fuente), fuente
+
+
+def test_token_valido():
+    """Test 1: Token válido se verifica y expone uid"""
+    print("=" * 70)
+    print("TEST 1: Token Válido")
+    print("=" * 70)
+
+    verificador, _ = nuevo_verificador()
+    claims = verificador.verificar(firmar(PRIVADA))
+    if claims["uid"] == "uid-123" and claims["email"] == "ana@example.com":
+        print("✅ Token verificado, uid = sub")
+        return True
+    print(f"❌ Claims inesperados: {claims}")
+    return False
+
+
+def test_tokens_rechazados():
+    """Test 2: Tokens con firma, aud, iss, exp o kid incorrectos se rechazan"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Tokens Rechazados")
+    print("=" * 70)
+
+    otra_privada, _ = generar_claves()
+    ahora = int(time.time())
+    casos = {
+        "Firma de otra clave": firmar(otra_privada),
+        "Audiencia de otro proyecto": firmar(PRIVADA, aud="otro-proyecto"),
+        "Emisor incorrecto": firmar(PRIVADA, iss="https://securetoken.google.com/otro"),
+        "Token expirado": firmar(PRIVADA, iat=ahora - 7200, auth_time=ahora - 7200, exp=ahora - 3600),
+        "iat en el futuro": firmar(PRIVADA, iat=ahora + 3600),
+        "sub vacío": firmar(PRIVADA, sub=""),
+        "kid desconocido": firmar(PRIVADA, kid="kid-rotado"),
+        "Texto que no es JWT": "no-es-un-token",
+    }
+
+    correcto = True
+    for nombre, token in casos.items():
+        verificador, _ = nuevo_verificador()
+        try:
+            verificador.verificar(token)
+            print(f"❌ {nombre}: aceptado")
+            correcto = False
+        except TokenFirebaseInvalido:
+            print(f"✅ {nombre}: rechazado")
+    return correcto
+
+
+def test_cache_de_tokens_y_certificados():
+    """Test 3: Un token ya verificado no se vuelve a decodificar y los certificados se descargan una vez"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Caché de Tokens y Certificados")
+    print("=" * 70)
+
+    verificador, fuente = nuevo_verificador()
+    token = firmar(PRIVADA)
+    for _ in range(5):
+        verificador.verificar(token)
+    verificador.verificar(firmar(PRIVADA, sub="uid-456"))
+
+    estadisticas = verificador.tokens.estadisticas()
+    if estadisticas["aciertos"] == 4 and fuente.descargas == 1:
+        print(f"✅ 4 aciertos de caché, {fuente.descargas} descarga de certificados")
+        return True
+    print(f"❌ aciertos={estadisticas['aciertos']} descargas={fuente.descargas}")
+    return False
+
+
+def test_cache_control():
+    """Test 4: La vigencia de los certificados sale de Cache-Control"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Cache-Control")
+    print("=" * 70)
+
+    casos = {
+        "public, max-age=19302, must-revalidate, no-transform": 19302,
+        "no-cache": None,
+        None: None,
+    }
+    correcto = True
+    for cabecera, esperado in casos.items():
+        obtenido = max_age_de_cache_control(cabecera)
+        if obtenido == esperado:
+            print(f"✅ {cabecera!r} -> {obtenido}")
+        else:
+            print(f"❌ {cabecera!r} -> {obtenido}, esperado {esperado}")
+            correcto = False
+    return correcto
+
+
+def test_dependencia_usuario_autenticado():
+    """Test 5: obtener_usuario_autenticado usa el verificador y responde 401 si falla"""
+    print("\n" + "=" * 70)
+    print("TEST 5: Dependencia obtener_usuario_autenticado")
+    print("=" * 70)
+
+    verificador, _ = nuevo_verificador()
+    db = mock.MagicMock()
+    db.query.return_value.join.return_value.filter.return_value.first.return_value = SimpleNamespace(
+        cuenta_pk=7, estado="activo", persona_pk=9, nombres="Ana", apellidos="Pérez"
+    )
+
+    correcto = True
+    with mock.patch.object(firebase_auth, "get_verificador_firebase", return_value=verificador), \
+            mock.patch.object(firebase_auth.settings, "PRINCIPAL_CACHE_ENABLED", False):
+        usuario = firebase_auth.obtener_usuario_autenticado(f"Bearer {firmar(PRIVADA)}", db)
+        if usuario["firebase_uid"] == "uid-123" and usuario["cuenta_id"] == 7:
+            print("✅ Token firmado: uid-123, cuenta 7")
+        else:
+            print(f"❌ Usuario inesperado: {usuario}")
+            correcto = False
+
+        for nombre, token in {
+            "uid como token": "uid-123",
+            "firma ajena": firmar(generar_claves()[0]),
+        }.items():
+            try:
+                firebase_auth.obtener_usuario_autenticado(f"Bearer {token}", db)
+                print(f"❌ {nombre}: aceptado")
+                correcto = False
+            except HTTPException as e:
+                if e.status_code == 401:
+                    print(f"✅ {nombre}: 401")
+                else:
+                    print(f"❌ {nombre}: {e.status_code}")
+                    correcto = False
+    return correcto
+
+
+def run_all_tests():
+    """Ejecutar todos los tests"""
+    results = {
+        "Token válido": test_token_valido(),
+        "Tokens rechazados": test_tokens_rechazados(),
+        "Caché de tokens y certificados": test_cache_de_tokens_y_certificados(),
+        "Cache-Control": test_cache_control(),
+        "Dependencia usuario autenticado": test_dependencia_usuario_autenticado(),
+    }
+
+    print("\n" + "=" * 70)
+    print("RESUMEN DE TESTS")
+    print("=" * 70)
+
+    passed = sum(1 for v in results.values() if v)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {test_name}")
+
+    print(f"\nRESULTADO FINAL: {passed}/{total} tests pasados")
+    return passed == total
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -30,6 +30,9 @@ def main():
         print(f"  User: {settings.DB_USER}")
         print(f"  Database: {settings.DB_NAME}")
         print(f"  URL: {settings.DATABASE_URL[:50]}..." if len(settings.DATABASE_URL) > 50 else f"  URL: {settings.DATABASE_URL}")
+        print(f"  Pool: size={settings.DB_POOL_SIZE} overflow={settings.DB_MAX_OVERFLOW} "
+              f"timeout={settings.DB_POOL_TIMEOUT}s recycle={settings.DB_POOL_RECYCLE}s "
+              f"pre_ping={settings.DB_POOL_PRE_PING}")
         
         # API
         print("\nAPI:")